@@ -0,0 +1,14 @@
+"""
+Trabajos en segundo plano de asistentes.
+"""
+from apps.jobs.registry import job
+from core.emails import EmailService
+from .models import Attendee
+
+
+@job('attendees.send_check_in_confirmation')
+def send_check_in_confirmation(payload):
+    attendee = Attendee.objects.select_related('event').get(pk=payload['attendee_id'])
+
+    if not EmailService.send_check_in_confirmation(attendee):
+        raise RuntimeError(f"No se pudo enviar la confirmación de check-in a {attendee.email}")
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendees', '0001_initial'),
+        ('events', '0006_venue_geohash'),
+        ('tickets', '0006_cursor_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendee',
+            index=models.Index(fields=['created_at', 'id'], name='attendees_a_created_5d64d4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendee',
+            index=models.Index(fields=['event', 'created_at', 'id'], name='attendees_a_event_i_2f7d22_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checkinlog',
+            index=models.Index(fields=['checked_in_at', 'id'], name='attendees_c_checked_aba944_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='surveyresponse',
+            index=models.Index(fields=['question', 'responded_at', 'id'], name='attendees_s_questio_296baf_idx'),
+        ),
+    ]
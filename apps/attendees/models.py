@@ -110,6 +110,9 @@ class Attendee(models.Model):
         indexes = [
             models.Index(fields=['event', 'status']),
             models.Index(fields=['user', 'event']),
+            # Paginación por cursor (-created_at, -id)
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['event', 'created_at', 'id']),
         ]
 
     def __str__(self):
@@ -130,17 +133,19 @@ class Attendee(models.Model):
             return False
         
         # Verificar que el evento está en curso o próximo
-        now = timezone.now()
-        event_start = self.event.start_date
-        
-        # Permitir check-in 2 horas antes del evento
-        check_in_window_start = event_start - timezone.timedelta(hours=2)
-        
-        return check_in_window_start <= now <= self.event.end_date
+        window_start, window_end = Attendee.check_in_window(self.event)
+        return window_start <= timezone.now() <= window_end
+
+    @staticmethod
+    def check_in_window(event):
+        """Ventana de check-in: desde 2 horas antes del inicio hasta el fin."""
+        return event.start_date - timezone.timedelta(hours=2), event.end_date
 
     @property
     def total_check_ins(self):
         """Retorna el número total de check-ins."""
+        if hasattr(self, 'check_ins_count'):
+            return self.check_ins_count
         return self.check_in_logs.count()
 
 
@@ -187,6 +192,10 @@ class CheckInLog(models.Model):
         verbose_name = "Registro de Check-in"
         verbose_name_plural = "Registros de Check-in"
         ordering = ['-checked_in_at']
+        indexes = [
+            # Paginación por cursor (-checked_in_at, -id)
+            models.Index(fields=['checked_in_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.attendee.full_name} - {self.checked_in_at}"
@@ -386,6 +395,10 @@ class SurveyResponse(models.Model):
         verbose_name = "Respuesta de Encuesta"
         verbose_name_plural = "Respuestas de Encuesta"
         ordering = ['-responded_at']
+        indexes = [
+            # Paginación por cursor (-responded_at, -id)
+            models.Index(fields=['question', 'responded_at', 'id']),
+        ]
 
     def __str__(self):
         respondent_name = self.respondent.username if self.respondent else "Anónimo"
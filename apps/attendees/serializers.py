@@ -1,14 +1,19 @@
 """
 Serializers para asistentes.
 """
+from types import SimpleNamespace
+
 from rest_framework import serializers
 from django.utils import timezone
 from .models import Attendee, CheckInLog, Survey, SurveyQuestion, SurveyResponse
 from apps.tickets.serializers import TicketSerializer
 from apps.events.serializers import EventListSerializer
+from core.utils import TicketTokenError, verify_ticket_token
+from core.compiled import subquery_count
+from core.sparse import DynamicFieldsMixin
 
 
-class AttendeeSerializer(serializers.ModelSerializer):
+class AttendeeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer básico para asistentes."""
     event_title = serializers.CharField(source='event.title', read_only=True)
     ticket_code = serializers.CharField(source='ticket.code', read_only=True)
@@ -27,9 +32,34 @@ class AttendeeSerializer(serializers.ModelSerializer):
             'total_check_ins', 'created_at'
         ]
         read_only_fields = ['user', 'checked_in_at', 'checked_in_by']
-
-
-class AttendeeDetailSerializer(serializers.ModelSerializer):
+        expandable_fields = {
+            'ticket': (TicketSerializer, {}),
+            'event': (EventListSerializer, {}),
+        }
+        field_sources = {
+            'is_checked_in': ('status',),
+            'can_check_in': ('status', 'ticket__status', 'event__start_date', 'event__end_date'),
+            'total_check_ins': (),
+        }
+        compiled = True
+        compiled_annotations = {
+            'total_check_ins': lambda: subquery_count(CheckInLog.objects, 'attendee'),
+        }
+
+    def row_is_checked_in(self, row):
+        return row['status'] == 'checked_in'
+
+    def row_can_check_in(self, row):
+        # Misma regla que Attendee.can_check_in
+        if row['status'] != 'registered' or row['ticket__status'] != 'active':
+            return False
+        window_start, window_end = Attendee.check_in_window(SimpleNamespace(
+            start_date=row['event__start_date'], end_date=row['event__end_date']
+        ))
+        return window_start <= timezone.now() <= window_end
+
+
+class AttendeeDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer detallado para asistentes."""
     ticket = TicketSerializer(read_only=True)
     event = EventListSerializer(read_only=True)
@@ -50,7 +80,10 @@ class AttendeeDetailSerializer(serializers.ModelSerializer):
         ]
 
     def get_check_in_history(self, obj):
-        logs = obj.check_in_logs.all()[:5]  # Últimos 5 check-ins
+        # El check-in deja en memoria el historial que acaba de escribir
+        logs = getattr(obj, 'recent_check_in_logs', None)
+        if logs is None:
+            logs = obj.check_in_logs.all()[:5]  # Últimos 5 check-ins
         return CheckInLogSerializer(logs, many=True).data
 
 
@@ -58,18 +91,61 @@ class CheckInSerializer(serializers.Serializer):
     """Serializer para realizar check-in."""
     ticket_code = serializers.CharField(max_length=50, required=False)
     ticket_uuid = serializers.UUIDField(required=False)
+    ticket_token = serializers.CharField(max_length=100, required=False)
+    location = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    notes = serializers.CharField(required=False, allow_blank=True)
+
+    def validate_ticket_token(self, value):
+        """Verificar la firma del QR; devuelve los datos del token."""
+        try:
+            return verify_ticket_token(value)
+        except TicketTokenError as e:
+            raise serializers.ValidationError(str(e))
+
+    def validate(self, data):
+        if not any(data.get(field) for field in ('ticket_code', 'ticket_uuid', 'ticket_token')):
+            raise serializers.ValidationError(
+                "Debe proporcionar ticket_code, ticket_uuid o ticket_token"
+            )
+        return data
+
+
+class CheckInScanSerializer(serializers.Serializer):
+    """Un escaneo dentro de un lote de check-in."""
+    scan_id = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    ticket_code = serializers.CharField(max_length=50, required=False)
+    ticket_uuid = serializers.UUIDField(required=False)
+    # La firma se verifica por escaneo en CheckInService para no rechazar el lote
+    ticket_token = serializers.CharField(max_length=100, required=False)
+    scanned_at = serializers.DateTimeField(required=False)
     location = serializers.CharField(max_length=200, required=False, allow_blank=True)
     notes = serializers.CharField(required=False, allow_blank=True)
 
     def validate(self, data):
-        if not data.get('ticket_code') and not data.get('ticket_uuid'):
+        if not any(data.get(field) for field in ('ticket_code', 'ticket_uuid', 'ticket_token')):
             raise serializers.ValidationError(
-                "Debe proporcionar ticket_code o ticket_uuid"
+                "Debe proporcionar ticket_code, ticket_uuid o ticket_token"
             )
         return data
 
 
-class CheckInLogSerializer(serializers.ModelSerializer):
+class CheckInBatchSerializer(serializers.Serializer):
+    """Serializer para subir un lote de escaneos."""
+    MAX_SCANS = 500
+
+    event = serializers.IntegerField(required=False)
+    device_info = serializers.CharField(max_length=500, required=False, allow_blank=True)
+    scans = CheckInScanSerializer(many=True, allow_empty=False)
+
+    def validate_scans(self, value):
+        if len(value) > self.MAX_SCANS:
+            raise serializers.ValidationError(
+                f"Máximo {self.MAX_SCANS} escaneos por lote."
+            )
+        return value
+
+
+class CheckInLogSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer para registros de check-in."""
     attendee_name = serializers.CharField(source='attendee.full_name', read_only=True)
     event_title = serializers.CharField(source='attendee.event.title', read_only=True)
@@ -82,6 +158,14 @@ class CheckInLogSerializer(serializers.ModelSerializer):
             'checked_in_at', 'checked_in_by', 'checked_in_by_name',
             'location', 'device_info', 'ip_address', 'notes'
         ]
+        expandable_fields = {
+            'attendee': (AttendeeSerializer, {}),
+        }
+        field_sources = {
+            'checked_in_by_name': (
+                'checked_in_by__first_name', 'checked_in_by__last_name', 'checked_in_by__username'
+            ),
+        }
 
     def get_checked_in_by_name(self, obj):
         if obj.checked_in_by:
@@ -89,7 +173,7 @@ class CheckInLogSerializer(serializers.ModelSerializer):
         return None
 
 
-class SurveyQuestionSerializer(serializers.ModelSerializer):
+class SurveyQuestionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer para preguntas de encuesta."""
     
     class Meta:
@@ -100,7 +184,7 @@ class SurveyQuestionSerializer(serializers.ModelSerializer):
         ]
 
 
-class SurveySerializer(serializers.ModelSerializer):
+class SurveySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer básico para encuestas."""
     event_title = serializers.CharField(source='event.title', read_only=True)
     is_active = serializers.BooleanField(read_only=True)
@@ -116,9 +200,17 @@ class SurveySerializer(serializers.ModelSerializer):
             'response_rate', 'created_at'
         ]
         read_only_fields = ['created_by']
+        expandable_fields = {
+            'event': (EventListSerializer, {}),
+        }
+        field_sources = {
+            'is_active': ('status', 'start_date', 'end_date'),
+            'total_responses': (),
+            'response_rate': ('event',),
+        }
 
 
-class SurveyDetailSerializer(serializers.ModelSerializer):
+class SurveyDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer detallado para encuestas con preguntas."""
     event = EventListSerializer(read_only=True)
     questions = SurveyQuestionSerializer(many=True, read_only=True)
@@ -137,7 +229,7 @@ class SurveyDetailSerializer(serializers.ModelSerializer):
         ]
 
 
-class SurveyResponseSerializer(serializers.ModelSerializer):
+class SurveyResponseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer para respuestas de encuesta."""
     question_text = serializers.CharField(source='question.question_text', read_only=True)
     respondent_name = serializers.SerializerMethodField()
@@ -150,6 +242,15 @@ class SurveyResponseSerializer(serializers.ModelSerializer):
             'rating_response', 'choice_response', 'responded_at'
         ]
         read_only_fields = ['respondent', 'responded_at']
+        expandable_fields = {
+            'question': (SurveyQuestionSerializer, {}),
+        }
+        field_sources = {
+            'respondent_name': (
+                'question__survey__is_anonymous', 'respondent__first_name',
+                'respondent__last_name', 'respondent__username',
+            ),
+        }
 
     def get_respondent_name(self, obj):
         if obj.question.survey.is_anonymous:
@@ -0,0 +1,416 @@
+"""
+Servicios de check-in de asistentes.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, DateTimeField, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from apps.events.models import Event
+from apps.events.services import StatisticsService
+from apps.jobs.services import JobService
+from apps.tickets.models import Ticket
+from core.compiled import subquery_count
+from core.utils import (
+    TicketTokenError, is_valid_ticket_code, normalize_ticket_code, verify_ticket_token
+)
+from .models import Attendee, CheckInLog
+
+# Tolerancia para relojes de escáneres adelantados
+CLOCK_SKEW = timedelta(minutes=5)
+
+CHECKED_IN = 'checked_in'
+CONFLICT_STATUSES = {'duplicate', 'already_checked_in', 'conflict'}
+LOOKUPS = {'id': 'pk__in', 'code': 'code__in', 'uuid': 'uuid__in'}
+
+
+class CheckInError(Exception):
+    """No se pudo realizar el check-in."""
+
+    def __init__(self, message, conflict=False, checked_in_at=None):
+        super().__init__(message)
+        self.conflict = conflict
+        self.checked_in_at = checked_in_at
+
+
+def _per_row(values):
+    """CASE WHEN pk=... THEN valor: un solo UPDATE con un valor distinto por fila."""
+    return Case(
+        *[When(pk=pk, then=Value(value)) for pk, value in values.items()],
+        output_field=DateTimeField(),
+    )
+
+
+class CheckInService:
+    """
+    Check-in de asistentes.
+
+    Las escrituras son condicionales sobre el estado del ticket (que queda
+    bloqueado durante la transacción), así que dos puertas que escanean el
+    mismo ticket a la vez no pueden dejar entrar a dos personas.
+    """
+
+    @staticmethod
+    def _reference(scan, scanned_at):
+        """
+        Obtener la referencia al ticket de un escaneo.
+
+        Returns:
+            tuple: (campo, valor) o (None, motivo del rechazo)
+        """
+        if scan.get('ticket_token'):
+            try:
+                claims = verify_ticket_token(scan['ticket_token'], now=scanned_at)
+            except TicketTokenError as e:
+                return None, str(e)
+            return 'id', claims['ticket_id']
+
+        if scan.get('ticket_code'):
+            code = normalize_ticket_code(scan['ticket_code'])
+            if not is_valid_ticket_code(code):
+                return None, "Código de ticket inválido."
+            return 'code', code
+
+        return 'uuid', scan['ticket_uuid']
+
+    @staticmethod
+    def check_in(ticket_lookup, user, location='', notes='', ip_address=None):
+        """
+        Check-in de un solo escaneo.
+
+        Una lectura (ticket, evento y asistente con ``select_related``, más
+        los tickets vendidos del evento y los check-ins previos del asistente
+        como subconsultas, para serializar la respuesta sin más consultas) y, en
+        una transacción, escrituras de una fila: el UPDATE condicional del
+        ticket (``status='active'`` -> ``used``) que hace de candado contra la
+        doble entrada, los contadores de ``EventStatistics`` y
+        ``TicketTypeStatistics``, el asistente, el registro de check-in y el
+        trabajo que envía el email.
+
+        Los contadores se suman en la misma transacción que marca el ticket:
+        ``StatisticsService.rebuild`` cuenta los tickets ``used``, así que un
+        recálculo nunca ve el ticket usado sin su check-in sumado.
+
+        Args:
+            ticket_lookup: Filtro del ticket, p. ej. ``{'code': ...}``
+            user: Usuario que realiza el check-in
+
+        Returns:
+            tuple: (asistente, registro de check-in)
+
+        Raises:
+            Ticket.DoesNotExist: Si el ticket no existe
+            CheckInError: Si el check-in no es posible; ``conflict`` indica
+                que el ticket ya fue usado
+        """
+        ticket = Ticket.objects.select_related(
+            'buyer', 'attendee', 'ticket_type__event__category',
+            'ticket_type__event__venue', 'ticket_type__event__organizer',
+        ).annotate(
+            event_tickets_sold=Event.objects.filter(
+                pk=OuterRef('ticket_type__event')
+            ).with_ticket_totals().values('total_tickets_sold'),
+            previous_check_ins=subquery_count(CheckInLog.objects, 'attendee__ticket'),
+        ).get(**ticket_lookup)
+        event = ticket.ticket_type.event
+        event.total_tickets_sold = ticket.event_tickets_sold
+        attendee = getattr(ticket, 'attendee', None)
+        now = timezone.now()
+
+        if ticket.status == 'used' or (attendee and attendee.status == 'checked_in'):
+            raise CheckInError(
+                "El ticket ya fue usado.",
+                conflict=True,
+                checked_in_at=attendee.checked_in_at if attendee else ticket.used_at,
+            )
+        if ticket.status != 'active' or (attendee and attendee.status != 'registered'):
+            raise CheckInError("No se puede realizar check-in en este momento")
+
+        window_start, window_end = Attendee.check_in_window(event)
+        if not window_start <= now <= window_end:
+            raise CheckInError("No se puede realizar check-in en este momento")
+
+        try:
+            with transaction.atomic():
+                used = Ticket.objects.filter(pk=ticket.pk, status='active').update(
+                    status='used', used_at=now, updated_at=now
+                )
+                if not used:
+                    # Otra puerta lo usó entre la lectura y esta escritura
+                    raise CheckInError("El ticket fue usado en otra puerta.", conflict=True)
+                StatisticsService.record_check_ins(event.pk, {ticket.ticket_type_id: 1})
+
+                if attendee:
+                    Attendee.objects.filter(pk=attendee.pk).update(
+                        status='checked_in', checked_in_at=now,
+                        checked_in_by=user, updated_at=now,
+                    )
+                    attendee.status = 'checked_in'
+                    attendee.checked_in_at = now
+                    attendee.checked_in_by = user
+                    attendee.updated_at = now
+                else:
+                    attendee = Attendee.objects.create(
+                        user_id=ticket.buyer_id,
+                        ticket=ticket,
+                        event=event,
+                        full_name=ticket.attendee_name,
+                        email=ticket.attendee_email,
+                        phone=ticket.attendee_phone,
+                        status='checked_in',
+                        checked_in_at=now,
+                        checked_in_by=user,
+                    )
+
+                log = CheckInLog.objects.create(
+                    attendee=attendee,
+                    checked_in_at=now,
+                    checked_in_by=user,
+                    location=location,
+                    notes=notes,
+                    ip_address=ip_address,
+                )
+                JobService.enqueue(
+                    'attendees.send_check_in_confirmation', {'attendee_id': attendee.pk}
+                )
+        except IntegrityError:
+            raise CheckInError("El comprador ya tiene otro asistente registrado en este evento.")
+
+        ticket.status = 'used'
+        ticket.used_at = now
+        attendee.ticket = ticket
+        attendee.event = event
+        attendee.check_ins_count = ticket.previous_check_ins + 1
+        if not ticket.previous_check_ins:
+            attendee.recent_check_in_logs = [log]
+        return attendee, log
+
+    @staticmethod
+    def check_in_batch(scans, user, ip_address=None, device_info='', event_id=None):
+        """
+        Registrar un lote de escaneos, incluidos escaneos hechos sin conexión.
+
+        El número de consultas no depende del tamaño del lote. Si el mismo
+        ticket aparece varias veces gana el escaneo más antiguo.
+
+        Args:
+            scans: Escaneos validados por ``CheckInScanSerializer``
+            user: Usuario que sube el lote
+            ip_address: IP del dispositivo
+            device_info: Identificación del dispositivo
+            event_id: Si se indica, se rechazan tickets de otros eventos
+
+        Returns:
+            list: Un resultado por escaneo, en el mismo orden
+        """
+        now = timezone.now()
+        results = [None] * len(scans)
+        references = {}
+
+        for index, scan in enumerate(scans):
+            scanned_at = scan.get('scanned_at') or now
+            field, value = CheckInService._reference(scan, scanned_at)
+            if field is None:
+                results[index] = {'status': 'invalid', 'detail': value}
+            else:
+                references[index] = (field, value, scanned_at)
+
+        # 1 consulta: todos los tickets del lote
+        grouped = {}
+        for field, value, _ in references.values():
+            grouped.setdefault(field, set()).add(value)
+        lookup = Q()
+        for field, values in grouped.items():
+            lookup |= Q(**{LOOKUPS[field]: values})
+        tickets = list(
+            Ticket.objects.filter(lookup).select_related('ticket_type__event')
+        ) if references else []
+        by_reference = {}
+        for ticket in tickets:
+            by_reference[('id', ticket.pk)] = ticket
+            by_reference[('code', ticket.code)] = ticket
+            by_reference[('uuid', ticket.uuid)] = ticket
+
+        # 2 consultas: asistentes existentes por ticket y por comprador
+        attendees = {
+            attendee.ticket_id: attendee
+            for attendee in Attendee.objects.filter(ticket__in=tickets).only(
+                'id', 'ticket_id', 'status', 'checked_in_at'
+            )
+        }
+        new_tickets = [ticket for ticket in tickets if ticket.pk not in attendees]
+        registered_buyers = set(
+            Attendee.objects.filter(
+                user_id__in={ticket.buyer_id for ticket in new_tickets},
+                event_id__in={ticket.ticket_type.event_id for ticket in new_tickets},
+            ).values_list('user_id', 'event_id')
+        ) if new_tickets else set()
+
+        accepted = {}
+        order = sorted(references, key=lambda index: (references[index][2], index))
+        for index in order:
+            field, value, scanned_at = references[index]
+            ticket = by_reference.get((field, value))
+            results[index] = CheckInService._decide(
+                ticket, attendees.get(ticket.pk) if ticket else None,
+                scanned_at, now, user, event_id, accepted, registered_buyers,
+            )
+            if results[index]['status'] == CHECKED_IN:
+                accepted[ticket.pk] = (index, ticket, scans[index], scanned_at)
+
+        if accepted:
+            CheckInService._write_batch(
+                accepted, attendees, results, user, ip_address, device_info, now
+            )
+
+        for index, scan in enumerate(scans):
+            results[index] = {'index': index, 'scan_id': scan.get('scan_id', ''), **results[index]}
+        return results
+
+    @staticmethod
+    def _decide(ticket, attendee, scanned_at, now, user, event_id, accepted, registered_buyers):
+        """Decidir el resultado de un escaneo sin tocar la base de datos."""
+        if ticket is None:
+            return {'status': 'not_found', 'detail': "Ticket no encontrado."}
+
+        result = {'ticket': ticket.code}
+        event = ticket.ticket_type.event
+
+        if event_id is not None and event.pk != event_id:
+            return {**result, 'status': 'wrong_event', 'detail': "El ticket es de otro evento."}
+        if not user.is_staff and event.organizer_id != user.pk:
+            return {**result, 'status': 'forbidden', 'detail': "No eres organizador de este evento."}
+        if scanned_at > now + CLOCK_SKEW:
+            return {**result, 'status': 'invalid', 'detail': "La fecha de escaneo está en el futuro."}
+        if ticket.pk in accepted:
+            return {
+                **result,
+                'status': 'duplicate',
+                'detail': "Ticket escaneado más de una vez en el lote.",
+                'checked_in_at': accepted[ticket.pk][3],
+            }
+        if ticket.status == 'used' or (attendee and attendee.status == 'checked_in'):
+            return {
+                **result,
+                'status': 'already_checked_in',
+                'detail': "El ticket ya fue usado.",
+                'checked_in_at': attendee.checked_in_at if attendee else ticket.used_at,
+            }
+        if ticket.status != 'active':
+            return {**result, 'status': 'invalid', 'detail': f"Ticket {ticket.status}."}
+        if attendee and attendee.status != 'registered':
+            return {**result, 'status': 'invalid', 'detail': f"Asistente {attendee.status}."}
+
+        window_start, window_end = Attendee.check_in_window(event)
+        if not window_start <= scanned_at <= window_end:
+            return {
+                **result,
+                'status': 'outside_window',
+                'detail': "Fuera del horario de check-in del evento.",
+            }
+
+        if attendee is None:
+            buyer = (ticket.buyer_id, event.pk)
+            if buyer in registered_buyers:
+                return {
+                    **result,
+                    'status': 'conflict',
+                    'detail': "El comprador ya tiene otro asistente registrado en este evento.",
+                }
+            registered_buyers.add(buyer)
+
+        return {**result, 'status': CHECKED_IN, 'checked_in_at': scanned_at}
+
+    @staticmethod
+    @transaction.atomic
+    def _write_batch(accepted, attendees, results, user, ip_address, device_info, now):
+        """Escribir los check-ins aceptados con operaciones masivas."""
+        # Bloquear los tickets que siguen activos: otra puerta pudo usarlos
+        # después de la lectura inicial
+        still_active = set(
+            Ticket.objects.select_for_update().filter(
+                pk__in=list(accepted), status='active'
+            ).values_list('pk', flat=True)
+        )
+        for ticket_id in set(accepted) - still_active:
+            index = accepted.pop(ticket_id)[0]
+            results[index].update(
+                status='already_checked_in',
+                detail="El ticket fue usado en otra puerta.",
+                checked_in_at=None,
+            )
+        if not accepted:
+            return
+
+        scanned = {ticket_id: entry[3] for ticket_id, entry in accepted.items()}
+        Ticket.objects.filter(pk__in=list(accepted)).update(
+            status='used', used_at=_per_row(scanned), updated_at=now
+        )
+
+        existing = {
+            attendees[ticket_id].pk: scanned[ticket_id]
+            for ticket_id in accepted if ticket_id in attendees
+        }
+        if existing:
+            Attendee.objects.filter(pk__in=list(existing)).update(
+                status='checked_in',
+                checked_in_at=_per_row(existing),
+                checked_in_by=user,
+                updated_at=now,
+            )
+
+        created = [
+            Attendee(
+                user_id=ticket.buyer_id,
+                ticket=ticket,
+                event_id=ticket.ticket_type.event_id,
+                full_name=ticket.attendee_name,
+                email=ticket.attendee_email,
+                phone=ticket.attendee_phone,
+                status='checked_in',
+                checked_in_at=scanned_at,
+                checked_in_by=user,
+            )
+            for ticket_id, (_, ticket, _, scanned_at) in accepted.items()
+            if ticket_id not in attendees
+        ]
+        Attendee.objects.bulk_create(created)
+        if created and created[0].pk is None:
+            # MySQL no devuelve los ids de un INSERT masivo
+            ids = dict(Attendee.objects.filter(
+                ticket_id__in=[attendee.ticket_id for attendee in created]
+            ).values_list('ticket_id', 'id'))
+            for attendee in created:
+                attendee.pk = ids[attendee.ticket_id]
+
+        attendee_ids = {ticket_id: attendee.pk for ticket_id, attendee in attendees.items()}
+        attendee_ids.update({attendee.ticket_id: attendee.pk for attendee in created})
+
+        CheckInLog.objects.bulk_create([
+            CheckInLog(
+                attendee_id=attendee_ids[ticket_id],
+                checked_in_at=scanned_at,
+                checked_in_by=user,
+                location=scan.get('location', ''),
+                notes=scan.get('notes', ''),
+                device_info=device_info,
+                ip_address=ip_address,
+            )
+            for ticket_id, (_, _, scan, scanned_at) in accepted.items()
+        ])
+
+        by_event = defaultdict(Counter)
+        for _, ticket, _, _ in accepted.values():
+            by_event[ticket.ticket_type.event_id][ticket.ticket_type_id] += 1
+        for event_id, counts in by_event.items():
+            StatisticsService.record_check_ins(event_id, counts)
+
+        JobService.enqueue_many(
+            'attendees.send_check_in_confirmation',
+            [{'attendee_id': attendee_ids[ticket_id]} for ticket_id in accepted],
+        )
+
+        for ticket_id, (index, _, _, _) in accepted.items():
+            results[index]['attendee'] = attendee_ids[ticket_id]
@@ -1,16 +1,28 @@
 """
 Tests para asistentes.
 """
-from django.test import TestCase
+import csv
+import gzip
+import io
+import threading
+
+from django.core import mail
+from django.db import OperationalError, close_old_connections
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 from rest_framework import status
 
 from apps.events.models import Event, Category, Venue
+from apps.jobs.models import Job
 from apps.tickets.models import TicketType, Ticket
 from .models import Attendee, CheckInLog, Survey
+from .serializers import AttendeeDetailSerializer
+from .services import CheckInService, CheckInError
 
 
 class AttendeeModelTest(TestCase):
@@ -116,4 +128,474 @@ class SurveyModelTest(TestCase):
     
     def test_is_active(self):
         """Test de verificación de encuesta activa."""
-        self.assertTrue(self.survey.is_active)
\ No newline at end of file
+        self.assertTrue(self.survey.is_active)
+
+
+class CheckInBatchTest(APITestCase):
+    """Tests para el check-in por lotes."""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username='organizer', password='test123')
+        self.category = Category.objects.create(name="Conciertos")
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            category=self.category,
+            organizer=self.organizer,
+            start_date=timezone.now() + timedelta(hours=1),
+            end_date=timezone.now() + timedelta(hours=4),
+            capacity=500,
+            status='published'
+        )
+        self.ticket_type = TicketType.objects.create(
+            event=self.event, name="General", price=50000, quantity=200
+        )
+        self.client.force_authenticate(user=self.organizer)
+
+    def create_tickets(self, count):
+        tickets = []
+        for i in range(len(Ticket.objects.all()), len(Ticket.objects.all()) + count):
+            buyer = User.objects.create_user(username=f'buyer{i}', password='test123')
+            tickets.append(Ticket.objects.create(
+                ticket_type=self.ticket_type,
+                buyer=buyer,
+                attendee_name=f"Asistente {i}",
+                attendee_email=f"asistente{i}@example.com",
+                purchase_price=50000
+            ))
+        return tickets
+
+    def upload(self, scans, **extra):
+        return self.client.post(
+            '/api/attendees/check_in_batch/', {'scans': scans, **extra}, format='json'
+        )
+
+    def test_batch_check_in(self):
+        """Test de lote con escaneos sin conexión, repetidos y desconocidos."""
+        tickets = self.create_tickets(3)
+        offline_at = timezone.now() - timedelta(minutes=30)
+        scans = [
+            {'scan_id': 'a', 'ticket_code': tickets[0].code, 'scanned_at': offline_at.isoformat()},
+            {'scan_id': 'b', 'ticket_uuid': str(tickets[1].uuid)},
+            {'scan_id': 'c', 'ticket_token': tickets[2].signed_token, 'location': 'Puerta 2'},
+            {'scan_id': 'd', 'ticket_code': tickets[0].code},
+            {'scan_id': 'e', 'ticket_uuid': '00000000-0000-0000-0000-000000000000'},
+        ]
+
+        response = self.upload(scans, event=self.event.id)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['checked_in'], 3)
+        self.assertEqual(response.data['conflicts'], 1)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(
+            statuses, ['checked_in', 'checked_in', 'checked_in', 'duplicate', 'not_found']
+        )
+
+        attendee = Attendee.objects.get(ticket=tickets[0])
+        self.assertEqual(attendee.status, 'checked_in')
+        self.assertEqual(attendee.checked_in_at, offline_at)
+        self.assertEqual(CheckInLog.objects.get(attendee=attendee).checked_in_at, offline_at)
+        self.assertEqual(CheckInLog.objects.count(), 3)
+        self.assertFalse(Ticket.objects.filter(status='active').exists())
+        self.assertEqual(
+            Job.objects.filter(name='attendees.send_check_in_confirmation').count(), 3
+        )
+
+    def test_already_checked_in_is_conflict(self):
+        """Test de ticket ya usado en otro lote."""
+        ticket = self.create_tickets(1)[0]
+        self.upload([{'ticket_code': ticket.code}])
+
+        response = self.upload([{'ticket_code': ticket.code}])
+
+        result = response.data['results'][0]
+        self.assertEqual(result['status'], 'already_checked_in')
+        self.assertIsNotNone(result['checked_in_at'])
+        self.assertEqual(CheckInLog.objects.count(), 1)
+
+    def test_existing_attendee_and_typo(self):
+        """Test de asistente ya registrado y código mal digitado."""
+        ticket = self.create_tickets(1)[0]
+        Attendee.objects.create(
+            user=ticket.buyer, ticket=ticket, event=self.event,
+            full_name=ticket.attendee_name, email=ticket.attendee_email
+        )
+        typo = ticket.code[:-1] + ('0' if ticket.code[-1] != '0' else '1')
+
+        response = self.upload([{'ticket_code': ticket.code}, {'ticket_code': typo}])
+
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['checked_in', 'invalid']
+        )
+        self.assertEqual(Attendee.objects.get().status, 'checked_in')
+
+    def test_requires_organizer(self):
+        """Test de lote subido por un usuario que no organiza el evento."""
+        ticket = self.create_tickets(1)[0]
+        self.client.force_authenticate(user=ticket.buyer)
+
+        response = self.upload([{'ticket_code': ticket.code}])
+
+        self.assertEqual(response.data['results'][0]['status'], 'forbidden')
+        self.assertFalse(Attendee.objects.exists())
+
+    def test_query_count_is_independent_of_batch_size(self):
+        """Test de número constante de consultas por lote."""
+        small = self.create_tickets(2)
+        large = self.create_tickets(40)
+
+        with CaptureQueriesContext(connection) as small_ctx:
+            self.upload([{'ticket_code': t.code} for t in small])
+        with CaptureQueriesContext(connection) as large_ctx:
+            response = self.upload([{'ticket_code': t.code} for t in large])
+
+        self.assertEqual(response.data['checked_in'], 40)
+        self.assertEqual(len(small_ctx.captured_queries), len(large_ctx.captured_queries))
+
+
+class CheckInAPITest(APITestCase):
+    """Tests para el check-in de un solo escaneo."""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username='organizer', password='test123')
+        self.category = Category.objects.create(name="Conciertos")
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            category=self.category,
+            organizer=self.organizer,
+            start_date=timezone.now() + timedelta(hours=1),
+            end_date=timezone.now() + timedelta(hours=4),
+            capacity=500,
+            status='published'
+        )
+        self.ticket_type = TicketType.objects.create(
+            event=self.event, name="General", price=50000, quantity=100
+        )
+        self.ticket = Ticket.objects.create(
+            ticket_type=self.ticket_type,
+            buyer=self.organizer,
+            attendee_name="Juan Pérez",
+            attendee_email="juan@example.com",
+            purchase_price=50000
+        )
+        self.client.force_authenticate(user=self.organizer)
+
+    def test_check_in(self):
+        """Test de check-in con pocas consultas y email en segundo plano."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                '/api/attendees/check_in/', {'ticket_code': self.ticket.code.lower()}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['attendee']['status'], 'checked_in')
+        self.assertEqual(response.data['check_in_log']['event_title'], "Test Event")
+        # 1 lectura + UPDATE ticket + INSERT asistente + INSERT registro
+        # + INSERT trabajo + 2 UPDATE de estadísticas (EventStatistics y
+        # TicketTypeStatistics son tablas distintas: no caben en un UPDATE, y
+        # sumarlas fuera de esta transacción las desfasaría de rebuild())
+        queries = [q['sql'] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len([sql for sql in queries if sql.startswith('SELECT')]), 1)
+        self.assertEqual(len(queries), 7)
+
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, 'used')
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(Job.objects.filter(name='attendees.send_check_in_confirmation').exists())
+
+    def test_check_in_response_matches_detail(self):
+        """Test de que la respuesta de check-in es el detalle del asistente."""
+        Attendee.objects.create(
+            user=self.organizer, ticket=self.ticket, event=self.event,
+            full_name="Juan Pérez", email="juan@example.com",
+        )
+
+        response = self.client.post('/api/attendees/check_in/', {'ticket_uuid': str(self.ticket.uuid)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        attendee = Attendee.objects.get(ticket=self.ticket)
+        self.assertEqual(response.data['attendee'], AttendeeDetailSerializer(attendee).data)
+        self.assertEqual(response.data['attendee']['total_check_ins'], 1)
+        self.assertEqual(len(response.data['attendee']['check_in_history']), 1)
+
+    def test_second_scan_is_conflict(self):
+        """Test de doble escaneo del mismo ticket."""
+        self.client.post('/api/attendees/check_in/', {'ticket_uuid': str(self.ticket.uuid)})
+
+        response = self.client.post(
+            '/api/attendees/check_in/', {'ticket_uuid': str(self.ticket.uuid)}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertIsNotNone(response.data['checked_in_at'])
+        self.assertEqual(CheckInLog.objects.count(), 1)
+
+    def test_check_in_with_token(self):
+        """Test de check-in con el token firmado del QR."""
+        response = self.client.post(
+            '/api/attendees/check_in/', {'ticket_token': self.ticket.signed_token}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_check_in_outside_window(self):
+        """Test de check-in antes de abrir puertas."""
+        Event.objects.filter(pk=self.event.pk).update(
+            start_date=timezone.now() + timedelta(days=2),
+            end_date=timezone.now() + timedelta(days=2, hours=3),
+        )
+        response = self.client.post('/api/attendees/check_in/', {'ticket_code': self.ticket.code})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConcurrentCheckInTest(TransactionTestCase):
+    """Test de dos puertas escaneando el mismo ticket a la vez."""
+
+    def test_only_one_gate_wins(self):
+        """Test de que un ticket solo entra una vez."""
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("Requiere una base de datos compartida entre hilos")
+
+        organizer = User.objects.create_user(username='organizer', password='test123')
+        event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            category=Category.objects.create(name="Conciertos"),
+            organizer=organizer,
+            start_date=timezone.now() + timedelta(hours=1),
+            end_date=timezone.now() + timedelta(hours=4),
+            capacity=500,
+            status='published'
+        )
+        ticket = Ticket.objects.create(
+            ticket_type=TicketType.objects.create(
+                event=event, name="General", price=50000, quantity=100
+            ),
+            buyer=organizer,
+            attendee_name="Juan Pérez",
+            attendee_email="juan@example.com",
+            purchase_price=50000
+        )
+
+        outcomes = []
+        barrier = threading.Barrier(8)
+
+        def gate():
+            try:
+                barrier.wait()
+                CheckInService.check_in({'pk': ticket.pk}, user=organizer)
+                outcomes.append('ok')
+            except CheckInError:
+                outcomes.append('conflict')
+            except OperationalError:
+                # SQLite: escritor concurrente bloqueado
+                outcomes.append('locked')
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=gate) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(outcomes.count('ok'), 1)
+        self.assertEqual(CheckInLog.objects.count(), 1)
+        self.assertEqual(Attendee.objects.get().status, 'checked_in')
+
+
+class CheckInLogPaginationTest(APITestCase):
+    """Tests de paginación por cursor de los registros de check-in."""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username='organizer', password='test123')
+        self.buyer = User.objects.create_user(username='buyer', password='test123')
+        category = Category.objects.create(name="Conciertos")
+        self.event = Event.objects.create(
+            title="Festival",
+            description="Evento de varios días",
+            category=category,
+            organizer=self.organizer,
+            start_date=timezone.now() + timedelta(hours=1),
+            end_date=timezone.now() + timedelta(days=3),
+            capacity=500,
+            status='published'
+        )
+        ticket_type = TicketType.objects.create(
+            event=self.event, name="General", price=0, quantity=100
+        )
+        ticket = Ticket.objects.create(
+            ticket_type=ticket_type,
+            buyer=self.buyer,
+            attendee_name="Ana Gómez",
+            attendee_email="ana@example.com",
+            purchase_price=0
+        )
+        attendee = Attendee.objects.create(
+            user=self.buyer, ticket=ticket, event=self.event,
+            full_name="Ana Gómez", email="ana@example.com"
+        )
+        # Pares de check-ins con la misma hora: el id desempata
+        base = timezone.now()
+        CheckInLog.objects.bulk_create([
+            CheckInLog(attendee=attendee, checked_in_at=base + timedelta(hours=i // 2))
+            for i in range(12)
+        ])
+        self.expected = list(
+            CheckInLog.objects.order_by('-checked_in_at', '-id').values_list('id', flat=True)
+        )
+
+    def test_cursor_pages(self):
+        """Test de recorrido completo con ?cursor=."""
+        self.client.force_authenticate(user=self.organizer)
+        seen = []
+        url = f'/api/attendees/check_in_logs/?event_id={self.event.id}&cursor=&page_size=5'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [log['id'] for log in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(seen, self.expected)
+
+    def test_page_number_and_visibility(self):
+        """Test de paginación por número y registros ajenos ocultos."""
+        self.client.force_authenticate(user=self.organizer)
+        response = self.client.get('/api/attendees/check_in_logs/', {'event_id': self.event.id})
+        self.assertEqual(response.data['count'], 12)
+
+        stranger = User.objects.create_user(username='stranger', password='test123')
+        self.client.force_authenticate(user=stranger)
+        response = self.client.get('/api/attendees/check_in_logs/', {'event_id': self.event.id})
+        self.assertEqual(response.data['count'], 0)
+
+
+class CompiledAttendeeSerializerTest(APITestCase):
+    """Tests del listado de asistentes con el serializer compilado."""
+
+    def setUp(self):
+        organizer = User.objects.create_user(username='organizer', password='test123')
+        self.buyer = User.objects.create_user(username='buyer', password='test123')
+        # Un asistente por usuario y evento
+        buyers = iter(User.objects.create_user(username=f'buyer{i}', password='test123') for i in range(6))
+        category = Category.objects.create(name="Conciertos")
+        for hours in (1, 24 * 10):
+            event = Event.objects.create(
+                title=f"Evento {hours}",
+                description="Descripción",
+                category=category,
+                organizer=organizer,
+                start_date=timezone.now() + timedelta(hours=hours),
+                end_date=timezone.now() + timedelta(hours=hours + 3),
+                capacity=500,
+                status='published'
+            )
+            ticket_type = TicketType.objects.create(event=event, name="General", price=0, quantity=100)
+            for attendee_status, ticket_status in (
+                ('registered', 'active'), ('registered', 'cancelled'), ('checked_in', 'used'),
+            ):
+                ticket = Ticket.objects.create(
+                    ticket_type=ticket_type, buyer=self.buyer, status=ticket_status,
+                    attendee_name="Ana Gómez", attendee_email="ana@example.com", purchase_price=0
+                )
+                attendee = Attendee.objects.create(
+                    user=next(buyers), ticket=ticket, event=event, status=attendee_status,
+                    full_name="Ana Gómez", email="ana@example.com"
+                )
+                if attendee_status == 'checked_in':
+                    CheckInLog.objects.create(attendee=attendee)
+                    CheckInLog.objects.create(attendee=attendee)
+        self.client.force_authenticate(user=User.objects.create_user(
+            username='staff', password='test123', is_staff=True
+        ))
+
+    def test_same_output_as_serializer(self):
+        """Test de que la salida compilada es idéntica a la de DRF"""
+        response = self.client.get('/api/attendees/')
+        with override_settings(COMPILED_SERIALIZERS_ENABLED=False):
+            expected = self.client.get('/api/attendees/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, expected.content)
+        results = response.data['results']
+        self.assertEqual(sum(a['can_check_in'] for a in results), 1)
+        self.assertEqual(sorted(a['total_check_ins'] for a in results), [0, 0, 0, 0, 2, 2])
+
+    def test_single_query_for_counts(self):
+        """Test de que total_check_ins no consulta por fila"""
+        with self.assertNumQueries(2):  # COUNT y página
+            self.client.get('/api/attendees/')
+
+
+class AttendeeExportTest(APITestCase):
+    """Tests de la exportación de asistentes a CSV."""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username='organizer', password='test123')
+        self.event = Event.objects.create(
+            title="Concierto",
+            description="Descripción",
+            category=Category.objects.create(name="Conciertos"),
+            organizer=self.organizer,
+            start_date=timezone.now() + timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=1, hours=3),
+            capacity=500,
+            status='published'
+        )
+        self.ticket_type = TicketType.objects.create(event=self.event, name="VIP", price=0, quantity=100)
+        self.client.force_authenticate(user=self.organizer)
+
+    def create_attendees(self, count):
+        for i in range(count):
+            user = User.objects.create_user(username=f'asistente{Attendee.objects.count()}', password='test123')
+            ticket = Ticket.objects.create(
+                ticket_type=self.ticket_type, buyer=user,
+                attendee_name="Ana", attendee_email="ana@example.com", purchase_price=0
+            )
+            attendee = Attendee.objects.create(
+                user=user, ticket=ticket, event=self.event,
+                full_name=f"Ana Gómez, {i}", email="ana@example.com"
+            )
+            for _ in range(i % 3):
+                CheckInLog.objects.create(attendee=attendee)
+
+    def export(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/attendees/export/', {'event_id': self.event.id, **params})
+            content = response.getvalue()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, content, len(ctx)
+
+    def test_csv_with_constant_queries(self):
+        """Test de CSV en streaming con consultas constantes"""
+        self.create_attendees(2)
+        _, _, few = self.export()
+        self.create_attendees(4)
+        response, content, many = self.export()
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(few, many)
+        rows = list(csv.reader(io.StringIO(content.decode())))
+        self.assertEqual(rows[0][0], 'ID')
+        self.assertEqual(len(rows), 7)
+        by_id = {int(row[0]): row for row in rows[1:]}
+        for attendee in Attendee.objects.all():
+            row = by_id[attendee.pk]
+            self.assertEqual(row[2], attendee.full_name)
+            self.assertEqual(row[7], attendee.ticket.code)
+            self.assertEqual(row[8], "VIP")
+            self.assertEqual(int(row[11]), attendee.total_check_ins)
+
+    def test_gzip(self):
+        """Test de exportación comprimida con ?gzip=true"""
+        self.create_attendees(3)
+        _, plain, _ = self.export()
+        response, content, _ = self.export(gzip='true')
+
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('.csv.gz', response['Content-Disposition'])
+        self.assertEqual(gzip.decompress(content), plain)
@@ -6,13 +6,10 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from django.db import transaction
-from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-import csv
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.db import models
-from core.emails import EmailService
 
 import logging
 from django.shortcuts import get_object_or_404
@@ -20,18 +17,25 @@ from rest_framework import viewsets, status
 
 from .models import Attendee, CheckInLog, Survey, SurveyQuestion, SurveyResponse
 from .serializers import (
-    AttendeeSerializer, AttendeeDetailSerializer, CheckInSerializer,
+    AttendeeSerializer, AttendeeDetailSerializer, CheckInSerializer, CheckInBatchSerializer,
     CheckInLogSerializer, SurveySerializer, SurveyDetailSerializer,
     SurveyQuestionSerializer, SurveyResponseSerializer,
     SubmitSurveySerializer, AttendeeExportSerializer
 )
+from .exports import AttendeeExportService
 from .filters import AttendeeFilter
+from .services import CheckInService, CheckInError, CHECKED_IN, CONFLICT_STATUSES
 from apps.tickets.models import Ticket
+from core.pagination import KeysetPagination
 from core.permissions import IsEventOrganizer
+from core.compiled import CompiledListMixin
+from core.sparse import SparseQuerysetMixin
+from core.streaming import streaming_response
+from core.utils import normalize_ticket_code
 
 logger = logging.getLogger(__name__)
 
-class AttendeeViewSet(viewsets.ModelViewSet):
+class AttendeeViewSet(CompiledListMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de asistentes.
     
@@ -40,23 +44,35 @@ class AttendeeViewSet(viewsets.ModelViewSet):
     create: Crear asistente
     update: Actualizar asistente
     check_in: Realizar check-in
+    check_in_batch: Subir un lote de escaneos (incluidos los hechos sin conexión)
     my_attendances: Obtener asistencias del usuario
+    check_in_logs: Registros de check-in de un evento
     export: Exportar asistentes a CSV
     """
     queryset = Attendee.objects.select_related(
         'user', 'ticket', 'event', 'checked_in_by'
     ).all()
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_class = AttendeeFilter
     search_fields = ['full_name', 'email', 'document_number']
     ordering_fields = ['created_at', 'checked_in_at', 'status']
 
+    @property
+    def cursor_ordering(self):
+        """Orden de ``?cursor=`` (ver core/pagination.py)."""
+        if self.action == 'check_in_logs':
+            return ('-checked_in_at', '-id')
+        return ('-created_at', '-id')
+
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return AttendeeDetailSerializer
         elif self.action == 'check_in':
             return CheckInSerializer
+        elif self.action == 'check_in_batch':
+            return CheckInBatchSerializer
         elif self.action == 'export':
             return AttendeeExportSerializer
         return AttendeeSerializer
@@ -73,100 +89,79 @@ class AttendeeViewSet(viewsets.ModelViewSet):
         )
 
     @action(detail=False, methods=['post'])
-    @transaction.atomic
     def check_in(self, request):
         """
         Realizar check-in de un asistente.
+
+        Ruta rápida para una puerta: una lectura y cuatro escrituras de una
+        fila (ver ``CheckInService.check_in``). El email de confirmación se
+        envía en segundo plano. Si el ticket ya fue usado responde 409.
         """
         serializer = CheckInSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        
-        ticket_code = serializer.validated_data.get('ticket_code')
-        ticket_uuid = serializer.validated_data.get('ticket_uuid')
-        location = serializer.validated_data.get('location', '')
-        notes = serializer.validated_data.get('notes', '')
-        
-        try:
-            # Buscar ticket
-            if ticket_code:
-                ticket = Ticket.objects.get(code=ticket_code)
-            else:
-                ticket = Ticket.objects.get(uuid=ticket_uuid)
-            
-            # Buscar o crear asistente
-            attendee, created = Attendee.objects.get_or_create(
-                ticket=ticket,
-                event=ticket.ticket_type.event,
-                defaults={
-                    'user': ticket.buyer,
-                    'full_name': ticket.attendee_name,
-                    'email': ticket.attendee_email,
-                    'phone': ticket.attendee_phone,
-                }
-            )
-            
-            # Verificar si puede hacer check-in
-            if not attendee.can_check_in:
-                return Response(
-                    {'error': 'No se puede realizar check-in en este momento'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Registrar check-in
-            check_in_log = CheckInLog.objects.create(
-                attendee=attendee,
-                checked_in_by=request.user,
-                location=location,
-                notes=notes,
-                ip_address=self.get_client_ip(request)
-            )
+        data = serializer.validated_data
 
-            # Enviar confirmación de check-in
-            try:
-                EmailService.send_check_in_confirmation(attendee)
-            except Exception as e:
-                logger.error(f"Error enviando email de check-in: {e}")
-            
-            # Actualizar estado del asistente
-            if attendee.status == 'registered':
-                attendee.status = 'checked_in'
-                attendee.checked_in_at = timezone.now()
-                attendee.checked_in_by = request.user
-                attendee.save()
-
-            # Enviar confirmación de check-in
-            from core.emails import EmailService
-            import logging
-            logger = logging.getLogger(__name__)
+        # La firma del token ya la verificó el serializer
+        if data.get('ticket_token'):
+            lookup = {'pk': data['ticket_token']['ticket_id']}
+        elif data.get('ticket_code'):
+            lookup = {'code': normalize_ticket_code(data['ticket_code'])}
+        else:
+            lookup = {'uuid': data['ticket_uuid']}
 
-            try:
-                EmailService.send_check_in_confirmation(attendee)
-                logger.info(f"Email de check-in enviado para {attendee.email}")
-            except Exception as e:
-                logger.error(f"Error enviando email de check-in: {e}")
-            
-            # Marcar ticket como usado si es el primer check-in
-            if ticket.status == 'active' and attendee.total_check_ins == 1:
-                ticket.status = 'used'
-                ticket.used_at = timezone.now()
-                ticket.save()
-            
-            return Response({
-                'message': 'Check-in realizado exitosamente',
-                'attendee': AttendeeDetailSerializer(attendee).data,
-                'check_in_log': CheckInLogSerializer(check_in_log).data
-            }, status=status.HTTP_200_OK)
-            
+        try:
+            attendee, check_in_log = CheckInService.check_in(
+                lookup,
+                user=request.user,
+                location=data.get('location', ''),
+                notes=data.get('notes', ''),
+                ip_address=self.get_client_ip(request),
+            )
         except Ticket.DoesNotExist:
             return Response(
                 {'error': 'Ticket no encontrado'},
                 status=status.HTTP_404_NOT_FOUND
             )
-        except Exception as e:
-            return Response(
-                {'error': f'Error en check-in: {str(e)}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        except CheckInError as e:
+            if e.conflict:
+                return Response(
+                    {'error': str(e), 'checked_in_at': e.checked_in_at},
+                    status=status.HTTP_409_CONFLICT
+                )
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'message': 'Check-in realizado exitosamente',
+            'attendee': AttendeeDetailSerializer(attendee).data,
+            'check_in_log': CheckInLogSerializer(check_in_log).data
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def check_in_batch(self, request):
+        """
+        Registrar un lote de escaneos de una puerta.
+
+        Cada escaneo puede traer su ``scanned_at`` original si se hizo sin
+        conexión. La respuesta trae un resultado por escaneo; los conflictos
+        (ticket ya usado, repetido en el lote, etc.) no hacen fallar el lote.
+        """
+        serializer = CheckInBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = CheckInService.check_in_batch(
+            serializer.validated_data['scans'],
+            user=request.user,
+            ip_address=self.get_client_ip(request),
+            device_info=serializer.validated_data.get('device_info', ''),
+            event_id=serializer.validated_data.get('event'),
+        )
+
+        return Response({
+            'processed': len(results),
+            'checked_in': sum(1 for result in results if result['status'] == CHECKED_IN),
+            'conflicts': sum(1 for result in results if result['status'] in CONFLICT_STATUSES),
+            'results': results,
+        }, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=['get'])
     def my_attendances(self, request):
@@ -174,8 +169,7 @@ class AttendeeViewSet(viewsets.ModelViewSet):
         Obtener asistencias del usuario autenticado.
         """
         attendees = self.queryset.filter(user=request.user)
-        serializer = self.get_serializer(attendees, many=True)
-        return Response(serializer.data)
+        return streaming_response(request, self.get_serializer(attendees, many=True))
 
     @action(detail=False, methods=['get'])
     def by_event(self, request):
@@ -190,13 +184,44 @@ class AttendeeViewSet(viewsets.ModelViewSet):
             )
         
         attendees = self.queryset.filter(event_id=event_id)
-        serializer = self.get_serializer(attendees, many=True)
-        return Response(serializer.data)
+        # Con ?cursor= se pagina; sin él se mantiene la lista completa
+        if self.paginator.is_keyset(request):
+            page = self.paginate_queryset(attendees)
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return streaming_response(request, self.get_serializer(attendees, many=True))
+
+    @action(detail=False, methods=['get'])
+    def check_in_logs(self, request):
+        """
+        Registros de check-in de un evento, del más reciente al más antiguo.
+
+        Paginado por número de página o, con ``?cursor=``, por cursor.
+        """
+        event_id = request.query_params.get('event_id')
+        if not event_id:
+            return Response(
+                {'error': 'Se requiere event_id'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        logs = CheckInLog.objects.select_related(
+            'attendee', 'attendee__event', 'checked_in_by'
+        ).filter(attendee__event_id=event_id).order_by('-checked_in_at', '-id')
+        if not request.user.is_staff:
+            logs = logs.filter(
+                models.Q(attendee__user=request.user) |
+                models.Q(attendee__event__organizer=request.user)
+            )
+
+        page = self.paginate_queryset(logs)
+        return self.get_paginated_response(CheckInLogSerializer(page, many=True).data)
 
     @action(detail=False, methods=['get'])
     def export(self, request):
         """
         Exportar asistentes a CSV.
+
+        Query params: event_id y gzip (``true`` para descargar ``.csv.gz``).
         """
         event_id = request.query_params.get('event_id')
         if not event_id:
@@ -214,36 +239,14 @@ class AttendeeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Crear respuesta CSV
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="attendees_event_{event_id}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'ID', 'Evento', 'Nombre', 'Email', 'Teléfono',
-            'Tipo Documento', 'Número Documento', 'Código Ticket',
-            'Tipo Ticket', 'Estado', 'Check-in', 'Número de Check-ins',
-            'Requerimientos Especiales', 'Restricciones Alimentarias'
-        ])
-        
-        for attendee in attendees:
-            writer.writerow([
-                attendee.id,
-                attendee.event.title,
-                attendee.full_name,
-                attendee.email,
-                attendee.phone,
-                attendee.document_type,
-                attendee.document_number,
-                attendee.ticket.code,
-                attendee.ticket.ticket_type.name,
-                attendee.status,
-                attendee.checked_in_at.strftime('%Y-%m-%d %H:%M') if attendee.checked_in_at else '',
-                attendee.total_check_ins,
-                attendee.special_requirements,
-                attendee.dietary_restrictions
-            ])
-        
+        # CSV en streaming (ver exports.py); ?gzip=true lo comprime
+        compress = request.query_params.get('gzip') == 'true'
+        filename = f'attendees_event_{event_id}.csv' + ('.gz' if compress else '')
+        response = StreamingHttpResponse(
+            AttendeeExportService.csv_chunks(attendees, gzip=compress),
+            content_type='application/gzip' if compress else 'text/csv',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
         return response
 
     def get_client_ip(self, request):
@@ -256,7 +259,7 @@ class AttendeeViewSet(viewsets.ModelViewSet):
         return ip
 
 
-class SurveyViewSet(viewsets.ModelViewSet):
+class SurveyViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de encuestas.
     
@@ -266,16 +269,25 @@ class SurveyViewSet(viewsets.ModelViewSet):
     update: Actualizar encuesta
     destroy: Eliminar encuesta
     submit_responses: Enviar respuestas
+    responses: Listar respuestas (paginadas)
     results: Ver resultados
     statistics: Ver estadísticas
     """
     queryset = Survey.objects.select_related('event', 'created_by').all()
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'start_date', 'end_date']
     filterset_fields = ['event', 'status', 'is_anonymous']
 
+    @property
+    def cursor_ordering(self):
+        """Orden de ``?cursor=`` (ver core/pagination.py)."""
+        if self.action == 'responses':
+            return ('-responded_at', '-id')
+        return ('-created_at', '-id')
+
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return SurveyDetailSerializer
@@ -396,6 +408,28 @@ class SurveyViewSet(viewsets.ModelViewSet):
             'results': results
         })
 
+    @action(detail=True, methods=['get'])
+    def responses(self, request, pk=None):
+        """
+        Respuestas de la encuesta, de la más reciente a la más antigua.
+
+        Paginado por número de página o, con ``?cursor=``, por cursor.
+        """
+        survey = self.get_object()
+
+        # Solo el organizador puede ver las respuestas
+        if survey.event.organizer != request.user and not request.user.is_staff:
+            return Response(
+                {'error': 'No tienes permiso para ver estos resultados'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        responses = SurveyResponse.objects.select_related(
+            'question', 'question__survey', 'respondent'
+        ).filter(question__survey=survey).order_by('-responded_at', '-id')
+        page = self.paginate_queryset(responses)
+        return self.get_paginated_response(SurveyResponseSerializer(page, many=True).data)
+
     @action(detail=True, methods=['get'])
     def statistics(self, request, pk=None):
         """
@@ -2,7 +2,7 @@
 Configuración del admin para eventos.
 """
 from django.contrib import admin
-from .models import Category, Venue, Event
+from .models import Category, Venue, Event, Tag
 
 
 @admin.register(Category)
@@ -20,6 +20,14 @@ class VenueAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
 
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug', 'created_at']
+    search_fields = ['name', 'slug']
+    prepopulated_fields = {'slug': ('name',)}
+    readonly_fields = ['created_at']
+
+
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     list_display = ['title', 'category', 'venue', 'status', 'start_date', 'organizer', 'tickets_sold']
@@ -50,4 +58,8 @@ class EventAdmin(admin.ModelAdmin):
         ('Estadísticas', {
             'fields': ('views_count', 'created_at', 'updated_at')
         }),
-    )
\ No newline at end of file
+    )
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'category', 'venue', 'organizer'
+        ).with_ticket_totals()
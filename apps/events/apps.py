@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class EventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.events'
-    verbose_name = 'Gestión de Eventos'
\ No newline at end of file
+    verbose_name = 'Gestión de Eventos'
+
+    def ready(self):
+        # Versiones del cache del catálogo
+        from . import signals  # noqa: F401
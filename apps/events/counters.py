@@ -0,0 +1,189 @@
+"""
+Contador de vistas de eventos con buffer.
+
+Ver el detalle de un evento no escribe en la base de datos:
+
+1. Cada proceso suma las vistas en memoria.
+2. Cada ``EVENT_VIEWS_SPOOL_INTERVAL`` segundos las vuelca a un archivo nuevo
+   en ``EVENT_VIEWS_SPOOL_DIR`` (escrito con otro nombre y renombrado, así que
+   nunca se lee a medias). Si el proceso muere se pierden como mucho las
+   vistas de ese intervalo.
+3. Cada ``EVENT_VIEWS_FLUSH_INTERVAL`` segundos, el proceso al que le toca
+   reclama los archivos renombrándolos (solo uno gana cada archivo), suma
+   los deltas y los aplica con un solo UPDATE por lote de eventos.
+
+``manage.py flush_event_views`` fuerza el paso 3, por ejemplo desde cron o
+antes de un despliegue.
+"""
+import atexit
+import itertools
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+SPOOL_SUFFIX = '.views'
+CLAIMED_SUFFIX = '.flushing'
+# Un archivo reclamado hace más de esto se considera abandonado
+STALE_CLAIM_SECONDS = 600
+_UPDATE_BATCH = 500
+
+
+class ViewCounter:
+    """Acumula vistas por evento y las aplica en lote."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._pending = Counter()
+        self._last_spill = self._last_flush = time.monotonic()
+        self._sequence = itertools.count()
+
+    def increment(self, event_id, amount=1):
+        """Registrar ``amount`` vistas de un evento."""
+        now = time.monotonic()
+        with self._lock:
+            # Un proceso hijo (fork de gunicorn) empieza con su propio buffer
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._pending.clear()
+                self._last_spill = self._last_flush = now
+
+            self._pending[event_id] += amount
+            spill = now - self._last_spill >= settings.EVENT_VIEWS_SPOOL_INTERVAL
+            flush = now - self._last_flush >= settings.EVENT_VIEWS_FLUSH_INTERVAL
+            if flush:
+                self._last_flush = now
+
+        if flush:
+            self.flush()
+        elif spill:
+            self.spill()
+
+    def pending(self, event_id):
+        """Vistas de este proceso que aún no están en un archivo."""
+        with self._lock:
+            return self._pending.get(event_id, 0)
+
+    def spill(self):
+        """Volcar el buffer de este proceso a un archivo de la cola."""
+        with self._lock:
+            deltas, self._pending = self._pending, Counter()
+            self._last_spill = time.monotonic()
+
+        if not deltas:
+            return
+
+        directory = settings.EVENT_VIEWS_SPOOL_DIR
+        os.makedirs(directory, exist_ok=True)
+        name = f'{os.getpid()}-{time.time_ns()}-{next(self._sequence)}'
+        path = os.path.join(directory, name + SPOOL_SUFFIX)
+        tmp_path = os.path.join(directory, f'.{name}.tmp')
+        try:
+            with open(tmp_path, 'w') as spool:
+                spool.writelines(f'{event_id} {delta}\n' for event_id, delta in deltas.items())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # Devolver las vistas al buffer para el siguiente intento
+            logger.error(f"No se pudo escribir el archivo de vistas {path}: {e}")
+            with self._lock:
+                self._pending.update(deltas)
+
+    def flush(self):
+        """
+        Aplicar a la base de datos todas las vistas en cola.
+
+        Returns:
+            int: vistas aplicadas
+        """
+        self.spill()
+
+        claimed = self._claim()
+        deltas = Counter()
+        for path in claimed:
+            with open(path) as spool:
+                for line in spool:
+                    event_id, delta = line.split()
+                    deltas[int(event_id)] += int(delta)
+
+        try:
+            apply_view_deltas(deltas)
+        except DatabaseError as e:
+            # Devolver los archivos a la cola para el siguiente flush
+            logger.error(f"No se pudieron aplicar las vistas de eventos: {e}")
+            for path in claimed:
+                os.replace(path, _base_path(path) + SPOOL_SUFFIX)
+            return 0
+
+        for path in claimed:
+            os.remove(path)
+        return sum(deltas.values())
+
+    def _claim(self):
+        """Renombrar los archivos de la cola para que solo este proceso los aplique."""
+        directory = settings.EVENT_VIEWS_SPOOL_DIR
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+
+        claimed = []
+        token = uuid.uuid4().hex
+        stale = time.time() - STALE_CLAIM_SECONDS
+        for name in names:
+            source = os.path.join(directory, name)
+            if name.endswith(CLAIMED_SUFFIX):
+                # Reclamado por un proceso que murió antes de aplicarlo
+                try:
+                    if os.path.getmtime(source) > stale:
+                        continue
+                except FileNotFoundError:
+                    continue
+            elif not name.endswith(SPOOL_SUFFIX):
+                continue
+
+            target = f'{_base_path(source)}.{token}{CLAIMED_SUFFIX}'
+            try:
+                os.rename(source, target)
+                os.utime(target)
+            except FileNotFoundError:
+                # Otro proceso lo reclamó primero
+                continue
+            claimed.append(target)
+        return claimed
+
+
+def _base_path(path):
+    """Ruta sin sufijos: ``<pid>-<ns>-<n>`` es el nombre original del archivo."""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, name.split('.')[0])
+
+
+@transaction.atomic
+def apply_view_deltas(deltas):
+    """Sumar ``deltas`` (event_id -> vistas) a ``views_count`` en lotes."""
+    event_ids = sorted(deltas)
+    for start in range(0, len(event_ids), _UPDATE_BATCH):
+        batch = event_ids[start:start + _UPDATE_BATCH]
+        Event.objects.filter(pk__in=batch).update(
+            views_count=F('views_count') + Case(
+                *[When(pk=event_id, then=Value(deltas[event_id])) for event_id in batch],
+                output_field=PositiveIntegerField(),
+            )
+        )
+
+
+view_counter = ViewCounter()
+
+# Al terminar el proceso de forma ordenada no se pierde el buffer
+atexit.register(view_counter.spill)
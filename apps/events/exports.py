@@ -0,0 +1,185 @@
+"""
+Reporte de un evento en Excel.
+
+El libro se escribe en modo write-only de openpyxl: cada fila va directo al
+archivo temporal de su hoja en vez de quedar como celda en memoria, y los
+tickets se recorren con ``iterator()`` desde ``values_list``. El ancho de
+las columnas se calcula antes de escribir con un solo ``aggregate`` (el
+largo máximo de cada texto), sin recorrer las celdas al final.
+
+Con más de ``EXCEL_EXPORT_ASYNC_THRESHOLD`` tickets el reporte lo genera el
+trabajo ``events.export_excel`` (ver ``jobs.py``) y queda en el storage
+para descargarlo desde la misma acción con ``?job=<id>``. Mientras escribe,
+el trabajo renueva su candado con ``JobService.heartbeat()`` para que un
+reporte más largo que ``JOBS_LOCK_TIMEOUT`` no lo empiece otro worker.
+"""
+import tempfile
+import uuid
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db.models import Count, Max
+from django.db.models.functions import Length
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from apps.jobs.models import Job
+from apps.jobs.services import JobService
+from apps.tickets.models import Ticket
+from .services import StatisticsService
+
+EXPORT_JOB = 'events.export_excel'
+CHUNK_SIZE = 2000
+MAX_COLUMN_WIDTH = 50
+CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+DATE_FORMAT = '%Y-%m-%d %H:%M'
+
+TICKET_HEADERS = ['Código', 'Tipo', 'Comprador', 'Email', 'Precio', 'Estado', 'Fecha Compra']
+# Columnas de texto cuyo ancho sale del largo máximo en la base de datos
+TEXT_COLUMNS = ('code', 'ticket_type__name', 'buyer__username', 'attendee_email')
+
+
+def column_width(length):
+    """Ancho de columna para un texto de ``length`` caracteres."""
+    return min(length + 2, MAX_COLUMN_WIDTH)
+
+
+class EventExportService:
+    """Exportación del reporte de un evento a Excel."""
+
+    @staticmethod
+    def ticket_summary(event):
+        """Cantidad de tickets y largo máximo de cada columna de texto."""
+        aggregates = {'count': Count('pk')}
+        for index, column in enumerate(TEXT_COLUMNS):
+            aggregates[f'length_{index}'] = Max(Length(column))
+        values = Ticket.objects.filter(ticket_type__event=event).order_by().aggregate(**aggregates)
+        return {
+            'count': values['count'],
+            'lengths': [values[f'length_{index}'] or 0 for index in range(len(TEXT_COLUMNS))],
+        }
+
+    @staticmethod
+    def ticket_rows(event):
+        """Filas de la hoja de tickets, por bloques de ``CHUNK_SIZE``."""
+        status_labels = dict(Ticket.STATUS_CHOICES)
+        rows = Ticket.objects.filter(ticket_type__event=event).values_list(
+            *TEXT_COLUMNS, 'purchase_price', 'discount_applied', 'status', 'purchased_at'
+        )
+        for code, type_name, buyer, email, price, discount, status, purchased_at in rows.iterator(
+            chunk_size=CHUNK_SIZE
+        ):
+            yield [
+                code, type_name, buyer, email,
+                float(price - discount),
+                status_labels.get(status, status),
+                purchased_at.strftime(DATE_FORMAT),
+            ]
+
+    @staticmethod
+    def write(event, fileobj, summary=None):
+        """
+        Escribir el reporte de ``event`` en ``fileobj`` (archivo binario).
+
+        Args:
+            event: Evento con ``category`` y ``venue`` cargados
+            fileobj: Archivo donde se guarda el .xlsx
+            summary: Resultado de ``ticket_summary`` si ya se calculó
+        """
+        totals = StatisticsService.get(event)
+        summary = summary or EventExportService.ticket_summary(event)
+
+        wb = Workbook(write_only=True)
+        header_fill = PatternFill(start_color="3498DB", end_color="3498DB", fill_type="solid")
+        header_font = Font(bold=True, color="FFFFFF")
+
+        def header(ws, values):
+            cells = []
+            for value in values:
+                cell = WriteOnlyCell(ws, value=value)
+                cell.fill = header_fill
+                cell.font = header_font
+                cells.append(cell)
+            return cells
+
+        # Hoja 1: Información del evento
+        info_data = [
+            ['Título', event.title],
+            ['Categoría', event.category.name],
+            ['Lugar', event.venue.name if event.venue else 'N/A'],
+            ['Fecha Inicio', event.start_date.strftime(DATE_FORMAT)],
+            ['Fecha Fin', event.end_date.strftime(DATE_FORMAT)],
+            ['Capacidad', event.capacity],
+            ['Tickets Vendidos', totals.tickets_sold],
+            ['Tickets Disponibles', max(event.capacity - totals.tickets_sold, 0)],
+            ['Tickets Cancelados', totals.tickets_cancelled],
+            ['Check-ins', totals.checked_in],
+            ['Ingresos Netos', float(totals.revenue)],
+            ['Estado', event.get_status_display()],
+        ]
+        ws1 = wb.create_sheet("Información del Evento")
+        # El título está combinado en A1:D1, así que no cuenta para el ancho
+        labels = ['Campo'] + [field for field, _ in info_data]
+        values = ['Valor'] + [str(value) for _, value in info_data]
+        ws1.column_dimensions['A'].width = column_width(max(map(len, labels)))
+        ws1.column_dimensions['B'].width = column_width(max(map(len, values)))
+        title = WriteOnlyCell(ws1, value='EventHub - Reporte de Evento')
+        title.font = Font(bold=True, size=16)
+        ws1.append([title])
+        ws1.merged_cells.add('A1:D1')
+        ws1.append([])
+        ws1.append(header(ws1, ['Campo', 'Valor']))
+        for row in info_data:
+            ws1.append(row)
+
+        # Hoja 2: Tickets vendidos
+        ws2 = wb.create_sheet("Tickets Vendidos")
+        widths = [
+            max(length, len(name)) for length, name in zip(summary['lengths'], TICKET_HEADERS)
+        ] + [
+            len('Precio') + 6,
+            max(len(label) for label in ['Estado', *dict(Ticket.STATUS_CHOICES).values()]),
+            len('Fecha Compra'),
+        ]
+        for index, width in enumerate(widths, start=1):
+            ws2.column_dimensions[get_column_letter(index)].width = column_width(width)
+        ws2.append(header(ws2, TICKET_HEADERS))
+        for index, row in enumerate(EventExportService.ticket_rows(event)):
+            if not index % CHUNK_SIZE:
+                JobService.heartbeat()
+            ws2.append(row)
+
+        wb.save(fileobj)
+
+    @staticmethod
+    def enqueue(event, user):
+        """
+        Encolar la generación del reporte, o devolver la que ya está en curso.
+
+        Returns:
+            Job: trabajo ``events.export_excel`` del evento
+        """
+        pending = Job.objects.filter(
+            name=EXPORT_JOB, status__in=('pending', 'running'), payload__event_id=event.pk
+        ).order_by('id').first()
+        if pending is not None:
+            return pending
+        return JobService.enqueue(EXPORT_JOB, {
+            'event_id': event.pk,
+            'user_id': user.pk,
+            'path': f'exports/reporte_{event.slug}_{uuid.uuid4().hex}.xlsx',
+        })
+
+    @staticmethod
+    def save(event, path):
+        """Generar el reporte en un archivo temporal y guardarlo en ``path``."""
+        with tempfile.TemporaryFile() as fileobj:
+            EventExportService.write(event, fileobj)
+            fileobj.seek(0)
+            JobService.heartbeat()
+            # Un reintento reemplaza el archivo de un intento anterior
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            return default_storage.save(path, File(fileobj))
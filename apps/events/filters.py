@@ -1,8 +1,11 @@
 """
 Filtros para eventos.
 """
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
-from .models import Event
+from rest_framework.filters import SearchFilter
+from .models import Event, EventTag, Tag
+from .search import EventSearch
 
 
 class EventFilter(filters.FilterSet):
@@ -35,6 +38,9 @@ class EventFilter(filters.FilterSet):
     organizer = filters.NumberFilter(field_name='organizer__id')
     organizer_username = filters.CharFilter(field_name='organizer__username', lookup_expr='icontains')
 
+    # Etiquetas: ?tag=rock o ?tag=rock,jazz (cualquiera de ellas)
+    tag = filters.CharFilter(method='filter_tag')
+
     class Meta:
         model = Event
         fields = [
@@ -42,5 +48,25 @@ class EventFilter(filters.FilterSet):
             'city', 'status', 'is_free', 'is_online', 'start_date',
             'start_date_gte', 'start_date_lte', 'end_date', 'end_date_gte',
             'end_date_lte', 'capacity_gte', 'capacity_lte', 'organizer',
-            'organizer_username'
-        ]
\ No newline at end of file
+            'organizer_username', 'tag'
+        ]
+
+    def filter_tag(self, queryset, name, value):
+        return queryset.filter(Exists(EventTag.objects.filter(
+            event=OuterRef('pk'), tag__slug__in=Tag.slugs(value)
+        )))
+
+
+class EventSearchFilter(SearchFilter):
+    """
+    ``?search=`` con texto completo y orden por relevancia.
+
+    Reemplaza los ``LIKE '%q%'`` de ``SearchFilter`` (ver
+    ``apps/events/search.py``); ``?ordering=`` sigue teniendo prioridad.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return EventSearch.search(queryset, query)
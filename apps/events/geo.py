@@ -0,0 +1,155 @@
+"""
+Búsqueda por cercanía sin PostGIS.
+
+Cada ``Venue`` guarda el geohash de sus coordenadas en una columna indexada.
+Una búsqueda de radio ``r`` alrededor de un punto:
+
+1. Elige la precisión de geohash cuyas celdas miden al menos ``r`` y toma la
+   celda del punto y sus 8 vecinas: el círculo queda dentro de esas 9
+   celdas, que se filtran con ``geohash LIKE 'prefijo%'`` (rango del índice).
+2. Agrega la caja envolvente del círculo sobre latitud/longitud.
+3. Calcula en Python la distancia exacta (haversine) de los candidatos,
+   descarta los que quedan fuera del radio y ordena por distancia.
+
+Funciona igual en SQLite, MySQL y PostgreSQL.
+"""
+import math
+
+from django.db.models import Q
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+GEOHASH_PRECISION = 9
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Geohash de un punto con ``precision`` caracteres."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        target, interval = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if target >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Alto y ancho en grados de una celda de geohash."""
+    lon_bits = math.ceil(5 * precision / 2)
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Distancia en kilómetros entre dos puntos."""
+    lat1, lon1, lat2, lon2 = map(math.radians, map(float, (lat1, lon1, lat2, lon2)))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Caja envolvente del círculo.
+
+    Returns:
+        tuple: (min_lat, max_lat, delta_lon) con delta_lon en grados, o None
+        como delta_lon si la caja cubre todas las longitudes (cerca de un polo)
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = max(latitude - delta_lat, -90.0), min(latitude + delta_lat, 90.0)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat <= 0 or radius_km / (KM_PER_DEGREE * cos_lat) >= 180:
+        return min_lat, max_lat, None
+    return min_lat, max_lat, radius_km / (KM_PER_DEGREE * cos_lat)
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """
+    Prefijos de geohash (celda del punto y vecinas) que cubren el círculo.
+
+    Returns:
+        set: prefijos, o vacío si el radio es demasiado grande para acotar
+    """
+    min_lat, max_lat, delta_lon = bounding_box(latitude, longitude, radius_km)
+    if delta_lon is None:
+        return set()
+    delta_lat = max(latitude - min_lat, max_lat - latitude)
+
+    precision = 0
+    while precision < GEOHASH_PRECISION:
+        height, width = cell_size(precision + 1)
+        if height < delta_lat or width < delta_lon:
+            break
+        precision += 1
+    if precision == 0:
+        return set()
+
+    height, width = cell_size(precision)
+    cells = set()
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            lat = min(max(latitude + dy * height, -90.0), 90.0)
+            lon = (longitude + dx * width + 180.0) % 360.0 - 180.0
+            cells.add(encode_geohash(lat, lon, precision))
+    return cells
+
+
+def nearby_q(latitude, longitude, radius_km, prefix=''):
+    """
+    Prefiltro SQL (celdas de geohash + caja envolvente) para un radio.
+
+    Args:
+        prefix: Ruta hasta el Venue, por ejemplo ``'venue__'`` desde Event
+    """
+    min_lat, max_lat, delta_lon = bounding_box(latitude, longitude, radius_km)
+    query = Q(**{f'{prefix}latitude__range': (min_lat, max_lat)})
+
+    if delta_lon is not None:
+        west, east = longitude - delta_lon, longitude + delta_lon
+        if west < -180:
+            query &= Q(**{f'{prefix}longitude__gte': west + 360}) | Q(**{f'{prefix}longitude__lte': east})
+        elif east > 180:
+            query &= Q(**{f'{prefix}longitude__gte': west}) | Q(**{f'{prefix}longitude__lte': east - 360})
+        else:
+            query &= Q(**{f'{prefix}longitude__range': (west, east)})
+
+    cells = covering_cells(latitude, longitude, radius_km)
+    if cells:
+        in_cells = Q()
+        for cell in sorted(cells):
+            in_cells |= Q(**{f'{prefix}geohash__startswith': cell})
+        query &= in_cells
+    return query
+
+
+def rank_by_distance(objects, latitude, longitude, radius_km, venue=lambda obj: obj):
+    """
+    Candidatos dentro del radio, del más cercano al más lejano.
+
+    Asigna ``distance_km`` a cada objeto. ``venue`` obtiene el Venue de cada
+    objeto (el mismo objeto para lugares, ``event.venue`` para eventos).
+    """
+    ranked = []
+    for obj in objects:
+        place = venue(obj)
+        distance = haversine_km(latitude, longitude, place.latitude, place.longitude)
+        if distance <= radius_km:
+            obj.distance_km = round(distance, 3)
+            ranked.append(obj)
+    ranked.sort(key=lambda obj: obj.distance_km)
+    return ranked
@@ -0,0 +1,30 @@
+"""
+Trabajos en segundo plano de eventos.
+"""
+import logging
+
+from django.db import transaction
+
+from apps.jobs.registry import job
+from core.emails import EmailService
+from .exports import EXPORT_JOB, EventExportService
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CANCELLED_JOB = 'events.notify_cancelled'
+
+
+@job(EXPORT_JOB)
+def export_excel(payload):
+    event = Event.objects.select_related('category', 'venue').get(pk=payload['event_id'])
+    EventExportService.save(event, payload['path'])
+
+
+@job(NOTIFY_CANCELLED_JOB)
+def notify_cancelled(payload):
+    event = Event.objects.get(pk=payload['event_id'])
+    # Todo o nada: un reintento no duplica los emails ya encolados
+    with transaction.atomic():
+        queued = EmailService.send_event_cancelled(event)
+    logger.info(f"Emails de cancelación encolados para {event.title}: {queued}")
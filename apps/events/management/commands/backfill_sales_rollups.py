@@ -0,0 +1,43 @@
+"""
+Comando para recalcular las ventas por hora y por día desde los tickets.
+Ejecutar: python manage.py backfill_sales_rollups [--event ID] [--batch N]
+"""
+from django.core.management.base import BaseCommand
+from apps.events.models import Event
+from apps.events.services import SalesRollupService
+
+
+class Command(BaseCommand):
+    help = 'Recalcula SalesRollup desde los tickets existentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--event',
+            type=int,
+            action='append',
+            help='ID del evento a recalcular (se puede repetir; por defecto todos)'
+        )
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=100,
+            help='Eventos por transacción (default: 100)'
+        )
+
+    def handle(self, *args, **options):
+        events = Event.objects.order_by('id')
+        if options['event']:
+            events = events.filter(pk__in=options['event'])
+
+        event_ids = list(events.values_list('id', flat=True))
+        batch = max(options['batch'], 1)
+        rows = 0
+        for start in range(0, len(event_ids), batch):
+            rows += SalesRollupService.backfill(event_ids[start:start + batch])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ Eventos procesados: {len(event_ids)}\n'
+                f'📊 Filas de ventas creadas: {rows}'
+            )
+        )
@@ -0,0 +1,16 @@
+"""
+Comando para aplicar las vistas de eventos acumuladas.
+Ejecutar: python manage.py flush_event_views
+"""
+from django.core.management.base import BaseCommand
+from apps.events.counters import view_counter
+
+
+class Command(BaseCommand):
+    help = 'Suma a Event.views_count las vistas en cola de EVENT_VIEWS_SPOOL_DIR'
+
+    def handle(self, *args, **options):
+        applied = view_counter.flush()
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Vistas aplicadas: {applied}')
+        )
@@ -0,0 +1,33 @@
+"""
+Comando para recalcular las estadísticas de eventos desde sus tickets.
+Ejecutar: python manage.py rebuild_event_statistics [--event ID]
+"""
+from django.core.management.base import BaseCommand
+from apps.events.models import Event
+from apps.events.services import StatisticsService
+
+
+class Command(BaseCommand):
+    help = 'Recalcula EventStatistics y TicketTypeStatistics desde los tickets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--event',
+            type=int,
+            action='append',
+            help='ID del evento a recalcular (se puede repetir; por defecto todos)'
+        )
+
+    def handle(self, *args, **options):
+        events = Event.objects.order_by('id')
+        if options['event']:
+            events = events.filter(pk__in=options['event'])
+
+        count = 0
+        for event_id in events.values_list('id', flat=True).iterator():
+            StatisticsService.rebuild(event_id)
+            count += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Estadísticas recalculadas: {count} eventos')
+        )
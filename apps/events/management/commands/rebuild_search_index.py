@@ -0,0 +1,37 @@
+"""
+Comando para reconstruir el índice de búsqueda de eventos.
+Ejecutar: python manage.py rebuild_search_index [--event ID]
+
+Solo hace falta con bases de datos sin texto completo (SQLite); MySQL y
+PostgreSQL mantienen su propio índice.
+"""
+from django.core.management.base import BaseCommand
+from apps.events.models import Event
+from apps.events.search import EventSearch
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice invertido de búsqueda de eventos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--event',
+            type=int,
+            action='append',
+            help='ID del evento a indexar (se puede repetir; por defecto todos)'
+        )
+
+    def handle(self, *args, **options):
+        backend = EventSearch.backend()
+        if backend != 'index':
+            self.stdout.write(f'El motor {backend} usa su índice de texto completo; nada que hacer')
+            return
+
+        events = Event.objects.order_by('id')
+        if options['event']:
+            events = events.filter(pk__in=options['event'])
+
+        count = EventSearch.rebuild(events)
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Índice de búsqueda reconstruido: {count} eventos')
+        )
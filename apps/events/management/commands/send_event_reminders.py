@@ -1,10 +1,15 @@
 """
 Comando para enviar recordatorios de eventos.
 Ejecutar: python manage.py send_event_reminders
+
+Los recordatorios quedan en la bandeja de salida y los envía
+``python manage.py send_outbox``.
 """
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
+from apps.events.models import Event
 from apps.tickets.models import Ticket
 from core.emails import EmailService
 
@@ -24,30 +29,30 @@ class Command(BaseCommand):
         days_before = options['days']
         target_date = timezone.now() + timedelta(days=days_before)
         
-        # Buscar eventos en la fecha objetivo
-        tickets = Ticket.objects.filter(
+        # Buscar eventos en la fecha objetivo con tickets activos; el
+        # template de cada evento se renderiza una sola vez
+        event_ids = Ticket.objects.filter(
             status='active',
-            ticket_type__event__start_date__date=target_date.date()
-        ).select_related('ticket_type__event', 'buyer')
+            ticket_type__event__start_date__date=timezone.localdate(target_date)
+        ).values('ticket_type__event')
+        events = Event.objects.filter(pk__in=event_ids).select_related('venue')
         
         sent_count = 0
         error_count = 0
         
-        for ticket in tickets:
+        for event in events:
             try:
-                if EmailService.send_event_reminder(ticket, days_before):
-                    sent_count += 1
-                else:
-                    error_count += 1
+                with transaction.atomic():
+                    sent_count += EmailService.send_event_reminders(event, days_before)
             except Exception as e:
                 self.stdout.write(
-                    self.style.ERROR(f'Error con ticket {ticket.code}: {str(e)}')
+                    self.style.ERROR(f'Error con evento {event.title}: {str(e)}')
                 )
                 error_count += 1
         
         self.stdout.write(
             self.style.SUCCESS(
-                f'✅ Recordatorios enviados: {sent_count}\n'
+                f'✅ Recordatorios encolados: {sent_count}\n'
                 f'❌ Errores: {error_count}'
             )
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-16 22:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventStatistics',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='events.event', verbose_name='Evento')),
+                ('tickets_sold', models.PositiveIntegerField(default=0, verbose_name='Tickets Vendidos')),
+                ('tickets_cancelled', models.PositiveIntegerField(default=0, verbose_name='Tickets Cancelados')),
+                ('checked_in', models.PositiveIntegerField(default=0, verbose_name='Check-ins')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Ingresos Netos')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Estadísticas de Evento',
+                'verbose_name_plural': 'Estadísticas de Eventos',
+            },
+        ),
+    ]
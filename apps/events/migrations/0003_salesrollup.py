@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_eventstatistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hora'), ('day', 'Día')], max_length=4, verbose_name='Granularidad')),
+                ('period', models.DateTimeField(verbose_name='Periodo')),
+                ('tickets_sold', models.PositiveIntegerField(default=0, verbose_name='Tickets Vendidos')),
+                ('tickets_cancelled', models.PositiveIntegerField(default=0, verbose_name='Tickets Cancelados')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Ingresos Netos')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='events.event', verbose_name='Evento')),
+            ],
+            options={
+                'verbose_name': 'Ventas por Periodo',
+                'verbose_name_plural': 'Ventas por Periodo',
+                'ordering': ['period'],
+                'indexes': [models.Index(fields=['granularity', 'period'], name='events_sale_granula_e3a586_idx')],
+                'unique_together': {('event', 'granularity', 'period')},
+            },
+        ),
+    ]
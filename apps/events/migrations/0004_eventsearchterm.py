@@ -0,0 +1,58 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Índices de texto completo de apps/events/search.py; en otros motores la
+# búsqueda usa EventSearchTerm
+FULLTEXT_SQL = {
+    'mysql': (
+        'ALTER TABLE events_event ADD FULLTEXT INDEX events_event_search (title, description, tags)',
+        'ALTER TABLE events_event DROP INDEX events_event_search',
+    ),
+    'postgresql': (
+        "CREATE INDEX events_event_search ON events_event USING GIN (("
+        "setweight(to_tsvector('spanish'::regconfig, COALESCE((title)::text, '')), 'A') || "
+        "setweight(to_tsvector('spanish'::regconfig, COALESCE((tags)::text, '')), 'B') || "
+        "setweight(to_tsvector('spanish'::regconfig, COALESCE((description)::text, '')), 'C')))",
+        'DROP INDEX events_event_search',
+    ),
+}
+
+
+def create_fulltext_index(apps, schema_editor):
+    sql = FULLTEXT_SQL.get(schema_editor.connection.vendor)
+    if sql:
+        schema_editor.execute(sql[0])
+
+
+def drop_fulltext_index(apps, schema_editor):
+    sql = FULLTEXT_SQL.get(schema_editor.connection.vendor)
+    if sql:
+        schema_editor.execute(sql[1])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_salesrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Raíz')),
+                ('weight', models.PositiveIntegerField(default=1, verbose_name='Peso')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='events.event', verbose_name='Evento')),
+            ],
+            options={
+                'verbose_name': 'Término de Búsqueda',
+                'verbose_name_plural': 'Términos de Búsqueda',
+                'indexes': [models.Index(fields=['term', 'event'], name='events_even_term_de9493_idx')],
+                'unique_together': {('event', 'term')},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
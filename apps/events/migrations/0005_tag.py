@@ -0,0 +1,97 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def parse_tags(value):
+    """Mismo criterio que ``Tag.parse``: slug -> nombre, sin repetidos."""
+    tags = {}
+    for name in (value or '').split(','):
+        name = name.strip()[:64]
+        slug = slugify(name)[:64]
+        if slug and slug not in tags:
+            tags[slug] = name
+    return tags
+
+
+def backfill_tags(apps, schema_editor):
+    """Crear las relaciones de eventos desde el texto separado por comas."""
+    Tag = apps.get_model('events', 'Tag')
+    Owner = apps.get_model('events', 'Event')
+    Through = apps.get_model('events', 'EventTag')
+
+    parsed = {
+        pk: parse_tags(tags)
+        for pk, tags in Owner.objects.exclude(tags='').values_list('pk', 'tags').iterator()
+    }
+    names = {}
+    for tags in parsed.values():
+        for slug, name in tags.items():
+            names.setdefault(slug, name)
+    Tag.objects.bulk_create(
+        [Tag(slug=slug, name=name) for slug, name in names.items()],
+        ignore_conflicts=True,
+        batch_size=500,
+    )
+    tag_ids = dict(Tag.objects.values_list('slug', 'id'))
+    Through.objects.bulk_create(
+        [
+            Through(event_id=pk, tag_id=tag_ids[slug])
+            for pk, tags in parsed.items()
+            for slug in tags
+        ],
+        ignore_conflicts=True,
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_eventsearchterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, verbose_name='Nombre')),
+                ('slug', models.SlugField(max_length=64, unique=True, verbose_name='Slug')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Etiqueta',
+                'verbose_name_plural': 'Etiquetas',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EventTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_tags', to='events.event', verbose_name='Evento')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_tags', to='events.tag', verbose_name='Etiqueta')),
+            ],
+            options={
+                'verbose_name': 'Etiqueta de Evento',
+                'verbose_name_plural': 'Etiquetas de Eventos',
+            },
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='tag_set',
+            field=models.ManyToManyField(blank=True, related_name='events', through='events.EventTag', to='events.tag', verbose_name='Etiquetas normalizadas'),
+        ),
+        migrations.AddIndex(
+            model_name='eventtag',
+            index=models.Index(fields=['tag', 'event'], name='events_even_tag_id_74fc48_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='eventtag',
+            unique_together={('event', 'tag')},
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
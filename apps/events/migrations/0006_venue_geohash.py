@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:29
+
+from django.db import migrations, models
+
+from apps.events.geo import encode_geohash
+
+
+def backfill_geohash(apps, schema_editor):
+    Venue = apps.get_model('events', 'Venue')
+    venues = Venue.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    for venue in venues.only('latitude', 'longitude').iterator():
+        venue.geohash = encode_geohash(venue.latitude, venue.longitude)
+        venue.save(update_fields=['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_tag'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12, verbose_name='Geohash'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
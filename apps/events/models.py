@@ -2,10 +2,13 @@
 Modelos para la gestión de eventos.
 """
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 
+from .geo import encode_geohash
+
 
 class Category(models.Model):
     """
@@ -59,6 +62,14 @@ class Venue(models.Model):
         blank=True,
         verbose_name="Longitud"
     )
+    # Geohash de latitud/longitud para las búsquedas por cercanía (geo.py)
+    geohash = models.CharField(
+        max_length=12,
+        blank=True,
+        editable=False,
+        db_index=True,
+        verbose_name="Geohash"
+    )
     description = models.TextField(blank=True, verbose_name="Descripción")
     amenities = models.TextField(blank=True, verbose_name="Amenidades", help_text="Separadas por comas")
     image = models.ImageField(upload_to='venues/', blank=True, null=True, verbose_name="Imagen")
@@ -73,13 +84,77 @@ class Venue(models.Model):
     def __str__(self):
         return f"{self.name} - {self.city}"
 
+    def save(self, *args, **kwargs):
+        """Override save para mantener el geohash de las coordenadas."""
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+
     @property
     def full_address(self):
         """Retorna la dirección completa."""
         return f"{self.address}, {self.city}, {self.state}, {self.country}"
 
 
-class Event(models.Model):
+class EventQuerySet(models.QuerySet):
+    """QuerySet de eventos."""
+
+    def with_ticket_totals(self):
+        """
+        Anotar ``total_tickets_sold`` con una subconsulta por evento.
+
+        ``tickets_sold``, ``tickets_available`` e ``is_sold_out`` usan la
+        anotación cuando está presente, así que serializar una página de
+        eventos no ejecuta un ``aggregate`` por fila.
+        """
+        # Importar aquí para evitar circular import
+        from apps.tickets.models import TicketType
+
+        sold = TicketType.objects.filter(
+            event=models.OuterRef('pk')
+        ).order_by().values('event').annotate(
+            total=models.Sum('sold_count')
+        ).values('total')
+
+        return self.annotate(
+            total_tickets_sold=Coalesce(
+                models.Subquery(sold, output_field=models.PositiveIntegerField()), 0
+            )
+        )
+
+
+class TaggedMixin:
+    """
+    Sincronizar ``Tag`` al guardar solo si cambió el texto de ``tags``.
+
+    Recuerda el valor cargado de la base de datos; guardar sin tocar las
+    etiquetas (publicar, cancelar, ``update_fields`` sin ``tags``) no
+    consulta las tablas de etiquetas.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_tags = instance.__dict__.get('tags', models.DEFERRED)
+        return instance
+
+    def sync_tags(self, is_new, update_fields=None):
+        """Llamar después de ``super().save()``."""
+        if update_fields is not None:
+            changed = 'tags' in update_fields
+        else:
+            changed = is_new or self.tags != getattr(self, '_loaded_tags', models.DEFERRED)
+        if changed:
+            Tag.sync(self, is_new)
+            self._loaded_tags = self.tags
+
+
+class Event(TaggedMixin, models.Model):
     """
     Modelo principal de eventos.
     """
@@ -180,6 +255,14 @@ class Event(models.Model):
         verbose_name="Etiquetas",
         help_text="Separadas por comas"
     )
+    # Copia normalizada de ``tags`` para filtrar y contar por etiqueta
+    tag_set = models.ManyToManyField(
+        'Tag',
+        through='EventTag',
+        related_name='events',
+        blank=True,
+        verbose_name="Etiquetas normalizadas"
+    )
     
     # Contacto
     contact_email = models.EmailField(
@@ -200,6 +283,8 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EventQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Evento"
         verbose_name_plural = "Eventos"
@@ -226,8 +311,15 @@ class Event(models.Model):
                 self.slug = f"{original_slug}-{counter}"
                 counter += 1
         
+        is_new = self._state.adding
         super().save(*args, **kwargs)
 
+        # Fila de estadísticas que se actualiza con cada compra y check-in
+        if is_new:
+            EventStatistics.objects.create(event=self)
+
+        self.sync_tags(is_new, kwargs.get('update_fields'))
+
     @property
     def is_active(self):
         """Verifica si el evento está activo."""
@@ -241,6 +333,8 @@ class Event(models.Model):
     @property
     def tickets_sold(self):
         """Retorna el número de tickets vendidos."""
+        if hasattr(self, 'total_tickets_sold'):
+            return self.total_tickets_sold
         return self.ticket_types.aggregate(
             total=models.Sum('sold_count')
         )['total'] or 0
@@ -257,4 +351,233 @@ class Event(models.Model):
 
     def get_tag_list(self):
         """Retorna lista de tags."""
-        return [tag.strip() for tag in self.tags.split(',') if tag.strip()]
\ No newline at end of file
+        return [tag.strip() for tag in self.tags.split(',') if tag.strip()]
+
+class EventStatistics(models.Model):
+    """
+    Totales de venta y asistencia de un evento.
+
+    Se actualizan en la misma transacción que la compra, la cancelación o el
+    check-in (ver ``apps/events/services.py``), así que leer las estadísticas
+    de un evento es una sola consulta por clave primaria.
+    """
+    event = models.OneToOneField(
+        Event,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='statistics',
+        verbose_name="Evento"
+    )
+    tickets_sold = models.PositiveIntegerField(default=0, verbose_name="Tickets Vendidos")
+    tickets_cancelled = models.PositiveIntegerField(default=0, verbose_name="Tickets Cancelados")
+    checked_in = models.PositiveIntegerField(default=0, verbose_name="Check-ins")
+    revenue = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name="Ingresos Netos"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Estadísticas de Evento"
+        verbose_name_plural = "Estadísticas de Eventos"
+
+    def __str__(self):
+        return f"Estadísticas de {self.event_id}"
+
+
+class SalesRollup(models.Model):
+    """
+    Ventas de un evento agregadas por hora y por día.
+
+    ``period`` es el inicio de la hora o del día en ``TIME_ZONE``. Los
+    tickets se cuentan en el periodo de su compra; una cancelación suma a
+    ``tickets_cancelled`` y descuenta ``revenue`` en ese mismo periodo.
+    """
+    GRANULARITY_CHOICES = [
+        ('hour', 'Hora'),
+        ('day', 'Día'),
+    ]
+
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='sales_rollups',
+        verbose_name="Evento"
+    )
+    granularity = models.CharField(
+        max_length=4,
+        choices=GRANULARITY_CHOICES,
+        verbose_name="Granularidad"
+    )
+    period = models.DateTimeField(verbose_name="Periodo")
+    tickets_sold = models.PositiveIntegerField(default=0, verbose_name="Tickets Vendidos")
+    tickets_cancelled = models.PositiveIntegerField(default=0, verbose_name="Tickets Cancelados")
+    revenue = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name="Ingresos Netos"
+    )
+
+    class Meta:
+        verbose_name = "Ventas por Periodo"
+        verbose_name_plural = "Ventas por Periodo"
+        ordering = ['period']
+        unique_together = ['event', 'granularity', 'period']
+        indexes = [
+            models.Index(fields=['granularity', 'period']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} {self.granularity} {self.period:%Y-%m-%d %H:%M}"
+
+
+class EventSearchTerm(models.Model):
+    """
+    Índice invertido de búsqueda para bases de datos sin texto completo.
+
+    Una fila por evento y raíz (ver ``apps/events/search.py``); ``weight``
+    suma las apariciones ponderadas por campo (título > etiquetas >
+    descripción). En MySQL y PostgreSQL la búsqueda usa el índice de texto
+    completo de la base de datos y esta tabla queda vacía.
+    """
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+        verbose_name="Evento"
+    )
+    term = models.CharField(max_length=64, verbose_name="Raíz")
+    weight = models.PositiveIntegerField(default=1, verbose_name="Peso")
+
+    class Meta:
+        verbose_name = "Término de Búsqueda"
+        verbose_name_plural = "Términos de Búsqueda"
+        unique_together = ['event', 'term']
+        indexes = [
+            models.Index(fields=['term', 'event']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} {self.term}"
+
+
+class Tag(models.Model):
+    """
+    Etiqueta normalizada de eventos y patrocinadores.
+
+    ``Event.tags`` y ``Sponsor.tags`` siguen siendo el texto separado por
+    comas que se edita; al guardar, ``Tag.sync`` actualiza las tablas
+    intermedias para que filtrar y contar por etiqueta use índices.
+    """
+    name = models.CharField(max_length=64, verbose_name="Nombre")
+    slug = models.SlugField(max_length=64, unique=True, verbose_name="Slug")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Etiqueta"
+        verbose_name_plural = "Etiquetas"
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def parse(value):
+        """
+        Etiquetas de un texto separado por comas.
+
+        Returns:
+            dict: slug -> nombre, sin repetidos y en el orden del texto
+        """
+        from django.utils.text import slugify
+
+        tags = {}
+        for name in (value or '').split(','):
+            name = name.strip()[:64]
+            slug = slugify(name)[:64]
+            if slug and slug not in tags:
+                tags[slug] = name
+        return tags
+
+    @staticmethod
+    def slugs(value):
+        """Slugs de un parámetro ``?tag=`` (uno o varios separados por comas)."""
+        return list(Tag.parse(value))
+
+    @classmethod
+    def for_names(cls, value):
+        """Etiquetas de ``value``, creando las que no existen."""
+        parsed = cls.parse(value)
+        if not parsed:
+            return []
+        existing = {tag.slug: tag for tag in cls.objects.filter(slug__in=parsed)}
+        missing = [cls(slug=slug, name=name) for slug, name in parsed.items() if slug not in existing]
+        if missing:
+            # ignore_conflicts: otra transacción pudo crear la misma etiqueta
+            cls.objects.bulk_create(missing, ignore_conflicts=True)
+            existing = {tag.slug: tag for tag in cls.objects.filter(slug__in=parsed)}
+        return list(existing.values())
+
+    @classmethod
+    def sync(cls, obj, is_new=False):
+        """Actualizar ``obj.tag_set`` a partir de ``obj.tags``."""
+        tags = cls.for_names(obj.tags)
+        if is_new and not tags:
+            return
+        obj.tag_set.set(tags)
+
+    @staticmethod
+    def facets(through, objects, limit=50):
+        """
+        Cantidad de objetos por etiqueta.
+
+        Args:
+            through: Tabla intermedia (EventTag, SponsorTag)
+            objects: QuerySet de los objetos a contar
+            limit: Máximo de etiquetas
+
+        Returns:
+            list: dicts con slug, name y count, de más a menos usadas
+        """
+        owner = through.owner_field
+        rows = through.objects.filter(
+            **{f'{owner}__in': objects.order_by().values('pk')}
+        ).values('tag__slug', 'tag__name').annotate(
+            count=models.Count(owner)
+        ).order_by('-count', 'tag__slug')[:limit]
+        return [
+            {'slug': row['tag__slug'], 'name': row['tag__name'], 'count': row['count']}
+            for row in rows
+        ]
+
+
+class EventTag(models.Model):
+    """Relación evento - etiqueta."""
+    owner_field = 'event'
+
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='event_tags',
+        verbose_name="Evento"
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='event_tags',
+        verbose_name="Etiqueta"
+    )
+
+    class Meta:
+        verbose_name = "Etiqueta de Evento"
+        verbose_name_plural = "Etiquetas de Eventos"
+        unique_together = ['event', 'tag']
+        indexes = [
+            models.Index(fields=['tag', 'event']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} {self.tag_id}"
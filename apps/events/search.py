@@ -0,0 +1,192 @@
+"""
+Búsqueda de texto completo de eventos (título, descripción y etiquetas).
+
+Según el motor de base de datos (``DB_ENGINE``):
+
+- MySQL: índice ``FULLTEXT`` con ``MATCH ... AGAINST`` en modo booleano.
+- PostgreSQL: ``tsvector`` con la configuración ``spanish`` e índice GIN.
+- Otros (SQLite en tests): índice invertido ``EventSearchTerm`` que se
+  calcula en Python al guardar el evento.
+
+En los tres casos cada palabra de la búsqueda se compara por prefijo y todas
+deben aparecer; los resultados se ordenan por relevancia, con más peso para
+el título que para las etiquetas y la descripción.
+"""
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q, Subquery, Sum
+from django.db.models.expressions import RawSQL
+
+from .models import Event, EventSearchTerm
+
+SEARCH_FIELDS = ('title', 'tags', 'description')
+# Peso de cada campo en el índice invertido (A, B, C en PostgreSQL)
+FIELD_WEIGHTS = {'title': 3, 'tags': 2, 'description': 1}
+POSTGRES_WEIGHTS = {'title': 'A', 'tags': 'B', 'description': 'C'}
+FULLTEXT_INDEX = 'events_event_search'
+MAX_QUERY_TERMS = 8
+
+STOPWORDS = frozenset("""
+    a al algo con de del el en entre es esta este la las lo los mas mi muy
+    no o para pero por que se sin sobre su sus tu un una uno unos unas y ya
+""".split())
+
+# Sufijos del español, de más largo a más corto
+SUFFIXES = (
+    'amientos', 'imientos', 'aciones', 'uciones', 'amiento', 'imiento',
+    'idades', 'adoras', 'adores', 'ancias', 'mente', 'acion', 'ucion',
+    'adora', 'ador', 'ancia', 'idad', 'ables', 'ibles', 'istas', 'able',
+    'ible', 'ista', 'osos', 'osas', 'ivos', 'ivas', 'oso', 'osa', 'ivo',
+    'iva', 'ando', 'iendo', 'es', 's',
+)
+_WORD_RE = re.compile(r'[a-z0-9ñ]+')
+
+
+def normalize(text):
+    """Minúsculas y sin tildes (la ñ se conserva)."""
+    text = text.lower().replace('ñ', '\0')
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return text.replace('\0', 'ñ')
+
+
+def stem(word):
+    """
+    Raíz aproximada de una palabra en español.
+
+    Quita un sufijo de derivación o plural y la vocal final, de forma que
+    "conciertos", "concierto" y "conciertazo" comparten prefijo.
+    """
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    if len(word) > 4 and word[-1] in 'aeo':
+        word = word[:-1]
+    return word
+
+
+def words(text):
+    """Palabras normalizadas de ``text`` sin palabras vacías."""
+    return [
+        word for word in _WORD_RE.findall(normalize(text or ''))
+        if word not in STOPWORDS and len(word) > 1
+    ]
+
+
+def tokenize(text):
+    """Raíces de las palabras de ``text``."""
+    return [stem(word) for word in words(text)]
+
+
+class EventSearch:
+    """Búsqueda de eventos con el motor disponible."""
+
+    @staticmethod
+    def backend():
+        """'mysql', 'postgresql' o 'index'."""
+        if connection.vendor in ('mysql', 'postgresql'):
+            return connection.vendor
+        return 'index'
+
+    @staticmethod
+    def search(queryset, query):
+        """
+        Filtrar ``queryset`` por ``query`` y ordenarlo por relevancia.
+
+        Anota ``search_rank`` en cada evento.
+        """
+        terms = list(dict.fromkeys(words(query)))[:MAX_QUERY_TERMS]
+        if not terms:
+            return queryset.none()
+
+        backend = EventSearch.backend()
+        if backend == 'mysql':
+            queryset = EventSearch._mysql(queryset, terms)
+        elif backend == 'postgresql':
+            queryset = EventSearch._postgresql(queryset, terms)
+        else:
+            queryset = EventSearch._index(queryset, terms)
+        return queryset.order_by('-search_rank', '-start_date')
+
+    @staticmethod
+    def _mysql(queryset, terms):
+        # Las colaciones utf8mb4 ignoran tildes, así que la raíz normalizada
+        # con comodín cubre plurales y derivados
+        boolean_query = ' '.join(f'+{stem(term)}*' for term in terms)
+        table = Event._meta.db_table
+        columns = ', '.join(f'`{table}`.`{field}`' for field in ('title', 'description', 'tags'))
+        rank = RawSQL(f'MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)', [boolean_query])
+        return queryset.annotate(search_rank=rank).filter(search_rank__gt=0)
+
+    @staticmethod
+    def _postgresql(queryset, terms):
+        # Importar aquí: requiere psycopg, que solo está con PostgreSQL
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        raw_query = ' & '.join(f'{term}:*' for term in terms)
+        search_query = SearchQuery(raw_query, search_type='raw', config='spanish')
+        vector = search_vector()
+        return queryset.annotate(
+            search_document=vector,
+            search_rank=SearchRank(vector, search_query),
+        ).filter(search_document=search_query)
+
+    @staticmethod
+    def _index(queryset, terms):
+        stems = [stem(term) for term in terms]
+        for term in stems:
+            queryset = queryset.filter(Exists(
+                EventSearchTerm.objects.filter(event=OuterRef('pk'), term__startswith=term)
+            ))
+
+        matches = Q()
+        for term in stems:
+            matches |= Q(term__startswith=term)
+        rank = EventSearchTerm.objects.filter(
+            matches, event=OuterRef('pk')
+        ).order_by().values('event').annotate(total=Sum('weight')).values('total')
+        return queryset.annotate(search_rank=Subquery(rank))
+
+    @staticmethod
+    def index_event(event):
+        """Actualizar el índice invertido de un evento (solo backend 'index')."""
+        weights = Counter()
+        for field in SEARCH_FIELDS:
+            for term in tokenize(getattr(event, field)):
+                weights[term[:64]] += FIELD_WEIGHTS[field]
+
+        with transaction.atomic():
+            EventSearchTerm.objects.filter(event=event).delete()
+            EventSearchTerm.objects.bulk_create([
+                EventSearchTerm(event=event, term=term, weight=weight)
+                for term, weight in weights.items()
+            ])
+
+    @staticmethod
+    def rebuild(events):
+        """
+        Reconstruir el índice invertido de ``events``.
+
+        Returns:
+            int: eventos indexados
+        """
+        count = 0
+        for event in events.only(*SEARCH_FIELDS).iterator():
+            EventSearch.index_event(event)
+            count += 1
+        return count
+
+
+def search_vector():
+    """``tsvector`` ponderado de los campos de búsqueda (PostgreSQL)."""
+    from django.contrib.postgres.search import SearchVector
+
+    vector = None
+    for field in SEARCH_FIELDS:
+        part = SearchVector(field, weight=POSTGRES_WEIGHTS[field], config='spanish')
+        vector = part if vector is None else vector + part
+    return vector
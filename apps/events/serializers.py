@@ -4,18 +4,21 @@ Serializers para eventos.
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Category, Venue, Event
+from core.compiled import full_name
+from core.sparse import DynamicFieldsMixin
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer básico para categorías."""
     events_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Category
         fields = ['id', 'name', 'description', 'icon', 'events_count', 'created_at']
+        field_sources = {'events_count': ()}
 
 
-class CategoryDetailSerializer(serializers.ModelSerializer):
+class CategoryDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer detallado para categorías con eventos."""
     events_count = serializers.IntegerField(read_only=True)
     recent_events = serializers.SerializerMethodField()
@@ -29,11 +32,15 @@ class CategoryDetailSerializer(serializers.ModelSerializer):
 
     def get_recent_events(self, obj):
         """Obtiene los 5 eventos más recientes de la categoría."""
-        events = obj.events.filter(status='published').order_by('-start_date')[:5]
+        events = Event.objects.select_related(
+            'category', 'venue', 'organizer'
+        ).with_ticket_totals().filter(
+            category=obj, status='published'
+        ).order_by('-start_date')[:5]
         return EventListSerializer(events, many=True).data
 
 
-class VenueSerializer(serializers.ModelSerializer):
+class VenueSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer básico para lugares."""
     full_address = serializers.CharField(read_only=True)
 
@@ -44,9 +51,18 @@ class VenueSerializer(serializers.ModelSerializer):
             'postal_code', 'capacity', 'latitude', 'longitude',
             'full_address', 'description', 'amenities', 'image'
         ]
+        field_sources = {'full_address': ('address', 'city', 'state', 'country')}
 
 
-class VenueDetailSerializer(serializers.ModelSerializer):
+class NearbyVenueSerializer(VenueSerializer):
+    """Lugar con su distancia al punto de búsqueda."""
+    distance_km = serializers.FloatField(read_only=True)
+
+    class Meta(VenueSerializer.Meta):
+        fields = VenueSerializer.Meta.fields + ['distance_km']
+
+
+class VenueDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer detallado para lugares con eventos."""
     full_address = serializers.CharField(read_only=True)
     upcoming_events_count = serializers.SerializerMethodField()
@@ -69,19 +85,20 @@ class VenueDetailSerializer(serializers.ModelSerializer):
         ).count()
 
 
-class OrganizerSerializer(serializers.ModelSerializer):
+class OrganizerSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer para organizadores."""
     full_name = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = ['id', 'username', 'full_name', 'email']
+        field_sources = {'full_name': ('first_name', 'last_name', 'username')}
 
     def get_full_name(self, obj):
         return obj.get_full_name() or obj.username
 
 
-class EventListSerializer(serializers.ModelSerializer):
+class EventListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer para listado de eventos."""
     category_name = serializers.CharField(source='category.name', read_only=True)
     venue_name = serializers.CharField(source='venue.name', read_only=True)
@@ -97,12 +114,45 @@ class EventListSerializer(serializers.ModelSerializer):
             'status', 'capacity', 'tickets_available', 'is_free',
             'is_online', 'is_sold_out', 'thumbnail', 'views_count'
         ]
+        expandable_fields = {
+            'category': (CategorySerializer, {}),
+            'venue': (VenueSerializer, {}),
+            'organizer': (OrganizerSerializer, {}),
+        }
+        field_sources = {
+            'organizer_name': ('organizer__first_name', 'organizer__last_name', 'organizer__username'),
+            # tickets_sold usa la anotación total_tickets_sold si está
+            'tickets_available': ('capacity',),
+            'is_sold_out': ('capacity',),
+        }
+        compiled = True
+        row_annotations = {
+            'tickets_available': ('total_tickets_sold',),
+            'is_sold_out': ('total_tickets_sold',),
+        }
 
     def get_organizer_name(self, obj):
         return obj.organizer.get_full_name() or obj.organizer.username
 
+    def row_organizer_name(self, row):
+        return full_name(row, 'organizer')
+
+    def row_tickets_available(self, row):
+        return row['capacity'] - row['total_tickets_sold']
+
+    def row_is_sold_out(self, row):
+        return row['total_tickets_sold'] >= row['capacity']
+
 
-class EventDetailSerializer(serializers.ModelSerializer):
+class NearbyEventSerializer(EventListSerializer):
+    """Evento con la distancia de su lugar al punto de búsqueda."""
+    distance_km = serializers.FloatField(read_only=True)
+
+    class Meta(EventListSerializer.Meta):
+        fields = EventListSerializer.Meta.fields + ['distance_km']
+
+
+class EventDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer detallado para eventos."""
     category = CategorySerializer(read_only=True)
     venue = VenueSerializer(read_only=True)
@@ -174,11 +224,26 @@ class EventCreateUpdateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class TicketTypeStatisticsSerializer(serializers.Serializer):
+    """Serializer para el desglose de estadísticas por tipo de ticket."""
+    ticket_type = serializers.IntegerField(source='pk')
+    name = serializers.CharField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    tickets_sold = serializers.IntegerField(source='statistics.tickets_sold')
+    tickets_cancelled = serializers.IntegerField(source='statistics.tickets_cancelled')
+    checked_in = serializers.IntegerField(source='statistics.checked_in')
+    revenue = serializers.DecimalField(
+        source='statistics.revenue', max_digits=14, decimal_places=2
+    )
+
+
 class EventStatisticsSerializer(serializers.Serializer):
     """Serializer para estadísticas del evento."""
     total_capacity = serializers.IntegerField()
     tickets_sold = serializers.IntegerField()
     tickets_available = serializers.IntegerField()
-    revenue = serializers.DecimalField(max_digits=10, decimal_places=2)
+    tickets_cancelled = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
     attendees_checked_in = serializers.IntegerField()
-    conversion_rate = serializers.FloatField()
\ No newline at end of file
+    conversion_rate = serializers.FloatField()
+    by_ticket_type = TicketTypeStatisticsSerializer(many=True)
@@ -0,0 +1,286 @@
+"""
+Servicios de estadísticas de eventos.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from apps.tickets.models import Ticket, TicketType, TicketTypeStatistics
+from .models import EventStatistics, SalesRollup
+
+COUNTERS = ('tickets_sold', 'tickets_cancelled', 'checked_in')
+GRANULARITIES = {
+    'hour': (TruncHour, timedelta(hours=1)),
+    'day': (TruncDay, timedelta(days=1)),
+}
+
+
+def period_start(moment, granularity):
+    """Inicio de la hora o del día de ``moment`` en la zona horaria actual."""
+    local = timezone.localtime(moment)
+    if granularity == 'day':
+        return local.replace(hour=0, minute=0, second=0, microsecond=0)
+    return local.replace(minute=0, second=0, microsecond=0)
+
+
+class StatisticsService:
+    """
+    Mantener ``EventStatistics`` y ``TicketTypeStatistics``.
+
+    Cada operación suma sus deltas con un UPDATE ``F() + n`` sobre la fila
+    del evento y la del tipo de ticket, dentro de la transacción que hizo el
+    cambio. Los registros se llaman después de escribir los tickets: si una
+    fila no existe todavía (o un contador quedaría negativo) se recalcula el
+    evento completo desde los tickets, que ya incluyen el cambio actual.
+    """
+
+    @staticmethod
+    def record_sale(ticket_type, quantity, price, purchased_at=None):
+        """Registrar la venta de ``quantity`` tickets a ``price`` neto cada uno."""
+        StatisticsService._apply(
+            ticket_type.event_id, {ticket_type.pk: quantity},
+            tickets_sold=1, revenue=price,
+        )
+        SalesRollupService.record(
+            ticket_type.event_id, purchased_at or timezone.now(),
+            tickets_sold=quantity, revenue=price * quantity,
+        )
+
+    @staticmethod
+    def record_cancellation(ticket):
+        """Registrar la cancelación de un ticket que estaba vendido."""
+        StatisticsService._apply(
+            ticket.ticket_type.event_id, {ticket.ticket_type_id: 1},
+            tickets_sold=-1, tickets_cancelled=1, revenue=-ticket.final_price,
+        )
+        SalesRollupService.record(
+            ticket.ticket_type.event_id, ticket.purchased_at,
+            tickets_cancelled=1, revenue=-ticket.final_price,
+        )
+
+    @staticmethod
+    def record_check_ins(event_id, counts):
+        """
+        Registrar check-ins.
+
+        Args:
+            event_id: Evento
+            counts: dict ticket_type_id -> cantidad de check-ins
+        """
+        StatisticsService._apply(event_id, counts, checked_in=1)
+
+    @staticmethod
+    def get(event):
+        """Estadísticas del evento, calculándolas si aún no existen."""
+        try:
+            return EventStatistics.objects.get(event_id=event.pk)
+        except EventStatistics.DoesNotExist:
+            return StatisticsService.rebuild(event.pk)
+
+    @staticmethod
+    def by_ticket_type(event):
+        """
+        Tipos de ticket del evento con sus estadísticas en ``.statistics``.
+        """
+        ticket_types = list(
+            TicketType.objects.filter(event_id=event.pk).select_related('statistics')
+        )
+        if not all(hasattr(ticket_type, 'statistics') for ticket_type in ticket_types):
+            StatisticsService.rebuild(event.pk)
+            return StatisticsService.by_ticket_type(event)
+        return ticket_types
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(event_id):
+        """
+        Recalcular las estadísticas de un evento desde sus tickets.
+
+        Returns:
+            EventStatistics
+        """
+        totals = {}
+        for ticket_type_id in TicketType.objects.filter(
+            event_id=event_id
+        ).values_list('id', flat=True):
+            totals[ticket_type_id] = dict.fromkeys(COUNTERS, 0)
+            totals[ticket_type_id]['revenue'] = Decimal('0')
+
+        rows = Ticket.objects.filter(ticket_type__event_id=event_id).values(
+            'ticket_type_id', 'status'
+        ).annotate(
+            count=Count('id'),
+            revenue=Sum(F('purchase_price') - F('discount_applied')),
+        ).order_by()
+
+        for row in rows:
+            values = totals[row['ticket_type_id']]
+            if row['status'] == 'cancelled':
+                values['tickets_cancelled'] += row['count']
+                continue
+            values['tickets_sold'] += row['count']
+            values['revenue'] += row['revenue'] or 0
+            if row['status'] == 'used':
+                values['checked_in'] += row['count']
+
+        event_totals = dict.fromkeys(COUNTERS, 0)
+        event_totals['revenue'] = Decimal('0')
+        for ticket_type_id, values in totals.items():
+            TicketTypeStatistics.objects.update_or_create(
+                ticket_type_id=ticket_type_id,
+                defaults={'event_id': event_id, **values},
+            )
+            for field, value in values.items():
+                event_totals[field] += value
+
+        stats, _ = EventStatistics.objects.update_or_create(
+            event_id=event_id, defaults=event_totals
+        )
+        return stats
+
+    @staticmethod
+    def _apply(event_id, counts, **deltas):
+        """
+        Sumar ``deltas`` multiplicados por la cantidad de cada tipo de ticket.
+
+        Si alguna fila falta o un contador quedaría negativo, recalcula.
+        Debe llamarse dentro de la transacción que modificó los tickets.
+        """
+        total = sum(counts.values())
+        if not total:
+            return
+
+        targets = [(EventStatistics.objects.filter(event_id=event_id), total)]
+        targets += [
+            (TicketTypeStatistics.objects.filter(ticket_type_id=ticket_type_id), quantity)
+            for ticket_type_id, quantity in counts.items()
+        ]
+
+        now = timezone.now()
+        for queryset, quantity in targets:
+            changes, guards = {'updated_at': now}, {}
+            for field, delta in deltas.items():
+                changes[field] = F(field) + delta * quantity
+                # Sin restar por debajo de cero: las columnas son UNSIGNED en MySQL
+                if field in COUNTERS and delta < 0:
+                    guards[f'{field}__gte'] = -delta * quantity
+
+            if not queryset.filter(**guards).update(**changes):
+                StatisticsService.rebuild(event_id)
+                return
+
+
+class SalesRollupService:
+    """
+    Mantener y consultar ``SalesRollup``.
+
+    Cada venta o cancelación suma a la fila de su hora y a la de su día con
+    un UPDATE ``F() + n``; la fila se crea la primera vez. Las tendencias del
+    dashboard leen estas filas en lugar de contar tickets por fecha.
+    """
+
+    @staticmethod
+    def record(event_id, moment, **deltas):
+        """Sumar ``deltas`` a las filas de la hora y el día de ``moment``."""
+        for granularity in GRANULARITIES:
+            lookup = {
+                'event_id': event_id,
+                'granularity': granularity,
+                'period': period_start(moment, granularity),
+            }
+            changes = {field: F(field) + delta for field, delta in deltas.items()}
+            if SalesRollup.objects.filter(**lookup).update(**changes):
+                continue
+            try:
+                with transaction.atomic():
+                    SalesRollup.objects.create(**lookup, **deltas)
+            except IntegrityError:
+                # Otra transacción creó la fila entre el UPDATE y el INSERT
+                SalesRollup.objects.filter(**lookup).update(**changes)
+
+    @staticmethod
+    def backfill(event_ids):
+        """
+        Recalcular las filas de los eventos dados desde sus tickets.
+
+        Returns:
+            int: filas creadas
+        """
+        net = F('purchase_price') - F('discount_applied')
+        rows = []
+        for granularity, (trunc, _) in GRANULARITIES.items():
+            totals = Ticket.objects.filter(
+                ticket_type__event_id__in=event_ids
+            ).annotate(
+                period=trunc('purchased_at', tzinfo=timezone.get_current_timezone())
+            ).values('ticket_type__event_id', 'period').annotate(
+                sold=Count('id'),
+                cancelled=Count('id', filter=Q(status='cancelled')),
+                revenue=Sum(net, filter=~Q(status='cancelled')),
+            ).order_by()
+
+            rows += [
+                SalesRollup(
+                    event_id=total['ticket_type__event_id'],
+                    granularity=granularity,
+                    period=total['period'],
+                    tickets_sold=total['sold'],
+                    tickets_cancelled=total['cancelled'],
+                    revenue=total['revenue'] or 0,
+                )
+                for total in totals
+            ]
+
+        with transaction.atomic():
+            SalesRollup.objects.filter(event_id__in=event_ids).delete()
+            SalesRollup.objects.bulk_create(rows)
+        return len(rows)
+
+    @staticmethod
+    def trend(events, days=7, granularity='day'):
+        """
+        Ventas por periodo de los últimos ``days`` días, sin huecos.
+
+        Args:
+            events: QuerySet de eventos a incluir
+            days: Cantidad de días hacia atrás (incluye el actual)
+            granularity: 'hour' o 'day'
+
+        Returns:
+            list: dicts con date, sales, cancelled y revenue
+        """
+        step = GRANULARITIES[granularity][1]
+        today = period_start(timezone.now(), 'day')
+        start = today - timedelta(days=days - 1)
+        end = period_start(timezone.now(), granularity)
+
+        totals = {
+            row['period']: row
+            for row in SalesRollup.objects.filter(
+                event__in=events,
+                granularity=granularity,
+                period__gte=start,
+            ).values('period').annotate(
+                sales=Sum('tickets_sold'),
+                cancelled=Sum('tickets_cancelled'),
+                revenue_total=Sum('revenue'),
+            ).order_by()
+        }
+
+        date_format = '%Y-%m-%d' if granularity == 'day' else '%Y-%m-%d %H:00'
+        trend = []
+        period = start
+        while period <= end:
+            row = totals.get(period, {})
+            trend.append({
+                'date': period.strftime(date_format),
+                'sales': row.get('sales') or 0,
+                'cancelled': row.get('cancelled') or 0,
+                'revenue': float(row.get('revenue_total') or 0),
+            })
+            period = timezone.localtime(period + step)
+        return trend
@@ -0,0 +1,29 @@
+"""
+Señales de eventos: invalidación del cache del catálogo (core/cache.py) e
+índice de búsqueda (apps/events/search.py).
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.tickets.models import TicketType
+from core.cache import bump_catalog_version
+from .models import Category, Event, Venue
+from .search import SEARCH_FIELDS, EventSearch
+
+
+@receiver([post_save, post_delete], sender=Event)
+@receiver([post_save, post_delete], sender=TicketType)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Venue)
+def bump_catalog(sender, **kwargs):
+    bump_catalog_version(sender._meta.label_lower)
+
+
+@receiver(post_save, sender=Event)
+def index_event_search(sender, instance, update_fields=None, **kwargs):
+    # MySQL y PostgreSQL mantienen su propio índice de texto completo
+    if EventSearch.backend() != 'index':
+        return
+    if update_fields and not set(update_fields) & set(SEARCH_FIELDS):
+        return
+    EventSearch.index_event(instance)
@@ -1,13 +1,43 @@
 """
 Tests para eventos.
 """
+import json
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
 from django.test import TestCase
-from django.contrib.auth.models import User
+from django.contrib.auth.models import AnonymousUser, User
 from django.utils import timezone
 from datetime import timedelta
-from rest_framework.test import APITestCase
+from rest_framework.test import APIRequestFactory, APITestCase
 from rest_framework import status
-from .models import Category, Venue, Event
+from decimal import Decimal
+from django.core.signals import request_finished
+from django.db import close_old_connections, connection
+from django.test import override_settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
+from openpyxl import load_workbook
+
+from apps.attendees.services import CheckInService
+from apps.jobs.models import OutboundEmail
+from apps.jobs.services import JobService
+from apps.tickets.manifest import (
+    STATE_REVOKED, STATE_USED, STATE_VALID, code_fingerprint, parse_manifest
+)
+from apps.tickets.models import TicketType, Ticket
+from apps.tickets.services import InventoryService
+from core.cache import catalog_cache_key
+from core.emails import CANCELLED_FIELDS, EmailService, MassEmailTemplate, ticket_context
+from .counters import ViewCounter, view_counter
+from .models import (
+    Category, Venue, Event, EventSearchTerm, EventStatistics, SalesRollup, Tag
+)
+from .geo import encode_geohash, haversine_km
+from .search import EventSearch, stem, tokenize
+from .services import SalesRollupService, StatisticsService
 
 
 class CategoryModelTest(TestCase):
@@ -152,4 +182,1157 @@ class EventAPITest(APITestCase):
             'status': 'draft'
         }
         response = self.client.post('/api/events/', data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class CheckInManifestTest(APITestCase):
+    """Tests para el manifiesto de check-in."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='organizer', password='testpass123')
+        self.category = Category.objects.create(name="Conciertos")
+        self.event = Event.objects.create(
+            title="Concierto de Rock",
+            description="Gran concierto de rock",
+            category=self.category,
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=500,
+            status='published'
+        )
+        ticket_type = TicketType.objects.create(
+            event=self.event, name="General", price=Decimal('50000.00'), quantity=100
+        )
+        self.tickets = [
+            Ticket.objects.create(
+                ticket_type=ticket_type,
+                buyer=self.user,
+                attendee_name=f"Asistente {i}",
+                attendee_email=f"asistente{i}@example.com",
+                purchase_price=Decimal('50000.00')
+            )
+            for i in range(3)
+        ]
+        self.url = f'/api/events/{self.event.id}/checkin_manifest/'
+        self.client.force_authenticate(user=self.user)
+
+    def download(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return parse_manifest(b''.join(response.streaming_content))
+
+    def test_full_manifest(self):
+        """Test de manifiesto completo."""
+        Ticket.objects.filter(pk=self.tickets[2].pk).update(status='cancelled')
+
+        header, records = self.download()
+
+        self.assertEqual(header['event_id'], self.event.id)
+        self.assertEqual(header['since'], 0)
+        self.assertEqual(set(records), {self.tickets[0].pk, self.tickets[1].pk})
+        fingerprint, state = records[self.tickets[0].pk]
+        self.assertEqual(fingerprint, code_fingerprint(self.tickets[0].code))
+        self.assertEqual(state, STATE_VALID)
+
+    @override_settings(TICKET_MANIFEST_SETTLE_SECONDS=0)
+    def test_delta_includes_cancellations_and_check_ins(self):
+        """Test de delta con cancelaciones y check-ins."""
+        header, _ = self.download()
+        Ticket.objects.filter(pk__in=[t.pk for t in self.tickets]).update(
+            updated_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        InventoryService.cancel_ticket(self.tickets[0])
+        self.tickets[1].status = 'used'
+        self.tickets[1].save()
+
+        delta_header, records = self.download(since=header['version'])
+
+        self.assertEqual(delta_header['since'], header['version'])
+        self.assertEqual(records[self.tickets[0].pk][1], STATE_REVOKED)
+        self.assertEqual(records[self.tickets[1].pk][1], STATE_USED)
+        self.assertNotIn(self.tickets[2].pk, records)
+
+    def test_manifest_requires_organizer(self):
+        """Test de acceso solo para el organizador."""
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=other)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_invalid_since(self):
+        """Test de versión inválida."""
+        response = self.client.get(self.url, {'since': 'ayer'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ExcelExportTest(APITestCase):
+    """Tests para el reporte de evento en Excel."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='organizer', password='testpass123')
+        self.event = Event.objects.create(
+            title="Concierto de Rock",
+            description="Gran concierto de rock",
+            category=Category.objects.create(name="Conciertos"),
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=500,
+            status='published'
+        )
+        self.ticket_type = TicketType.objects.create(
+            event=self.event, name="Platea preferencial", price=Decimal('50000.00'), quantity=100
+        )
+        self.url = f'/api/events/{self.event.id}/export_excel/'
+        self.client.force_authenticate(user=self.user)
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def create_tickets(self, count):
+        for i in range(count):
+            Ticket.objects.create(
+                ticket_type=self.ticket_type,
+                buyer=self.user,
+                attendee_name=f"Asistente {i}",
+                attendee_email=f"asistente{i}@example.com",
+                purchase_price=Decimal('50000.00'),
+                discount_applied=Decimal('2500.50'),
+            )
+
+    def workbook(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('reporte_', response['Content-Disposition'])
+        return load_workbook(BytesIO(response.getvalue()))
+
+    def test_export_with_constant_queries(self):
+        """Test de reporte con consultas constantes y anchos calculados."""
+        self.create_tickets(2)
+        with CaptureQueriesContext(connection) as few:
+            self.workbook(self.client.get(self.url))
+        self.create_tickets(4)
+        with CaptureQueriesContext(connection) as many:
+            workbook = self.workbook(self.client.get(self.url))
+
+        self.assertEqual(len(few), len(many))
+        info = workbook["Información del Evento"]
+        self.assertEqual(info['A1'].value, 'EventHub - Reporte de Evento')
+        self.assertEqual(info['B9'].value, 500)
+        rows = list(workbook["Tickets Vendidos"].values)
+        self.assertEqual(rows[0][0], 'Código')
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[1][1], "Platea preferencial")
+        self.assertEqual(rows[1][4], 47499.5)
+        self.assertEqual(rows[1][5], 'Activo')
+        self.assertEqual(workbook["Tickets Vendidos"].column_dimensions['B'].width, 21)
+        self.assertEqual(workbook["Tickets Vendidos"].column_dimensions['D'].width, 24)
+
+    def test_only_organizer(self):
+        """Test de reporte solo para el organizador."""
+        self.client.force_authenticate(user=User.objects.create_user(username='otro', password='x'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(EXCEL_EXPORT_ASYNC_THRESHOLD=2)
+    def test_large_export_runs_as_job(self):
+        """Test de reporte grande generado por un trabajo."""
+        self.create_tickets(3)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job_id = response.data['job_id']
+        # Una segunda petición reutiliza el trabajo en curso
+        self.assertEqual(self.client.get(self.url).data['job_id'], job_id)
+
+        response = self.client.get(self.url, {'job': job_id})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+
+        self.assertEqual(JobService.run_pending('worker-1'), 1)
+        workbook = self.workbook(self.client.get(self.url, {'job': job_id}))
+        self.assertEqual(len(list(workbook["Tickets Vendidos"].values)), 4)
+
+        response = self.client.get(self.url, {'job': 'otro'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class EventStatisticsTest(APITestCase):
+    """Tests para las estadísticas incrementales del evento."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='organizer', password='testpass123')
+        self.event = Event.objects.create(
+            title="Concierto de Rock",
+            description="Gran concierto de rock",
+            category=Category.objects.create(name="Conciertos"),
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(hours=1),
+            end_date=timezone.now() + timedelta(hours=4),
+            capacity=500,
+            status='published'
+        )
+        self.general = TicketType.objects.create(
+            event=self.event, name="General", price=Decimal('50000.00'), quantity=100
+        )
+        self.vip = TicketType.objects.create(
+            event=self.event, name="VIP", price=Decimal('150000.00'), quantity=10
+        )
+        self.url = f'/api/events/{self.event.id}/statistics/'
+        self.client.force_authenticate(user=self.user)
+
+    def purchase(self, ticket_type, quantity):
+        response = self.client.post('/api/tickets/purchase/', {
+            'ticket_type': ticket_type.id,
+            'quantity': quantity,
+            'attendee_name': 'Juan Pérez',
+            'attendee_email': 'juan@example.com'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Ticket.objects.filter(ticket_type=ticket_type).order_by('id')
+
+    def test_statistics_follow_purchase_cancel_and_check_in(self):
+        """Test de estadísticas tras compra, cancelación y check-in."""
+        general = self.purchase(self.general, 3)
+        self.purchase(self.vip, 1)
+        InventoryService.cancel_ticket(general[0])
+        CheckInService.check_in({'pk': general[1].pk}, user=self.user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['tickets_sold'], 3)
+        self.assertEqual(response.data['tickets_cancelled'], 1)
+        self.assertEqual(response.data['attendees_checked_in'], 1)
+        self.assertEqual(Decimal(response.data['revenue']), Decimal('250000.00'))
+        by_type = {row['name']: row for row in response.data['by_ticket_type']}
+        self.assertEqual(by_type['General']['tickets_sold'], 2)
+        self.assertEqual(by_type['VIP']['tickets_sold'], 1)
+        self.assertEqual(Decimal(by_type['VIP']['revenue']), Decimal('150000.00'))
+
+    def test_incremental_matches_rebuild(self):
+        """Test de que los contadores coinciden con un recálculo completo."""
+        general = self.purchase(self.general, 4)
+        InventoryService.cancel_ticket(general[2])
+        CheckInService.check_in({'pk': general[0].pk}, user=self.user)
+        incremental = EventStatistics.objects.get(event=self.event)
+
+        rebuilt = StatisticsService.rebuild(self.event.pk)
+
+        for field in ('tickets_sold', 'tickets_cancelled', 'checked_in', 'revenue'):
+            self.assertEqual(getattr(incremental, field), getattr(rebuilt, field))
+
+    def test_statistics_query_count_is_constant(self):
+        """Test de que leer las estadísticas no depende de la cantidad de tickets."""
+        self.purchase(self.general, 2)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+
+        self.purchase(self.general, 10)
+        self.purchase(self.general, 10)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(self.url)
+
+        self.assertEqual(len(few), len(many))
+
+    def test_statistics_for_existing_tickets(self):
+        """Test de estadísticas de tickets creados antes de existir la fila."""
+        EventStatistics.objects.filter(event=self.event).delete()
+        Ticket.objects.create(
+            ticket_type=self.general,
+            buyer=self.user,
+            attendee_name="Juan Pérez",
+            attendee_email="juan@example.com",
+            purchase_price=Decimal('50000.00'),
+            discount_applied=Decimal('5000.00')
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data['tickets_sold'], 1)
+        self.assertEqual(Decimal(response.data['revenue']), Decimal('45000.00'))
+
+
+class EventListQueryCountTest(APITestCase):
+    """Tests para el número de consultas de los listados de eventos."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='organizer', password='testpass123')
+        self.category = Category.objects.create(name="Conciertos")
+        self.venue = Venue.objects.create(
+            name="Test Venue",
+            address="Test Address",
+            city="Test City",
+            state="Test State",
+            capacity=1000
+        )
+
+    def create_events(self, count):
+        for i in range(count):
+            event = Event.objects.create(
+                title=f"Evento {Event.objects.count()}",
+                description="Descripción",
+                category=self.category,
+                venue=self.venue,
+                organizer=self.user,
+                start_date=timezone.now() + timedelta(days=30),
+                end_date=timezone.now() + timedelta(days=30, hours=3),
+                capacity=100,
+                status='published'
+            )
+            for name, sold in (("General", 40), ("VIP", 10)):
+                TicketType.objects.create(
+                    event=event, name=name, price=Decimal('50000.00'),
+                    quantity=100, sold_count=sold
+                )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+            if response.streaming:
+                # Las respuestas en streaming consultan mientras se envían
+                response.data = json.loads(response.getvalue())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(ctx)
+
+    def test_list_query_count_is_constant(self):
+        """Test de consultas constantes por página."""
+        for url in ['/api/events/', '/api/events/upcoming/', '/api/events/featured/',
+                    f'/api/events/categories/{self.category.id}/events/',
+                    f'/api/events/venues/{self.venue.id}/events/']:
+            Event.objects.all().delete()
+            self.create_events(2)
+            _, few = self.count_queries(url)
+
+            self.create_events(8)
+            response, many = self.count_queries(url)
+
+            self.assertEqual(few, many, url)
+            rows = response.data['results'] if 'results' in response.data else response.data
+            self.assertEqual(rows[0]['tickets_available'], 50)
+            self.assertFalse(rows[0]['is_sold_out'])
+
+    def test_detail_uses_annotation(self):
+        """Test de detalle sin agregados repetidos."""
+        self.create_events(1)
+        event = Event.objects.get()
+
+        response, queries = self.count_queries(f'/api/events/{event.id}/')
+
+        self.assertEqual(response.data['tickets_sold'], 50)
+        self.assertEqual(response.data['tickets_available'], 50)
+        self.assertLessEqual(queries, 4)
+
+    def test_property_without_annotation(self):
+        """Test de la propiedad sin anotación."""
+        self.create_events(1)
+        annotated = Event.objects.with_ticket_totals().get()
+        plain = Event.objects.get()
+
+        self.assertEqual(annotated.tickets_sold, plain.tickets_sold)
+        self.assertEqual(annotated.total_tickets_sold, 50)
+
+
+class SalesRollupTest(APITestCase):
+    """Tests para las ventas agregadas por periodo y el dashboard."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='organizer', password='testpass123')
+        self.category = Category.objects.create(name="Conciertos")
+        self.event = self.create_event()
+        self.ticket_type = self.event.ticket_types.get()
+        self.client.force_authenticate(user=self.user)
+
+    def create_event(self):
+        event = Event.objects.create(
+            title="Concierto de Rock",
+            description="Gran concierto de rock",
+            category=self.category,
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=500,
+            status='published'
+        )
+        TicketType.objects.create(
+            event=event, name="General", price=Decimal('50000.00'), quantity=100
+        )
+        return event
+
+    def purchase(self, ticket_type, quantity):
+        response = self.client.post('/api/tickets/purchase/', {
+            'ticket_type': ticket_type.id,
+            'quantity': quantity,
+            'attendee_name': 'Juan Pérez',
+            'attendee_email': 'juan@example.com'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def rollups(self):
+        return {
+            (row.event_id, row.granularity, row.period, row.tickets_sold,
+             row.tickets_cancelled, row.revenue)
+            for row in SalesRollup.objects.all()
+        }
+
+    def test_purchase_and_cancel_update_rollups(self):
+        """Test de filas por hora y por día tras compra y cancelación."""
+        self.purchase(self.ticket_type, 3)
+        InventoryService.cancel_ticket(Ticket.objects.first())
+
+        for granularity in ('hour', 'day'):
+            row = SalesRollup.objects.get(event=self.event, granularity=granularity)
+            self.assertEqual(row.tickets_sold, 3)
+            self.assertEqual(row.tickets_cancelled, 1)
+            self.assertEqual(row.revenue, Decimal('100000.00'))
+
+    def test_backfill_matches_incremental(self):
+        """Test de que el backfill reproduce las filas incrementales."""
+        self.purchase(self.ticket_type, 2)
+        self.purchase(self.ticket_type, 1)
+        InventoryService.cancel_ticket(Ticket.objects.first())
+        incremental = self.rollups()
+
+        SalesRollupService.backfill([self.event.pk])
+
+        self.assertEqual(self.rollups(), incremental)
+
+    def test_sales_trend(self):
+        """Test de tendencia por día y por hora."""
+        self.purchase(self.ticket_type, 2)
+
+        response = self.client.get('/api/dashboard/sales_trend/', {'days': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['sales_trend']), 3)
+        self.assertEqual(response.data['sales_trend'][-1]['sales'], 2)
+
+        response = self.client.get(
+            '/api/dashboard/sales_trend/', {'days': 1, 'granularity': 'hour'}
+        )
+        trend = response.data['sales_trend']
+        self.assertEqual(len(trend), timezone.localtime().hour + 1)
+        self.assertEqual(trend[-1]['sales'], 2)
+        self.assertEqual(trend[-1]['revenue'], 100000.0)
+
+    def test_sales_trend_invalid_params(self):
+        """Test de parámetros inválidos."""
+        for params in ({'granularity': 'week'}, {'days': '0'}, {'days': 'x'},
+                       {'days': 60, 'granularity': 'hour'}):
+            response = self.client.get('/api/dashboard/sales_trend/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_dashboard_query_count_is_constant(self):
+        """Test de consultas constantes del dashboard."""
+        self.purchase(self.ticket_type, 2)
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get('/api/dashboard/')
+        self.assertEqual(response.data['tickets']['sold'], 2)
+        self.assertEqual(response.data['sales_trend'][-1]['sales'], 2)
+
+        for _ in range(5):
+            self.purchase(self.create_event().ticket_types.get(), 1)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get('/api/dashboard/', {'days': 30})
+
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(response.data['tickets']['sold'], 7)
+        self.assertEqual(response.data['events']['total'], 6)
+        self.assertEqual(len(response.data['sales_trend']), 30)
+
+
+class EventViewCounterTest(APITestCase):
+    """Tests para el contador de vistas con buffer."""
+
+    def setUp(self):
+        self.spool_dir = tempfile.mkdtemp()
+        settings_override = override_settings(
+            EVENT_VIEWS_SPOOL_DIR=self.spool_dir,
+            EVENT_VIEWS_SPOOL_INTERVAL=0,
+            EVENT_VIEWS_FLUSH_INTERVAL=3600,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutil.rmtree, self.spool_dir, ignore_errors=True)
+        # Descartar vistas de otros tests que quedaron en el buffer del proceso
+        view_counter.flush()
+
+        user = User.objects.create_user(username='organizer', password='testpass123')
+        category = Category.objects.create(name="Conciertos")
+        self.events = [
+            Event.objects.create(
+                title=f"Evento {i}",
+                description="Descripción",
+                category=category,
+                organizer=user,
+                start_date=timezone.now() + timedelta(days=30),
+                end_date=timezone.now() + timedelta(days=30, hours=3),
+                capacity=100,
+                status='published'
+            )
+            for i in range(3)
+        ]
+
+    def test_retrieve_does_not_write(self):
+        """Test de detalle sin UPDATE sobre el evento."""
+        event = self.events[0]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/events/{event.id}/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['views_count'], 1)
+        self.assertFalse(any(q['sql'].startswith('UPDATE') for q in ctx.captured_queries))
+        event.refresh_from_db()
+        self.assertEqual(event.views_count, 0)
+
+    def test_flush_applies_aggregated_deltas(self):
+        """Test de un solo UPDATE para todas las vistas acumuladas."""
+        for event, views in zip(self.events, (3, 1, 0)):
+            for _ in range(views):
+                self.client.get(f'/api/events/{event.id}/')
+
+        with CaptureQueriesContext(connection) as ctx:
+            applied = view_counter.flush()
+
+        self.assertEqual(applied, 4)
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        views = dict(Event.objects.values_list('id', 'views_count'))
+        self.assertEqual(
+            [views[event.id] for event in self.events], [3, 1, 0]
+        )
+        self.assertEqual(view_counter.flush(), 0)
+
+    def test_spooled_views_survive_process_restart(self):
+        """Test de vistas en cola aplicadas por otro proceso."""
+        view_counter.increment(self.events[0].pk, 5)
+
+        # Un contador nuevo simula otro proceso (o el mismo tras reiniciar)
+        ViewCounter().flush()
+
+        self.events[0].refresh_from_db()
+        self.assertEqual(self.events[0].views_count, 5)
+
+    def test_flush_command(self):
+        """Test del comando flush_event_views."""
+        view_counter.increment(self.events[1].pk, 2)
+        out = StringIO()
+
+        call_command('flush_event_views', stdout=out)
+
+        self.assertIn('Vistas aplicadas: 2', out.getvalue())
+        self.events[1].refresh_from_db()
+        self.assertEqual(self.events[1].views_count, 2)
+
+    def test_not_modified_counts_view(self):
+        """Test de 304 en el detalle que también cuenta la vista."""
+        event = self.events[0]
+        etag = self.client.get(f'/api/events/{event.id}/')['ETag']
+
+        response = self.client.get(f'/api/events/{event.id}/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(view_counter.flush(), 2)
+
+    def test_sale_changes_detail_etag(self):
+        """Test de ETag nuevo tras una venta (EventStatistics.updated_at)."""
+        event = self.events[0]
+        ticket_type = TicketType.objects.create(
+            event=event, name="General", price=Decimal('10000.00'), quantity=10
+        )
+        etag = self.client.get(f'/api/events/{event.id}/')['ETag']
+
+        StatisticsService.record_sale(ticket_type, 1, Decimal('10000.00'))
+
+        response = self.client.get(f'/api/events/{event.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class CatalogCacheTest(APITestCase):
+    """Tests para el cache de respuestas del catálogo."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='organizer', password='testpass123')
+        self.category = Category.objects.create(name="Conciertos")
+        self.event = Event.objects.create(
+            title="Concierto de Rock",
+            description="Gran concierto de rock",
+            category=self.category,
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=500,
+            status='published'
+        )
+
+    def cache_key(self, url):
+        request = APIRequestFactory().get(url)
+        request.user = AnonymousUser()
+        return catalog_cache_key(request)
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(ctx)
+
+    def test_hit_skips_database(self):
+        """Test de respuesta cacheada sin consultas."""
+        first, _ = self.get('/api/events/')
+        second, queries = self.get('/api/events/')
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(queries, 0)
+        self.assertEqual(second.data, first.data)
+
+    def test_hit_answers_not_modified(self):
+        """Test de 304 desde el cache sin consultas."""
+        first, _ = self.get('/api/events/')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/events/', HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response['ETag'], first['ETag'])
+        self.assertEqual(len(ctx), 0)
+
+    def test_query_string_is_normalized(self):
+        """Test de parámetros en distinto orden con la misma entrada."""
+        self.get('/api/events/', {'status': 'published', 'is_free': 'false'})
+        response, _ = self.get('/api/events/?is_free=false&status=published')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_roles_do_not_share_entries(self):
+        """Test de entradas separadas para anónimos y autenticados."""
+        self.get('/api/events/upcoming/')
+        self.client.force_authenticate(user=self.user)
+
+        response, _ = self.get('/api/events/upcoming/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_save_invalidates(self):
+        """Test de invalidación al guardar un evento."""
+        self.get('/api/events/')
+        self.event.title = "Concierto de Jazz"
+        self.event.save()
+
+        response, _ = self.get('/api/events/')
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['title'], "Concierto de Jazz")
+
+    def test_stale_while_revalidate(self):
+        """Test de respuesta vieja mientras otra petición regenera."""
+        self.get('/api/events/categories/')
+        Category.objects.create(name="Teatro")
+        cache.add(self.cache_key('/api/events/categories/') + ':lock', 1)
+
+        response, queries = self.get('/api/events/categories/')
+
+        self.assertEqual(response['X-Cache'], 'STALE')
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(queries, 0)
+
+    def test_streaming_response_is_cached(self):
+        """Test de cache del JSON de una respuesta en streaming."""
+        url = f'/api/events/categories/{self.category.id}/events/'
+        first, _ = self.get(url)
+        self.assertTrue(first.streaming)
+        # La entrada se guarda cuando termina de enviarse
+        self.assertIsNone(cache.get(self.cache_key(url)))
+        content = first.getvalue()
+
+        second, queries = self.get(url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(queries, 0)
+        self.assertEqual(second.content, content)
+        self.assertEqual(second['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(content)[0]['title'], "Concierto de Rock")
+
+    def test_streaming_miss_holds_lock_until_sent(self):
+        """Test de candado tomado mientras se envía la respuesta en streaming."""
+        url = f'/api/events/categories/{self.category.id}/events/'
+        lock_key = self.cache_key(url) + ':lock'
+
+        response, _ = self.get(url)
+        self.assertIsNotNone(cache.get(lock_key))
+        response.getvalue()
+        self.assertIsNone(cache.get(lock_key))
+
+        # Una respuesta que se cierra sin enviarse también suelta el candado
+        cache.clear()
+        response, _ = self.get(url)
+        self.assertIsNotNone(cache.get(lock_key))
+        # Como el cliente de pruebas, sin cerrar la conexión a la base de datos
+        request_finished.disconnect(close_old_connections)
+        try:
+            response.close()
+        finally:
+            request_finished.connect(close_old_connections)
+        self.assertIsNone(cache.get(lock_key))
+        self.assertIsNone(cache.get(self.cache_key(url)))
+
+    @override_settings(CATALOG_CACHE_WAIT=0.1)
+    def test_cold_miss_waits_for_lock_holder(self):
+        """Test de espera acotada cuando otra petición tiene el candado."""
+        key = self.cache_key('/api/events/venues/')
+        cache.add(key + ':lock', 1)
+
+        response, _ = self.get('/api/events/venues/')
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIsNone(cache.get(key))
+
+
+class EventSearchTest(APITestCase):
+    """Tests para la búsqueda de texto completo de eventos."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='organizer', password='testpass123')
+        self.category = Category.objects.create(name="Música")
+        self.rock = self.create_event(
+            "Conciertos de Rock", "Bandas nacionales en vivo", "música,rock"
+        )
+        self.jazz = self.create_event(
+            "Noche de Jazz", "Un concierto íntimo de jazz", "música,jazz"
+        )
+        self.talk = self.create_event(
+            "Conferencia de Tecnología", "Charlas sobre programación", "tecnología"
+        )
+
+    def create_event(self, title, description, tags):
+        return Event.objects.create(
+            title=title,
+            description=description,
+            tags=tags,
+            category=self.category,
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=100,
+            status='published'
+        )
+
+    def search(self, query):
+        response = self.client.get('/api/events/', {'search': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [event['title'] for event in response.data['results']]
+
+    def test_tokenize_spanish(self):
+        """Test de normalización, palabras vacías y raíces."""
+        self.assertEqual(tokenize("Los Conciertos de MÚSICA"), ['conciert', 'music'])
+        self.assertEqual(stem('concierto'), stem('conciertos'))
+        self.assertEqual(stem('programacion'), stem('programaciones'))
+
+    def test_ranking_and_stemming(self):
+        """Test de plural y singular, con el título antes que la descripción."""
+        self.assertEqual(self.search('concierto'), ["Conciertos de Rock", "Noche de Jazz"])
+
+    def test_prefix_and_accents(self):
+        """Test de prefijos y búsqueda sin tildes."""
+        self.assertEqual(self.search('tecno'), ["Conferencia de Tecnología"])
+        self.assertEqual(len(self.search('musica')), 2)
+
+    def test_all_terms_required(self):
+        """Test de búsqueda con varias palabras."""
+        self.assertEqual(self.search('concierto jazz'), ["Noche de Jazz"])
+        self.assertEqual(self.search('de la'), [])
+
+    def test_index_follows_save(self):
+        """Test de índice actualizado al guardar el evento."""
+        self.talk.title = "Festival de Cine"
+        self.talk.save()
+
+        self.assertEqual(self.search('festival'), ["Festival de Cine"])
+        self.assertEqual(self.search('conferencia'), [])
+
+    def test_rebuild_command(self):
+        """Test del comando rebuild_search_index."""
+        EventSearchTerm.objects.all().delete()
+        out = StringIO()
+
+        call_command('rebuild_search_index', stdout=out)
+
+        self.assertIn('3 eventos', out.getvalue())
+        self.assertEqual(self.search('jazz'), ["Noche de Jazz"])
+        self.assertEqual(EventSearch.backend(), 'index')
+
+
+class EventTagTest(APITestCase):
+    """Tests para las etiquetas normalizadas de eventos."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='organizer', password='testpass123')
+        self.category = Category.objects.create(name="Música")
+        self.rock = self.create_event("Rock al Parque", "Rock, Festival", 'published')
+        self.jazz = self.create_event("Noche de Jazz", "jazz,festival", 'published')
+        self.draft = self.create_event("Borrador", "Rock", 'draft')
+
+    def create_event(self, title, tags, event_status):
+        return Event.objects.create(
+            title=title,
+            description="Descripción",
+            tags=tags,
+            category=self.category,
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=100,
+            status=event_status
+        )
+
+    def test_filter_by_tag(self):
+        """Test de ?tag= sin importar mayúsculas del texto original."""
+        response = self.client.get('/api/events/', {'tag': 'festival', 'status': 'published'})
+        self.assertEqual(
+            sorted(event['title'] for event in response.data['results']),
+            ["Noche de Jazz", "Rock al Parque"]
+        )
+        response = self.client.get('/api/events/', {'tag': 'jazz,otro'})
+        self.assertEqual(response.data['count'], 1)
+
+    def test_tag_facets_follow_filters(self):
+        """Test de conteo por etiqueta con los filtros del listado."""
+        response = self.client.get('/api/events/tag_facets/', {'status': 'published'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(facet['name'], facet['count']) for facet in response.data],
+            [("Festival", 2), ("jazz", 1), ("Rock", 1)]
+        )
+
+    def test_save_syncs_tags(self):
+        """Test de relaciones actualizadas al editar el texto de etiquetas."""
+        self.rock.tags = "Rock"
+        self.rock.save()
+
+        self.assertEqual(list(self.rock.tag_set.values_list('slug', flat=True)), ['rock'])
+        self.assertEqual(Tag.objects.get(slug='festival').events.count(), 1)
+
+    def test_save_without_tag_changes_skips_sync(self):
+        """Test de guardado sin consultas a las etiquetas si no cambian."""
+        event = Event.objects.get(pk=self.rock.pk)
+        event.status = 'cancelled'
+
+        with CaptureQueriesContext(connection) as ctx:
+            event.save()
+        tables = ('"events_tag"', '"events_eventtag"')
+        self.assertFalse([
+            q['sql'] for q in ctx.captured_queries if any(table in q['sql'] for table in tables)
+        ])
+
+        event.tags = "Rock, Festival, Aire libre"
+        event.save(update_fields=['tags', 'updated_at'])
+        self.assertEqual(event.tag_set.count(), 3)
+
+
+class NearbyTest(APITestCase):
+    """Tests para la búsqueda de lugares y eventos cercanos."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='organizer', password='testpass123')
+        self.category = Category.objects.create(name="Conciertos")
+        self.colon = self.create_venue("Teatro Colón", "Bogotá", '4.596600', '-74.075600')
+        self.arena = self.create_venue("Movistar Arena", "Bogotá", '4.648600', '-74.077400')
+        self.medellin = self.create_venue("Teatro Metropolitano", "Medellín", '6.251800', '-75.563600')
+        self.create_venue("Sin coordenadas", "Cali", None, None)
+
+    def create_venue(self, name, city, latitude, longitude):
+        return Venue.objects.create(
+            name=name, address="Dirección", city=city, state="Estado",
+            capacity=1000, latitude=latitude, longitude=longitude
+        )
+
+    def create_event(self, title, venue, event_status='published', days=30):
+        return Event.objects.create(
+            title=title,
+            description="Descripción",
+            category=self.category,
+            venue=venue,
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=days),
+            end_date=timezone.now() + timedelta(days=days, hours=3),
+            capacity=100,
+            status=event_status
+        )
+
+    def test_geohash(self):
+        """Test de geohash conocido y mantenido al guardar."""
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        self.assertTrue(self.colon.geohash.startswith('d2g6'))
+
+        self.colon.latitude, self.colon.longitude = Decimal('6.2518'), Decimal('-75.5636')
+        self.colon.save(update_fields=['latitude', 'longitude'])
+        self.colon.refresh_from_db()
+        self.assertEqual(self.colon.geohash, self.medellin.geohash)
+
+    def test_venues_nearby_by_distance(self):
+        """Test de lugares dentro del radio ordenados por distancia."""
+        response = self.client.get(
+            '/api/events/venues/nearby/', {'lat': '4.6097', 'lon': '-74.0817', 'radius_km': '10'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [venue['name'] for venue in response.data], ["Teatro Colón", "Movistar Arena"]
+        )
+        self.assertLess(response.data[0]['distance_km'], response.data[1]['distance_km'])
+
+        response = self.client.get(
+            '/api/events/venues/nearby/', {'lat': '4.6097', 'lon': '-74.0817', 'radius_km': '300'}
+        )
+        self.assertEqual(len(response.data), 3)
+        self.assertAlmostEqual(
+            response.data[2]['distance_km'],
+            haversine_km(4.6097, -74.0817, 6.2518, -75.5636),
+            places=2
+        )
+
+    def test_nearby_requires_valid_params(self):
+        """Test de parámetros inválidos."""
+        for params in ({}, {'lat': 'x', 'lon': '1'}, {'lat': '95', 'lon': '0'},
+                       {'lat': '4', 'lon': '-74', 'radius_km': '0'},
+                       {'lat': '4', 'lon': '-74', 'limit': '1000'}):
+            response = self.client.get('/api/events/venues/nearby/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_across_antimeridian(self):
+        """Test de radio que cruza el meridiano 180."""
+        fiji = self.create_venue("Fiji", "Suva", '-16.500000', '179.990000')
+
+        response = self.client.get(
+            '/api/events/venues/nearby/', {'lat': '-16.5', 'lon': '-179.99', 'radius_km': '5'}
+        )
+
+        self.assertEqual([venue['id'] for venue in response.data], [fiji.id])
+
+    def test_events_nearby(self):
+        """Test de eventos próximos publicados cerca de un punto."""
+        near = self.create_event("Cerca", self.colon)
+        self.create_event("Borrador", self.colon, event_status='draft')
+        self.create_event("Pasado", self.colon, days=-3)
+        self.create_event("Lejos", self.medellin)
+        later = self.create_event("Cerca después", self.arena, days=40)
+
+        response = self.client.get(
+            '/api/events/nearby/', {'lat': '4.6097', 'lon': '-74.0817', 'radius_km': '15'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([event['id'] for event in response.data], [near.id, later.id])
+        self.assertIn('distance_km', response.data[0])
+
+
+class EventSparseFieldsTest(APITestCase):
+    """Tests de ?fields= y ?expand= en el listado de eventos."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='organizer', password='testpass123', first_name='Ana', last_name='Pérez'
+        )
+        self.venue = Venue.objects.create(
+            name="Teatro Colón", address="Calle 10", city="Bogotá", state="Cundinamarca",
+            capacity=1000
+        )
+        self.event = Event.objects.create(
+            title="Concierto",
+            description="Descripción",
+            category=Category.objects.create(name="Conciertos"),
+            venue=self.venue,
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=100,
+            status='published'
+        )
+        ticket_type = TicketType.objects.create(
+            event=self.event, name="General", price=Decimal('10.00'), quantity=50
+        )
+        TicketType.objects.filter(pk=ticket_type.pk).update(sold_count=30)
+
+    def test_fields_keep_annotations(self):
+        """Test de que los campos calculados usan la anotación y no consultan por fila"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/events/', {'fields': 'id,title,tickets_available'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        event = response.data['results'][0]
+        self.assertEqual(event, {'id': self.event.id, 'title': "Concierto", 'tickets_available': 70})
+        select = queries.captured_queries[-1]['sql']
+        self.assertNotIn('auth_user', select)
+        self.assertNotIn('"description"', select)
+
+    def test_expand_relations(self):
+        """Test de ?expand= con lugar y organizador"""
+        response = self.client.get('/api/events/', {
+            'expand': 'venue,organizer',
+            'fields': 'id,venue.full_address,organizer.full_name',
+        })
+
+        event = response.data['results'][0]
+        self.assertEqual(event['venue'], {'full_address': self.venue.full_address})
+        self.assertEqual(event['organizer'], {'full_name': 'Ana Pérez'})
+
+    def test_detail_fields(self):
+        """Test de ?fields= en el detalle"""
+        response = self.client.get(f'/api/events/{self.event.id}/', {'fields': 'id,title,tag_list'})
+
+        self.assertEqual(set(response.data), {'id', 'title', 'tag_list'})
+
+
+class CompiledEventSerializerTest(APITestCase):
+    """Tests del listado de eventos con el serializer compilado."""
+
+    def setUp(self):
+        cache.clear()
+        named = User.objects.create_user(
+            username='organizer', password='testpass123', first_name='Ana', last_name='Pérez'
+        )
+        unnamed = User.objects.create_user(username='sin_nombre', password='testpass123')
+        category = Category.objects.create(name="Conciertos")
+        venue = Venue.objects.create(
+            name="Teatro Colón", address="Calle 10", city="Bogotá", state="Cundinamarca",
+            capacity=1000
+        )
+        for index, (organizer, place) in enumerate(((named, venue), (unnamed, None), (named, None))):
+            event = Event.objects.create(
+                title=f"Evento {index}",
+                description="Descripción",
+                category=category,
+                venue=place,
+                organizer=organizer,
+                start_date=timezone.now() + timedelta(days=30 + index),
+                end_date=timezone.now() + timedelta(days=30 + index, hours=3),
+                capacity=50,
+                is_free=bool(index % 2),
+                status='published'
+            )
+            ticket_type = TicketType.objects.create(
+                event=event, name="General", price=Decimal('10.00'), quantity=50
+            )
+            TicketType.objects.filter(pk=ticket_type.pk).update(sold_count=25 * index)
+        Event.objects.filter(title="Evento 0").update(thumbnail='events/thumbnails/colon.jpg')
+
+    def test_same_output_as_serializer(self):
+        """Test de que la salida compilada es idéntica a la de DRF"""
+        response = self.client.get('/api/events/')
+        cache.clear()
+        with override_settings(COMPILED_SERIALIZERS_ENABLED=False):
+            expected = self.client.get('/api/events/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, expected.content)
+        by_title = {event['title']: event for event in response.data['results']}
+        self.assertNotIn('venue_name', by_title['Evento 1'])
+        self.assertEqual(by_title['Evento 1']['organizer_name'], 'sin_nombre')
+        self.assertTrue(by_title['Evento 2']['is_sold_out'])
+        self.assertTrue(by_title['Evento 0']['thumbnail'].endswith('colon.jpg'))
+
+    def test_search_results_compiled(self):
+        """Test de salida idéntica con búsqueda y orden por relevancia"""
+        response = self.client.get('/api/events/', {'search': 'evento', 'fields': 'id,title,tickets_available'})
+        cache.clear()
+        with override_settings(COMPILED_SERIALIZERS_ENABLED=False):
+            expected = self.client.get('/api/events/', {'search': 'evento', 'fields': 'id,title,tickets_available'})
+
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(len(response.data['results']), 3)
+
+
+class MassEmailTest(TestCase):
+    """Tests para el renderizado único de emails masivos."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='organizer', password='test123')
+        self.event = Event.objects.create(
+            title="Rock & Jazz",
+            description="Test Description",
+            category=Category.objects.create(name="Conciertos"),
+            venue=Venue.objects.create(
+                name="Teatro", address="Calle 1", city="Bogotá", state="Cundinamarca", capacity=100
+            ),
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=1, hours=3),
+            capacity=100,
+            status='published'
+        )
+        ticket_type = TicketType.objects.create(
+            event=self.event, name="General", price=Decimal('50000.00'), quantity=50
+        )
+        self.tickets = [
+            Ticket.objects.create(
+                ticket_type=ticket_type,
+                buyer=self.user,
+                attendee_name=name,
+                attendee_email=f"asistente{i}@example.com",
+                purchase_price=Decimal('50000.00'),
+                discount_applied=Decimal('2500.50') * i
+            )
+            for i, name in enumerate(["Ana <b>O'Neil</b>", "Luis Pérez", "María & José"])
+        ]
+
+    def cancelled_template(self, fields=CANCELLED_FIELDS):
+        return MassEmailTemplate(
+            'event_cancelled',
+            {'event': self.event, 'frontend_url': 'https://eventhub.test'},
+            fields=fields,
+            recipient_context=ticket_context,
+        )
+
+    def full_render(self, ticket):
+        return EmailService.render('event_cancelled', {
+            'event': self.event,
+            'frontend_url': 'https://eventhub.test',
+            'ticket': ticket,
+            'attendee_name': ticket.attendee_name,
+        })
+
+    def test_mass_render_matches_full_render(self):
+        """Test de emails masivos iguales al renderizado por destinatario."""
+        template = self.cancelled_template()
+
+        for ticket in self.tickets:
+            self.assertEqual(template.render(ticket), self.full_render(ticket))
+        self.assertTrue(template.exact)
+        html, text = template.render(self.tickets[0])
+        self.assertIn('Ana &lt;b&gt;O&#x27;Neil&lt;/b&gt;', html)
+        self.assertIn(self.tickets[0].code, text)
+
+    def test_unsupported_field_falls_back_to_full_render(self):
+        """Test de template que no admite renderizado masivo."""
+        template = self.cancelled_template(
+            {**CANCELLED_FIELDS, 'ticket.final_price': lambda ticket: str(ticket.final_price)}
+        )
+
+        with self.assertLogs('core.emails', 'WARNING'):
+            rendered = [template.render(ticket) for ticket in self.tickets]
+
+        self.assertFalse(template.exact)
+        self.assertEqual(rendered, [self.full_render(ticket) for ticket in self.tickets])
+
+    def test_send_event_reminders_command(self):
+        """Test de recordatorios encolados por evento."""
+        Ticket.objects.filter(pk=self.tickets[2].pk).update(status='cancelled')
+
+        out = StringIO()
+        call_command('send_event_reminders', '--days', '1', stdout=out)
+
+        self.assertIn('Recordatorios encolados: 2', out.getvalue())
+        emails = OutboundEmail.objects.order_by('to_email')
+        self.assertEqual(
+            [email.to_email for email in emails], ['asistente0@example.com', 'asistente1@example.com']
+        )
+        self.assertEqual(emails[1].subject, 'Recordatorio: Rock & Jazz en 1 días')
+        self.assertIn('Hola <strong>Luis Pérez</strong>', emails[1].html)
+        self.assertIn('Teatro', emails[1].body)
@@ -2,35 +2,84 @@
 Views para eventos.
 """
 import logging
+import tempfile
 
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django.utils import timezone
-from django.db.models import Q, Count, Sum, F
+from django.db.models import Q, Count, Sum
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from core.emails import EmailService
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-from django.http import HttpResponse
+from django.conf import settings
+from django.db import transaction
+from django.core.files.storage import default_storage
+from django.http import FileResponse, StreamingHttpResponse
 
-from .models import Category, Venue, Event
+from .models import Category, Venue, Event, EventTag, Tag
 from .serializers import (
     CategorySerializer, CategoryDetailSerializer,
     VenueSerializer, VenueDetailSerializer,
     EventListSerializer, EventDetailSerializer,
-    EventCreateUpdateSerializer, EventStatisticsSerializer
+    EventCreateUpdateSerializer, EventStatisticsSerializer,
+    NearbyVenueSerializer, NearbyEventSerializer
 )
-from .filters import EventFilter
+from .counters import view_counter
+from .exports import CONTENT_TYPE as EXCEL_CONTENT_TYPE, EXPORT_JOB, EventExportService
+from .jobs import NOTIFY_CANCELLED_JOB
+from .filters import EventFilter, EventSearchFilter
+from .geo import nearby_q, rank_by_distance
+from apps.jobs.models import Job
+from apps.jobs.services import JobService
+from core.cache import cached_catalog
+from core.conditional import ConditionalGetMixin
 from core.permissions import IsEventOrganizer, IsAdminOrReadOnly
+from core.compiled import CompiledListMixin
+from core.sparse import SparseQuerysetMixin
+from core.streaming import streaming_response
 
 logger = logging.getLogger(__name__)
 
+NEARBY_DEFAULT_RADIUS_KM = 10
+NEARBY_MAX_RADIUS_KM = 500
+NEARBY_DEFAULT_LIMIT = 20
+NEARBY_MAX_LIMIT = 100
 
-class CategoryViewSet(viewsets.ModelViewSet):
+
+def _nearby_params(query_params):
+    """
+    Leer ``lat``, ``lon``, ``radius_km`` y ``limit`` de la petición.
+
+    Returns:
+        tuple: (lat, lon, radius_km, limit, error)
+    """
+    try:
+        lat = float(query_params['lat'])
+        lon = float(query_params['lon'])
+    except (KeyError, ValueError):
+        return None, None, None, None, 'Se requieren parámetros lat y lon'
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None, None, None, None, 'lat debe estar entre -90 y 90 y lon entre -180 y 180'
+
+    try:
+        radius_km = float(query_params.get('radius_km', NEARBY_DEFAULT_RADIUS_KM))
+    except ValueError:
+        radius_km = -1
+    if not 0 < radius_km <= NEARBY_MAX_RADIUS_KM:
+        return None, None, None, None, (
+            f'radius_km debe ser mayor que 0 y máximo {NEARBY_MAX_RADIUS_KM}'
+        )
+
+    limit = query_params.get('limit', str(NEARBY_DEFAULT_LIMIT))
+    if not limit.isdigit() or not 1 <= int(limit) <= NEARBY_MAX_LIMIT:
+        return None, None, None, None, f'limit debe ser un número entre 1 y {NEARBY_MAX_LIMIT}'
+    return lat, lon, radius_km, int(limit), None
+
+
+class CategoryViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de categorías.
     
@@ -51,18 +100,28 @@ class CategoryViewSet(viewsets.ModelViewSet):
             return CategoryDetailSerializer
         return CategorySerializer
 
+    @cached_catalog
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cached_catalog
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=True, methods=['get'])
+    @cached_catalog
     def events(self, request, pk=None):
         """
         Obtener todos los eventos de una categoría.
         """
         category = self.get_object()
-        events = category.events.filter(status='published')
-        serializer = EventListSerializer(events, many=True)
-        return Response(serializer.data)
+        events = Event.objects.select_related(
+            'category', 'venue', 'organizer'
+        ).with_ticket_totals().filter(category=category, status='published')
+        return streaming_response(request, EventListSerializer(events, many=True))
 
 
-class VenueViewSet(viewsets.ModelViewSet):
+class VenueViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de lugares.
     
@@ -84,38 +143,46 @@ class VenueViewSet(viewsets.ModelViewSet):
             return VenueDetailSerializer
         return VenueSerializer
 
+    @cached_catalog
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cached_catalog
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=True, methods=['get'])
+    @cached_catalog
     def events(self, request, pk=None):
         """
         Obtener todos los eventos de un lugar.
         """
         venue = self.get_object()
-        events = venue.events.filter(status='published')
-        serializer = EventListSerializer(events, many=True)
-        return Response(serializer.data)
+        events = Event.objects.select_related(
+            'category', 'venue', 'organizer'
+        ).with_ticket_totals().filter(venue=venue, status='published')
+        return streaming_response(request, EventListSerializer(events, many=True))
 
     @action(detail=False, methods=['get'])
     def nearby(self, request):
         """
-        Buscar lugares cercanos (requiere lat y lon en query params).
+        Buscar lugares cercanos a un punto, del más cercano al más lejano.
+
+        Query params: lat, lon, radius_km (por defecto 10) y limit. El
+        prefiltro usa el índice de geohash y la distancia exacta se calcula
+        con haversine (ver ``apps/events/geo.py``).
         """
-        lat = request.query_params.get('lat')
-        lon = request.query_params.get('lon')
-        
-        if not lat or not lon:
-            return Response(
-                {'error': 'Se requieren parámetros lat y lon'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Aquí podrías implementar búsqueda geográfica real
-        # Por ahora retornamos todos los venues
-        venues = self.queryset.all()[:10]
-        serializer = self.get_serializer(venues, many=True)
+        lat, lon, radius_km, limit, error = _nearby_params(request.query_params)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        candidates = self.queryset.filter(nearby_q(lat, lon, radius_km))
+        venues = rank_by_distance(candidates, lat, lon, radius_km)[:limit]
+        serializer = NearbyVenueSerializer(venues, many=True, context={'request': request})
         return Response(serializer.data)
 
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(ConditionalGetMixin, CompiledListMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de eventos.
     
@@ -130,10 +197,14 @@ class EventViewSet(viewsets.ModelViewSet):
     statistics: Obtener estadísticas del evento
     """
     queryset = Event.objects.select_related(
-        'category', 'venue', 'organizer'
-    ).all()
+        'category', 'venue', 'organizer', 'statistics'
+    ).with_ticket_totals()
+    # Las ventas actualizan EventStatistics.updated_at, no Event.updated_at
+    conditional_fields = (
+        'updated_at', 'category__updated_at', 'venue__updated_at', 'statistics__updated_at',
+    )
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, EventSearchFilter, OrderingFilter]
     filterset_class = EventFilter
     search_fields = ['title', 'description', 'tags']
     ordering_fields = ['start_date', 'created_at', 'views_count', 'capacity']
@@ -151,16 +222,28 @@ class EventViewSet(viewsets.ModelViewSet):
         """Permisos según la acción."""
         if self.action in ['update', 'partial_update', 'destroy', 'publish', 'unpublish', 'cancel']:
             return [IsAuthenticated(), IsEventOrganizer()]
+        if self.action in ['checkin_manifest', 'export_excel']:
+            return [IsAuthenticated()]
         return super().get_permissions()
 
+    @cached_catalog
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     def retrieve(self, request, *args, **kwargs):
-        """Incrementar contador de vistas al ver detalle."""
+        """
+        Incrementar contador de vistas al ver detalle.
+
+        La vista se acumula en ``view_counter`` y llega a la base de datos
+        en el siguiente flush (ver ``apps/events/counters.py``). Una
+        respuesta 304 también cuenta como vista.
+        """
         instance = self.get_object()
-        instance.views_count = F('views_count') + 1
-        instance.save(update_fields=['views_count'])
-        instance.refresh_from_db()
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        view_counter.increment(instance.pk)
+        instance.views_count += 1
+        return self.conditional_object(
+            request, instance, lambda: self.get_retrieve_response(instance)
+        )
 
     @action(detail=True, methods=['post'])
     def publish(self, request, pk=None):
@@ -203,7 +286,7 @@ class EventViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
         """
-        Cancelar un evento.
+        Cancelar un evento y notificar a los asistentes con tickets activos.
         """
         event = self.get_object()
         
@@ -213,20 +296,13 @@ class EventViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        event.status = 'cancelled'
-        event.save()
+        with transaction.atomic():
+            event.status = 'cancelled'
+            event.save()
+            # Los emails se encolan en segundo plano (ver jobs.py) y los envía
+            # manage.py send_outbox: la petición no espera al servidor SMTP
+            JobService.enqueue(NOTIFY_CANCELLED_JOB, {'event_id': event.pk})
 
-       # Notificar cancelación por email
-        from core.emails import EmailService
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        try:
-            EmailService.send_event_cancelled(event)
-            logger.info(f"Emails de cancelación enviados para {event.title}")
-        except Exception as e:
-            logger.error(f"Error enviando emails de cancelación: {e}")
-        
         serializer = self.get_serializer(event)
         return Response(serializer.data)
 
@@ -238,35 +314,63 @@ class EventViewSet(viewsets.ModelViewSet):
         event = self.get_object()
         
         # Importar aquí para evitar circular import
-        from apps.tickets.models import Ticket
-        from apps.attendees.models import CheckInLog
-        
-        tickets = Ticket.objects.filter(
-            ticket_type__event=event,
-            status='active'
-        )
-        
-        total_revenue = sum(
-            ticket.ticket_type.price for ticket in tickets
-        )
-        
-        checked_in = CheckInLog.objects.filter(
-            attendee__ticket__ticket_type__event=event
-        ).values('attendee').distinct().count()
-        
+        from .services import StatisticsService
+
+        totals = StatisticsService.get(event)
         stats = {
             'total_capacity': event.capacity,
-            'tickets_sold': event.tickets_sold,
-            'tickets_available': event.tickets_available,
-            'revenue': total_revenue,
-            'attendees_checked_in': checked_in,
-            'conversion_rate': (event.tickets_sold / event.capacity * 100) if event.capacity > 0 else 0
+            'tickets_sold': totals.tickets_sold,
+            'tickets_available': max(event.capacity - totals.tickets_sold, 0),
+            'tickets_cancelled': totals.tickets_cancelled,
+            'revenue': totals.revenue,
+            'attendees_checked_in': totals.checked_in,
+            'conversion_rate': (totals.tickets_sold / event.capacity * 100) if event.capacity > 0 else 0,
+            'by_ticket_type': StatisticsService.by_ticket_type(event),
         }
         
         serializer = EventStatisticsSerializer(stats)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def checkin_manifest(self, request, pk=None):
+        """
+        Descargar el manifiesto de check-in para escáneres sin conexión.
+
+        Sin parámetros devuelve el manifiesto completo; con ``?since=<versión>``
+        solo los tickets que cambiaron desde esa versión. La versión a usar en
+        la siguiente sincronización va en la cabecera ``X-Manifest-Version``.
+        El formato está descrito en ``apps/tickets/manifest.py``.
+        """
+        event = self.get_object()
+
+        if event.organizer != request.user and not request.user.is_staff:
+            return Response(
+                {'error': 'No tienes permiso para descargar el manifiesto de este evento'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        since = request.query_params.get('since')
+        if since is not None:
+            if not since.isdigit():
+                return Response(
+                    {'error': 'since debe ser una versión numérica'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            since = int(since)
+
+        # Importar aquí para evitar circular import
+        from apps.tickets.manifest import build_manifest
+
+        version, content = build_manifest(event, since)
+        response = StreamingHttpResponse(content, content_type='application/octet-stream')
+        response['X-Manifest-Version'] = str(version)
+        response['Content-Disposition'] = (
+            f'attachment; filename="manifest_{event.pk}_{version}.bin"'
+        )
+        return response
+
     @action(detail=False, methods=['get'])
+    @cached_catalog
     def upcoming(self, request):
         """
         Obtener eventos próximos.
@@ -280,6 +384,7 @@ class EventViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
+    @cached_catalog
     def featured(self, request):
         """
         Obtener eventos destacados (más vistos).
@@ -292,6 +397,40 @@ class EventViewSet(viewsets.ModelViewSet):
         serializer = EventListSerializer(events, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        """
+        Eventos próximos publicados cerca de un punto, del más cercano al más lejano.
+
+        Mismos parámetros que ``venues/nearby``; los eventos en línea o sin
+        coordenadas no aparecen.
+        """
+        lat, lon, radius_km, limit, error = _nearby_params(request.query_params)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        candidates = self.queryset.filter(
+            nearby_q(lat, lon, radius_km, prefix='venue__'),
+            status='published',
+            start_date__gte=timezone.now(),
+        ).order_by('start_date')
+        events = rank_by_distance(
+            candidates, lat, lon, radius_km, venue=lambda event: event.venue
+        )[:limit]
+        serializer = NearbyEventSerializer(events, many=True, context={'request': request})
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    @cached_catalog
+    def tag_facets(self, request):
+        """
+        Cantidad de eventos por etiqueta.
+
+        Acepta los mismos filtros que el listado (``?status=``, ``?search=``...).
+        """
+        events = self.filter_queryset(self.get_queryset())
+        return Response(Tag.facets(EventTag, events))
+
     @action(detail=False, methods=['get'])
     def my_events(self, request):
         """
@@ -304,97 +443,73 @@ class EventViewSet(viewsets.ModelViewSet):
             )
         
         events = self.queryset.filter(organizer=request.user)
-        serializer = EventListSerializer(events, many=True)
-        return Response(serializer.data)
+        return self.conditional_list(
+            request, events,
+            lambda: streaming_response(request, EventListSerializer(events, many=True))
+        )
     
     @action(detail=True, methods=['get'])
     def export_excel(self, request, pk=None):
         """
         Exportar reporte completo del evento a Excel.
+
+        Hasta ``EXCEL_EXPORT_ASYNC_THRESHOLD`` tickets descarga el archivo.
+        Con más, encola el trabajo que lo genera y responde 202 con
+        ``job_id``; el archivo se descarga con ``?job=<job_id>`` cuando el
+        trabajo termina (mientras tanto responde 202 con el estado). Ver
+        ``apps/events/exports.py``.
         """
         event = self.get_object()
-        
-        # Crear workbook
-        wb = Workbook()
-
-        # Hoja 1: Información del evento
-        ws1 = wb.active
-        ws1.title = "Información del Evento"
-
-        # Headers con estilo
-        header_fill = PatternFill(start_color="3498DB", end_color="3498DB", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
-
-        ws1['A1'] = 'EventHub - Reporte de Evento'
-        ws1['A1'].font = Font(bold=True, size=16)
-        ws1.merge_cells('A1:D1')
-
-        ws1['A3'] = 'Campo'
-        ws1['B3'] = 'Valor'
-        ws1['A3'].fill = header_fill
-        ws1['B3'].fill = header_fill
-        ws1['A3'].font = header_font
-        ws1['B3'].font = header_font
-
-        # Datos del evento
-        info_data = [
-            ['Título', event.title],
-            ['Categoría', event.category.name],
-            ['Lugar', event.venue.name if event.venue else 'N/A'],
-            ['Fecha Inicio', event.start_date.strftime('%Y-%m-%d %H:%M')],
-            ['Fecha Fin', event.end_date.strftime('%Y-%m-%d %H:%M')],
-            ['Capacidad', event.capacity],
-            ['Tickets Vendidos', event.tickets_sold],
-            ['Tickets Disponibles', event.tickets_available],
-            ['Estado', event.get_status_display()],
-        ]
-
-        for idx, (field, value) in enumerate(info_data, start=4):
-            ws1[f'A{idx}'] = field
-            ws1[f'B{idx}'] = value
-
-        # Hoja 2: Tickets vendidos
-        ws2 = wb.create_sheet("Tickets Vendidos")
-        headers = ['Código', 'Tipo', 'Comprador', 'Email', 'Precio', 'Estado', 'Fecha Compra']
-
-        for col, header in enumerate(headers, start=1):
-            cell = ws2.cell(row=1, column=col, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-
-        from apps.tickets.models import Ticket
-        tickets = Ticket.objects.filter(
-            ticket_type__event=event
-        ).select_related('buyer', 'ticket_type')
-
-        for row, ticket in enumerate(tickets, start=2):
-            ws2.cell(row=row, column=1, value=ticket.code)
-            ws2.cell(row=row, column=2, value=ticket.ticket_type.name)
-            ws2.cell(row=row, column=3, value=ticket.buyer.username)
-            ws2.cell(row=row, column=4, value=ticket.attendee_email)
-            ws2.cell(row=row, column=5, value=float(ticket.final_price))
-            ws2.cell(row=row, column=6, value=ticket.get_status_display())
-            ws2.cell(row=row, column=7, value=ticket.purchased_at.strftime('%Y-%m-%d %H:%M'))
-
-        # Ajustar ancho de columnas
-        for ws in [ws1, ws2]:
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(cell.value)
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
-
-        # Generar respuesta
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+        if event.organizer != request.user and not request.user.is_staff:
+            return Response(
+                {'error': 'No tienes permiso para exportar el reporte de este evento'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        job_id = request.query_params.get('job')
+        if job_id is not None:
+            return self.export_job_response(event, job_id)
+
+        summary = EventExportService.ticket_summary(event)
+        if summary['count'] > settings.EXCEL_EXPORT_ASYNC_THRESHOLD:
+            job = EventExportService.enqueue(event, request.user)
+            return Response({
+                'job_id': job.pk,
+                'status': job.status,
+                'url': f"{request.build_absolute_uri(request.path)}?job={job.pk}",
+            }, status=status.HTTP_202_ACCEPTED)
+
+        # Archivo temporal: FileResponse lo envía por bloques y lo cierra
+        fileobj = tempfile.TemporaryFile()
+        EventExportService.write(event, fileobj, summary)
+        fileobj.seek(0)
+        return FileResponse(
+            fileobj, as_attachment=True, filename=f'reporte_{event.slug}.xlsx',
+            content_type=EXCEL_CONTENT_TYPE
         )
-        response['Content-Disposition'] = f'attachment; filename=reporte_{event.slug}.xlsx'
-        wb.save(response)
 
-        return response
+    def export_job_response(self, event, job_id):
+        """Estado del trabajo de exportación ``job_id`` o el archivo generado."""
+        job = None
+        if job_id.isdigit():
+            job = Job.objects.filter(pk=job_id, name=EXPORT_JOB, payload__event_id=event.pk).first()
+        if job is None:
+            return Response(
+                {'error': 'Exportación no encontrada'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if job.status == 'failed':
+            return Response(
+                {'error': 'No se pudo generar el reporte', 'job_id': job.pk, 'status': job.status},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        if job.status != 'done':
+            return Response(
+                {'job_id': job.pk, 'status': job.status},
+                status=status.HTTP_202_ACCEPTED
+            )
+        return FileResponse(
+            default_storage.open(job.payload['path'], 'rb'), as_attachment=True,
+            filename=f'reporte_{event.slug}.xlsx', content_type=EXCEL_CONTENT_TYPE
+        )
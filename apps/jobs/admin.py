@@ -0,0 +1,55 @@
+"""
+Configuración del admin para trabajos en segundo plano y bandeja de salida.
+"""
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job, OutboundEmail
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = [
+        'id', 'name', 'status', 'attempts', 'max_attempts',
+        'run_at', 'locked_by', 'finished_at'
+    ]
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'last_error']
+    readonly_fields = [
+        'attempts', 'locked_by', 'locked_at', 'last_error',
+        'finished_at', 'created_at', 'updated_at'
+    ]
+    actions = ['retry_jobs']
+
+    @admin.action(description="Reintentar trabajos seleccionados")
+    def retry_jobs(self, request, queryset):
+        updated = queryset.exclude(status='running').update(
+            status='pending',
+            attempts=0,
+            run_at=timezone.now(),
+            finished_at=None,
+        )
+        self.message_user(request, f"{updated} trabajo(s) encolados de nuevo.")
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = [
+        'id', 'to_email', 'subject', 'status', 'attempts',
+        'run_at', 'locked_by', 'sent_at'
+    ]
+    list_filter = ['status']
+    search_fields = ['to_email', 'subject', 'last_error']
+    readonly_fields = [
+        'attempts', 'locked_by', 'locked_at', 'last_error',
+        'sent_at', 'created_at', 'updated_at'
+    ]
+    actions = ['retry_emails']
+
+    @admin.action(description="Reintentar emails seleccionados")
+    def retry_emails(self, request, queryset):
+        updated = queryset.exclude(status__in=('sending', 'sent')).update(
+            status='pending',
+            attempts=0,
+            run_at=timezone.now(),
+        )
+        self.message_user(request, f"{updated} email(s) encolados de nuevo.")
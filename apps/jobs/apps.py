@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.jobs'
+    verbose_name = 'Trabajos en Segundo Plano'
+
+    def ready(self):
+        # Cada app declara sus trabajos en un módulo jobs.py
+        autodiscover_modules('jobs')
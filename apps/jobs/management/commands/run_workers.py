@@ -0,0 +1,121 @@
+"""
+Comando para ejecutar los trabajos en segundo plano.
+Ejecutar: python manage.py run_workers --concurrency 4
+"""
+import logging
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connection
+
+from apps.jobs.services import JobService
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los trabajos encolados en la base de datos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Cantidad de workers en paralelo (default: 1)'
+        )
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=1,
+            help='Trabajos que toma cada worker por consulta (default: 1)'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Segundos de espera cuando la cola está vacía (default: 1)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Vaciar la cola y terminar en lugar de esperar nuevos trabajos'
+        )
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        self.processed = 0
+        self.lock = threading.Lock()
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.request_stop)
+            signal.signal(signal.SIGTERM, self.request_stop)
+
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        concurrency = max(options['concurrency'], 1)
+        self.stdout.write(f'🚀 Iniciando {concurrency} worker(s)...')
+
+        if concurrency == 1:
+            self.work(f"{prefix}:0", options)
+        else:
+            threads = [
+                threading.Thread(
+                    target=self.work_in_thread,
+                    args=(f"{prefix}:{index}", options),
+                    daemon=True,
+                )
+                for index in range(concurrency)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Trabajos ejecutados: {self.processed}'))
+
+    def request_stop(self, signum, frame):
+        """Terminar el trabajo en curso y salir."""
+        self.stdout.write('⏹ Deteniendo workers...')
+        self.stop.set()
+
+    def work_in_thread(self, worker_id, options):
+        """Worker en un hilo propio, con su propia conexión a la base de datos."""
+        try:
+            self.work(worker_id, options)
+        finally:
+            connection.close()
+
+    def work(self, worker_id, options):
+        """Ciclo de un worker: tomar, ejecutar y esperar si no hay trabajos."""
+        while not self.stop.is_set():
+            close_old_connections()
+            try:
+                jobs = JobService.claim(worker_id, limit=options['batch'])
+            except DatabaseError as e:
+                # Bloqueos o caídas momentáneas: reintentar en el próximo ciclo
+                logger.warning(f"[{worker_id}] Error tomando trabajos: {e}")
+                self.stop.wait(options['sleep'])
+                continue
+
+            if not jobs:
+                if options['once']:
+                    break
+                self.stop.wait(options['sleep'])
+                continue
+
+            for job in jobs:
+                try:
+                    ok = JobService.run(job)
+                except DatabaseError as e:
+                    # El resultado no se guardó: el trabajo sigue "running" y
+                    # se reintenta cuando vence JOBS_LOCK_TIMEOUT
+                    logger.error(f"[{worker_id}] Error registrando {job.name} #{job.pk}: {e}")
+                    ok = False
+                with self.lock:
+                    self.processed += 1
+                if options['verbosity'] > 1:
+                    status = 'ok' if ok else 'error'
+                    self.stdout.write(f'[{worker_id}] {job.name} #{job.pk}: {status}')
@@ -0,0 +1,88 @@
+"""
+Comando para enviar los emails de la bandeja de salida.
+Ejecutar: python manage.py send_outbox --rate 10
+"""
+import logging
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from apps.jobs.outbox import OutboxSender
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Envía los emails encolados en la bandeja de salida'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=None,
+            help='Emails por segundo como máximo, 0 sin límite (default: EMAIL_OUTBOX_RATE_LIMIT)'
+        )
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=None,
+            help='Emails que toma el worker por consulta (default: EMAIL_OUTBOX_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Segundos de espera cuando la cola está vacía (default: 1)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Vaciar la cola y terminar en lugar de esperar nuevos emails'
+        )
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.request_stop)
+            signal.signal(signal.SIGTERM, self.request_stop)
+
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:outbox"
+        sender = OutboxSender(worker_id, rate=options['rate'], batch_size=options['batch'])
+        processed = 0
+        self.stdout.write('📨 Enviando la bandeja de salida...')
+
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                try:
+                    claimed = sender.send_batch()
+                except DatabaseError as e:
+                    # Bloqueos o caídas momentáneas: reintentar en el próximo ciclo
+                    logger.warning(f"[{worker_id}] Error tomando emails: {e}")
+                    self.stop.wait(options['sleep'])
+                    continue
+
+                if not claimed:
+                    # Sin trabajo no se mantiene la conexión SMTP abierta
+                    sender.close()
+                    if options['once']:
+                        break
+                    self.stop.wait(options['sleep'])
+                    continue
+
+                processed += claimed
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'[{worker_id}] {claimed} email(s) procesados')
+        finally:
+            sender.close()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Emails procesados: {processed}'))
+
+    def request_stop(self, signum, frame):
+        """Terminar el lote en curso y salir."""
+        self.stdout.write('⏹ Deteniendo el envío...')
+        self.stop.set()
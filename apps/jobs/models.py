@@ -0,0 +1,98 @@
+"""
+Modelos para la cola de trabajos en segundo plano.
+"""
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Trabajo pendiente de ejecución por ``manage.py run_workers``.
+
+    La cola vive en la misma base de datos que el resto del proyecto, así que
+    un trabajo encolado dentro de una transacción solo es visible para los
+    workers si esa transacción hace commit.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('running', 'En ejecución'),
+        ('done', 'Completado'),
+        ('failed', 'Fallido'),
+    ]
+
+    name = models.CharField(max_length=100, verbose_name="Nombre")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Datos")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name="Estado"
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Intentos")
+    max_attempts = models.PositiveIntegerField(default=5, verbose_name="Máximo de intentos")
+    run_at = models.DateTimeField(default=timezone.now, verbose_name="Ejecutar desde")
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name="Worker")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Tomado en")
+    last_error = models.TextField(blank=True, verbose_name="Último error")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Finalizado en")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Trabajo"
+        verbose_name_plural = "Trabajos"
+        ordering = ['run_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class OutboundEmail(models.Model):
+    """
+    Email ya renderizado pendiente de envío por ``manage.py send_outbox``.
+
+    Los envíos masivos (por ejemplo la cancelación de un evento) insertan
+    una fila por destinatario y el worker los envía por lotes reutilizando
+    la conexión SMTP (ver ``apps/jobs/outbox.py``).
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('sending', 'Enviando'),
+        ('sent', 'Enviado'),
+        ('failed', 'Fallido'),
+    ]
+
+    to_email = models.EmailField(verbose_name="Destinatario")
+    from_email = models.CharField(max_length=254, verbose_name="Remitente")
+    subject = models.CharField(max_length=255, verbose_name="Asunto")
+    body = models.TextField(verbose_name="Texto")
+    html = models.TextField(blank=True, verbose_name="HTML")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name="Estado"
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Intentos")
+    max_attempts = models.PositiveIntegerField(default=5, verbose_name="Máximo de intentos")
+    run_at = models.DateTimeField(default=timezone.now, verbose_name="Enviar desde")
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name="Worker")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Tomado en")
+    last_error = models.TextField(blank=True, verbose_name="Último error")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Enviado en")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Email saliente"
+        verbose_name_plural = "Emails salientes"
+        ordering = ['run_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
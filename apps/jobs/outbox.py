@@ -0,0 +1,232 @@
+"""
+Bandeja de salida de emails respaldada por la base de datos.
+
+Los envíos masivos no hablan con el servidor SMTP durante la petición:
+``OutboxService.enqueue_many`` inserta los emails ya renderizados con
+``bulk_create`` y ``manage.py send_outbox`` los envía. El worker toma lotes
+de ``EMAIL_OUTBOX_BATCH_SIZE`` emails igual que ``JobService.claim`` (dos
+workers nunca toman el mismo email), usa una sola conexión SMTP para todos
+los lotes mientras haya trabajo y respeta ``EMAIL_OUTBOX_RATE_LIMIT``
+emails por segundo. Un email que falla se reintenta con el mismo backoff
+que los trabajos (``JobService.retry_delay``) hasta ``JOBS_MAX_ATTEMPTS``.
+
+La entrega es "al menos una vez": si el worker muere entre el envío y el
+UPDATE del lote, esos emails se vuelven a tomar después de
+``JOBS_LOCK_TIMEOUT`` segundos.
+"""
+import logging
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection as db_connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboundEmail
+from .services import JobService
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Espaciar las llamadas a ``wait()`` a ``rate`` por segundo (0 = sin límite)."""
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1 / rate if rate else 0
+        self.clock = clock
+        self.sleep = sleep
+        self.next_at = 0
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = self.clock()
+        if self.next_at > now:
+            self.sleep(self.next_at - now)
+            now = self.next_at
+        self.next_at = now + self.interval
+
+
+class OutboxService:
+    """Encolar y tomar emails de la bandeja de salida."""
+
+    @staticmethod
+    def enqueue_many(messages, batch_size=None):
+        """
+        Encolar emails con un INSERT por cada ``batch_size``.
+
+        Args:
+            messages: Iterable de diccionarios con ``to_email``, ``subject``,
+                ``body`` y opcionalmente ``html`` y ``from_email``
+            batch_size: Filas por INSERT (por defecto
+                ``EMAIL_OUTBOX_INSERT_BATCH``)
+
+        Returns:
+            int: cantidad de emails encolados
+        """
+        batch_size = batch_size or settings.EMAIL_OUTBOX_INSERT_BATCH
+        now = timezone.now()
+        messages = iter(messages)
+        total = 0
+        while True:
+            batch = [
+                OutboundEmail(
+                    from_email=message.get('from_email') or settings.DEFAULT_FROM_EMAIL,
+                    run_at=now,
+                    max_attempts=settings.JOBS_MAX_ATTEMPTS,
+                    **{key: value for key, value in message.items() if key != 'from_email'}
+                )
+                for message in islice(messages, batch_size)
+            ]
+            if not batch:
+                return total
+            OutboundEmail.objects.bulk_create(batch)
+            total += len(batch)
+
+    @staticmethod
+    def _claimable(now):
+        """Emails pendientes vencidos o tomados por un worker que murió."""
+        stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+        return Q(status='pending', run_at__lte=now) | Q(status='sending', locked_at__lt=stale)
+
+    @staticmethod
+    def claim(worker_id, limit):
+        """
+        Tomar hasta ``limit`` emails para ``worker_id``.
+
+        Returns:
+            list: emails tomados, ya marcados como ``sending``
+        """
+        now = timezone.now()
+        claimable = OutboxService._claimable(now)
+
+        with transaction.atomic():
+            queryset = OutboundEmail.objects.filter(claimable).order_by('run_at', 'id')
+            if db_connection.features.has_select_for_update_skip_locked:
+                queryset = queryset.select_for_update(skip_locked=True)
+            ids = list(queryset.values_list('id', flat=True)[:limit])
+            if not ids:
+                return []
+
+            OutboundEmail.objects.filter(claimable, pk__in=ids).update(
+                status='sending',
+                locked_by=worker_id,
+                locked_at=now,
+                attempts=F('attempts') + 1,
+                updated_at=now,
+            )
+
+        return list(OutboundEmail.objects.filter(pk__in=ids, locked_by=worker_id, locked_at=now))
+
+
+class OutboxSender:
+    """
+    Worker de la bandeja de salida.
+
+    Mantiene abierta la conexión del backend de email entre lotes; se cierra
+    con ``close()`` cuando la cola queda vacía o al terminar.
+    """
+
+    def __init__(self, worker_id, rate=None, batch_size=None):
+        self.worker_id = worker_id
+        self.batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        rate = settings.EMAIL_OUTBOX_RATE_LIMIT if rate is None else rate
+        self.limiter = RateLimiter(rate)
+        # Un lote que tarda más que JOBS_LOCK_TIMEOUT lo vuelve a tomar otro
+        # worker y esos emails se envían dos veces: con límite por segundo,
+        # el lote se recorta para enviarse en la mitad de ese tiempo
+        max_batch = max(int(rate * settings.JOBS_LOCK_TIMEOUT / 2), 1) if rate else None
+        if max_batch and self.batch_size > max_batch:
+            logger.warning(
+                f"[{worker_id}] Lote de {self.batch_size} emails a {rate}/s supera "
+                f"JOBS_LOCK_TIMEOUT; se usan lotes de {max_batch}"
+            )
+            self.batch_size = max_batch
+        self.connection = get_connection()
+
+    def close(self):
+        """Cerrar la conexión SMTP (se vuelve a abrir con el siguiente lote)."""
+        try:
+            self.connection.close()
+        except Exception as e:
+            logger.warning(f"[{self.worker_id}] Error cerrando la conexión de email: {e}")
+
+    def send(self, email):
+        """Enviar un email por la conexión abierta; lanza la excepción del backend."""
+        message = EmailMultiAlternatives(
+            subject=email.subject,
+            body=email.body,
+            from_email=email.from_email,
+            to=[email.to_email],
+            connection=self.connection,
+        )
+        if email.html:
+            message.attach_alternative(email.html, "text/html")
+        # open() no hace nada si la conexión ya está abierta
+        self.connection.open()
+        if not self.connection.send_messages([message]):
+            raise RuntimeError("El backend de email no envió el mensaje")
+
+    def fail(self, email, error):
+        owned = OutboundEmail.objects.filter(pk=email.pk, locked_by=self.worker_id, status='sending')
+        now = timezone.now()
+        if email.attempts >= email.max_attempts:
+            owned.update(status='failed', last_error=error, updated_at=now)
+            logger.error(f"Email {email.pk} a {email.to_email} falló definitivamente: {error}")
+        else:
+            owned.update(
+                status='pending',
+                last_error=error,
+                run_at=now + JobService.retry_delay(email.attempts),
+                locked_at=None,
+                updated_at=now,
+            )
+            logger.warning(f"Email {email.pk} a {email.to_email} falló (intento {email.attempts}): {error}")
+
+    def send_batch(self):
+        """
+        Tomar y enviar un lote.
+
+        Returns:
+            int: cantidad de emails tomados (0 si la cola está vacía)
+        """
+        emails = OutboxService.claim(self.worker_id, self.batch_size)
+        sent = []
+        for email in emails:
+            self.limiter.wait()
+            try:
+                self.send(email)
+            except Exception as e:
+                self.fail(email, str(e) or type(e).__name__)
+                # La conexión puede haber quedado inutilizable
+                self.close()
+                continue
+            sent.append(email.pk)
+
+        if sent:
+            now = timezone.now()
+            OutboundEmail.objects.filter(
+                pk__in=sent, locked_by=self.worker_id, status='sending'
+            ).update(status='sent', sent_at=now, last_error='', updated_at=now)
+        return len(emails)
+
+    def run_pending(self, limit=None):
+        """
+        Enviar lotes hasta vaciar la cola o llegar a ``limit`` emails.
+
+        Returns:
+            int: cantidad de emails procesados
+        """
+        processed = 0
+        try:
+            while limit is None or processed < limit:
+                claimed = self.send_batch()
+                if not claimed:
+                    break
+                processed += claimed
+        finally:
+            self.close()
+        return processed
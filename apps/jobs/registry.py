@@ -0,0 +1,29 @@
+"""
+Registro de funciones ejecutables como trabajos.
+
+Uso, en el módulo ``jobs.py`` de cualquier app::
+
+    from apps.jobs.registry import job
+
+    @job('tickets.render_qr')
+    def render_qr(payload):
+        ...
+"""
+
+_handlers = {}
+
+
+def job(name):
+    """Registrar una función como manejador del trabajo ``name``."""
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def get_handler(name):
+    """Obtener el manejador registrado o lanzar ``KeyError``."""
+    try:
+        return _handlers[name]
+    except KeyError:
+        raise KeyError(f"No hay un trabajo registrado con el nombre '{name}'.")
@@ -0,0 +1,215 @@
+"""
+Servicio de la cola de trabajos respaldada por la base de datos.
+"""
+import logging
+import random
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_handler
+
+logger = logging.getLogger(__name__)
+
+# Trabajo que ejecuta cada hilo, para JobService.heartbeat()
+_running = threading.local()
+
+# Reintentos al registrar el resultado de un trabajo (bloqueos momentáneos)
+RESULT_RETRIES = 5
+RESULT_RETRY_DELAY = 0.05  # segundos, se duplica por intento
+
+
+class JobLost(Exception):
+    """Otro worker tomó el trabajo en curso porque su candado venció."""
+
+
+class JobService:
+    """
+    Encolar, tomar y ejecutar trabajos.
+
+    Los workers toman trabajos con ``SELECT ... FOR UPDATE SKIP LOCKED`` cuando
+    la base de datos lo soporta (PostgreSQL, MySQL 8) y los marcan con un UPDATE
+    condicional, así que dos workers nunca ejecutan el mismo trabajo aunque la
+    base no soporte ``SKIP LOCKED``.
+    """
+
+    @staticmethod
+    def enqueue(name, payload=None, run_at=None, max_attempts=None):
+        """
+        Encolar un trabajo.
+
+        Si se llama dentro de una transacción, el trabajo solo queda visible
+        para los workers cuando esa transacción hace commit.
+        """
+        get_handler(name)
+        return Job.objects.create(
+            name=name,
+            payload=payload or {},
+            run_at=run_at or timezone.now(),
+            max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        )
+
+    @staticmethod
+    def enqueue_many(name, payloads, max_attempts=None):
+        """Encolar un trabajo por cada payload con un solo INSERT."""
+        get_handler(name)
+        now = timezone.now()
+        return Job.objects.bulk_create([
+            Job(
+                name=name,
+                payload=payload,
+                run_at=now,
+                max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+            )
+            for payload in payloads
+        ])
+
+    @staticmethod
+    def _claimable(now):
+        """Trabajos pendientes vencidos o tomados por un worker que murió."""
+        stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+        return Q(status='pending', run_at__lte=now) | Q(status='running', locked_at__lt=stale)
+
+    @staticmethod
+    def claim(worker_id, limit=1):
+        """
+        Tomar hasta ``limit`` trabajos para ``worker_id``.
+
+        Returns:
+            list: trabajos tomados, ya marcados como ``running``
+        """
+        now = timezone.now()
+        claimable = JobService._claimable(now)
+
+        with transaction.atomic():
+            queryset = Job.objects.filter(claimable).order_by('run_at', 'id')
+            if connection.features.has_select_for_update_skip_locked:
+                queryset = queryset.select_for_update(skip_locked=True)
+            ids = list(queryset.values_list('id', flat=True)[:limit])
+            if not ids:
+                return []
+
+            Job.objects.filter(claimable, pk__in=ids).update(
+                status='running',
+                locked_by=worker_id,
+                locked_at=now,
+                attempts=F('attempts') + 1,
+                updated_at=now,
+            )
+
+        return list(Job.objects.filter(pk__in=ids, locked_by=worker_id, locked_at=now))
+
+    @staticmethod
+    def retry_delay(attempts):
+        """Backoff exponencial con un 10% de variación aleatoria."""
+        delay = min(
+            settings.JOBS_RETRY_BACKOFF * 2 ** max(attempts - 1, 0),
+            settings.JOBS_RETRY_MAX_DELAY,
+        )
+        return timedelta(seconds=delay * random.uniform(0.9, 1.1))
+
+    @staticmethod
+    def run(job):
+        """
+        Ejecutar un trabajo ya tomado y registrar su resultado.
+
+        Returns:
+            bool: True si el trabajo terminó sin errores
+        """
+        _running.job, _running.beat_at = job, time.monotonic()
+        try:
+            get_handler(job.name)(job.payload)
+        except Exception as e:
+            now = timezone.now()
+            error = ''.join(traceback.format_exception(e))
+            if job.attempts >= job.max_attempts:
+                JobService._record(job, status='failed', last_error=error, finished_at=now)
+                logger.error(f"Trabajo {job} falló definitivamente: {e}")
+            else:
+                JobService._record(
+                    job,
+                    status='pending',
+                    last_error=error,
+                    run_at=now + JobService.retry_delay(job.attempts),
+                    locked_at=None,
+                )
+                logger.warning(f"Trabajo {job} falló (intento {job.attempts}): {e}")
+            return False
+        finally:
+            _running.job = None
+
+        JobService._record(job, status='done', last_error='', finished_at=timezone.now())
+        return True
+
+    @staticmethod
+    def _record(job, **changes):
+        """
+        Registrar el resultado de ``job`` si este worker todavía lo tiene.
+
+        Un error de la base de datos (tabla bloqueada, conexión caída) se
+        reintenta: si el resultado no se guarda, el trabajo queda ``running``
+        y otro worker lo vuelve a ejecutar cuando vence el candado.
+
+        Raises:
+            DatabaseError: Si falla después de ``RESULT_RETRIES`` intentos
+        """
+        owned = Job.objects.filter(pk=job.pk, locked_by=job.locked_by, status='running')
+        for attempt in range(RESULT_RETRIES):
+            try:
+                with transaction.atomic():
+                    return owned.update(updated_at=timezone.now(), **changes)
+            except DatabaseError as e:
+                if attempt == RESULT_RETRIES - 1:
+                    logger.error(f"Trabajo {job}: no se pudo registrar {changes['status']}: {e}")
+                    raise
+                logger.warning(f"Trabajo {job}: reintentando registrar {changes['status']}: {e}")
+                time.sleep(RESULT_RETRY_DELAY * 2 ** attempt)
+
+    @staticmethod
+    def heartbeat():
+        """
+        Renovar el candado del trabajo en curso.
+
+        Los trabajos largos lo llaman periódicamente para que su ``locked_at``
+        no venza (``JOBS_LOCK_TIMEOUT``) y otro worker no los ejecute a la vez.
+        Escribe como mucho cada cuarto de ``JOBS_LOCK_TIMEOUT``; fuera de un
+        trabajo no hace nada.
+
+        Raises:
+            JobLost: Si otro worker ya tomó el trabajo
+        """
+        job = getattr(_running, 'job', None)
+        if job is None or time.monotonic() - _running.beat_at < settings.JOBS_LOCK_TIMEOUT / 4:
+            return
+        now = timezone.now()
+        renewed = Job.objects.filter(
+            pk=job.pk, locked_by=job.locked_by, status='running'
+        ).update(locked_at=now, updated_at=now)
+        if not renewed:
+            raise JobLost(f"El trabajo {job} lo tomó otro worker")
+        _running.beat_at = time.monotonic()
+
+    @staticmethod
+    def run_pending(worker_id, limit=None):
+        """
+        Ejecutar trabajos disponibles hasta vaciar la cola o llegar a ``limit``.
+
+        Returns:
+            int: cantidad de trabajos ejecutados
+        """
+        processed = 0
+        while limit is None or processed < limit:
+            jobs = JobService.claim(worker_id)
+            if not jobs:
+                break
+            for job in jobs:
+                JobService.run(job)
+                processed += 1
+        return processed
@@ -0,0 +1,403 @@
+"""
+Tests para la cola de trabajos en segundo plano.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.db import OperationalError
+from django.db.models.query import QuerySet
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from apps.events.models import Event, Category
+from apps.tickets.models import TicketType, Ticket
+from .models import Job, OutboundEmail
+from .outbox import OutboxSender, OutboxService, RateLimiter
+from .registry import job
+from .services import JobService
+
+calls = []
+
+
+@job('tests.record')
+def record(payload):
+    calls.append(payload)
+
+
+@job('tests.fail')
+def fail(payload):
+    raise ValueError("fallo simulado")
+
+
+@job('tests.long')
+def long_running(payload):
+    if payload.get('stolen'):
+        # Otro worker tomó el trabajo después de que venció el candado
+        Job.objects.filter(name='tests.long').update(locked_by='worker-2')
+    JobService.heartbeat()
+    calls.append(Job.objects.get(name='tests.long').locked_at)
+
+
+@override_settings(JOBS_RETRY_BACKOFF=30, JOBS_MAX_ATTEMPTS=3, JOBS_LOCK_TIMEOUT=600)
+class JobServiceTest(TestCase):
+    """Tests para JobService."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_unknown_job(self):
+        """Test de trabajo sin manejador registrado."""
+        with self.assertRaises(KeyError):
+            JobService.enqueue('tests.unknown')
+
+    def test_run_successful_job(self):
+        """Test de ejecución exitosa."""
+        queued = JobService.enqueue('tests.record', {'value': 1})
+
+        self.assertEqual(JobService.run_pending('worker-1'), 1)
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'done')
+        self.assertEqual(queued.attempts, 1)
+        self.assertIsNotNone(queued.finished_at)
+        self.assertEqual(calls, [{'value': 1}])
+
+    def test_claim_is_exclusive(self):
+        """Test de que un trabajo tomado no lo toma otro worker."""
+        JobService.enqueue('tests.record')
+
+        self.assertEqual(len(JobService.claim('worker-1')), 1)
+        self.assertEqual(JobService.claim('worker-2'), [])
+
+    def test_future_jobs_are_not_claimed(self):
+        """Test de trabajos programados a futuro."""
+        JobService.enqueue('tests.record', run_at=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(JobService.claim('worker-1'), [])
+
+    def test_failed_job_is_retried_with_backoff(self):
+        """Test de reintento con backoff exponencial."""
+        queued = JobService.enqueue('tests.fail')
+        JobService.run_pending('worker-1')
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'pending')
+        self.assertEqual(queued.attempts, 1)
+        self.assertIn('fallo simulado', queued.last_error)
+        delay = (queued.run_at - timezone.now()).total_seconds()
+        self.assertTrue(20 < delay <= 33)
+
+        self.assertGreater(JobService.retry_delay(3), JobService.retry_delay(1))
+
+    def test_job_fails_after_max_attempts(self):
+        """Test de trabajo fallido definitivamente."""
+        queued = JobService.enqueue('tests.fail')
+        for _ in range(3):
+            Job.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+            JobService.run_pending('worker-1')
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'failed')
+        self.assertEqual(queued.attempts, 3)
+
+    def test_result_survives_locked_table(self):
+        """Test de resultado registrado aunque la tabla esté bloqueada un momento."""
+        queued = JobService.enqueue('tests.record', {'value': 1})
+        claimed = JobService.claim('worker-1')[0]
+        failures = [OperationalError("database table is locked")]
+        update = QuerySet.update
+
+        def flaky_update(queryset, **kwargs):
+            if failures and queryset.model is Job:
+                raise failures.pop()
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', flaky_update), \
+                mock.patch('apps.jobs.services.time.sleep'), \
+                self.assertLogs('apps.jobs.services', 'WARNING'):
+            self.assertTrue(JobService.run(claimed))
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'done')
+        self.assertEqual(calls, [{'value': 1}])
+
+    @override_settings(JOBS_LOCK_TIMEOUT=0)
+    def test_heartbeat_renews_lock(self):
+        """Test de candado renovado mientras corre un trabajo largo."""
+        JobService.enqueue('tests.long')
+        claimed = JobService.claim('worker-1')[0]
+
+        self.assertTrue(JobService.run(claimed))
+        self.assertGreater(calls[0], claimed.locked_at)
+
+    @override_settings(JOBS_LOCK_TIMEOUT=0)
+    def test_heartbeat_stops_reclaimed_job(self):
+        """Test de trabajo que se detiene si otro worker lo tomó."""
+        JobService.enqueue('tests.long', {'stolen': True})
+        claimed = JobService.claim('worker-1')[0]
+
+        with self.assertLogs('apps.jobs.services', 'WARNING') as logs:
+            self.assertFalse(JobService.run(claimed))
+        self.assertIn('lo tomó otro worker', logs.output[0])
+        self.assertEqual(calls, [])
+        # El resultado lo registra el worker que lo tomó, no este
+        queued = Job.objects.get()
+        self.assertEqual((queued.status, queued.locked_by), ('running', 'worker-2'))
+        # Fuera de un trabajo no hace nada
+        JobService.heartbeat()
+
+    def test_stale_running_job_is_reclaimed(self):
+        """Test de trabajo abandonado por un worker que murió."""
+        queued = JobService.enqueue('tests.record')
+        JobService.claim('worker-1')
+        Job.objects.filter(pk=queued.pk).update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+
+        claimed = JobService.claim('worker-2')
+        self.assertEqual([j.pk for j in claimed], [queued.pk])
+        self.assertEqual(claimed[0].attempts, 2)
+
+
+class RunWorkersCommandTest(TransactionTestCase):
+    """Tests para el comando run_workers."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_run_workers_once(self):
+        """Test de varios workers vaciando la cola sin repetir trabajos."""
+        for value in range(10):
+            JobService.enqueue('tests.record', {'value': value})
+
+        out = StringIO()
+        call_command(
+            'run_workers', '--once', '--concurrency', '3', '--sleep', '0.05', stdout=out
+        )
+
+        self.assertEqual(sorted(c['value'] for c in calls), list(range(10)))
+        self.assertEqual(Job.objects.filter(status='done').count(), 10)
+        self.assertIn('Trabajos ejecutados: 10', out.getvalue())
+
+    def test_worker_survives_result_error(self):
+        """Test de worker que sigue después de no poder registrar un resultado."""
+        for value in range(3):
+            JobService.enqueue('tests.record', {'value': value})
+        record = JobService._record
+        # _record ya agotó sus reintentos para el primer trabajo
+        failures = [OperationalError("database table is locked")]
+
+        def flaky_record(job, **changes):
+            if failures:
+                raise failures.pop()
+            return record(job, **changes)
+
+        out = StringIO()
+        with mock.patch.object(JobService, '_record', side_effect=flaky_record), \
+                self.assertLogs('apps.jobs.management.commands.run_workers', 'ERROR'):
+            call_command('run_workers', '--once', '--sleep', '0.05', stdout=out)
+
+        self.assertEqual(len(calls), 3)
+        self.assertIn('Trabajos ejecutados: 3', out.getvalue())
+        # Sin resultado el trabajo sigue tomado hasta que venza el candado
+        self.assertEqual(Job.objects.filter(status='done').count(), 2)
+        self.assertEqual(Job.objects.filter(status='running').count(), 1)
+
+
+class PurchaseJobsTest(APITestCase):
+    """Tests para el procesamiento en segundo plano de la compra."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='test123')
+        category = Category.objects.create(name="Conciertos")
+        event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            category=category,
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=100,
+            status='published'
+        )
+        self.ticket_type = TicketType.objects.create(
+            event=event, name="General", price=Decimal('50000.00'), quantity=50
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_purchase_enqueues_and_workers_render(self):
+        """Test de compra que delega QR, PDF y email a los workers."""
+        response = self.client.post('/api/tickets/purchase/', {
+            'ticket_type': self.ticket_type.id,
+            'quantity': 2,
+            'attendee_name': 'Juan Pérez',
+            'attendee_email': 'juan@example.com'
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Job.objects.get().name, 'tickets.render_qr')
+
+        self.assertEqual(JobService.run_pending('worker-1'), 3)
+
+        for ticket in Ticket.objects.all():
+            self.assertTrue(ticket.qr_code)
+            self.assertTrue(ticket.pdf_ticket)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['juan@example.com'])
+        self.assertFalse(Job.objects.exclude(status='done').exists())
+
+
+def outbox_messages(count):
+    return [
+        {'to_email': f'asistente{i}@example.com', 'subject': f'Asunto {i}', 'body': 'Texto', 'html': '<p>Texto</p>'}
+        for i in range(count)
+    ]
+
+
+@override_settings(
+    JOBS_RETRY_BACKOFF=30, JOBS_MAX_ATTEMPTS=2, EMAIL_OUTBOX_BATCH_SIZE=3, EMAIL_OUTBOX_RATE_LIMIT=0
+)
+class OutboxTest(TestCase):
+    """Tests para la bandeja de salida de emails."""
+
+    def test_enqueue_many_bulk_inserts(self):
+        """Test de encolado con un INSERT por lote."""
+        with self.assertNumQueries(3):
+            queued = OutboxService.enqueue_many(outbox_messages(5), batch_size=2)
+
+        self.assertEqual(queued, 5)
+        email = OutboundEmail.objects.first()
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.max_attempts, 2)
+        self.assertTrue(email.from_email)
+
+    def test_sender_reuses_connection(self):
+        """Test de envío de varios lotes por una sola conexión."""
+        OutboxService.enqueue_many(outbox_messages(7))
+        sender = OutboxSender('worker-1')
+
+        self.assertEqual(sender.run_pending(), 7)
+
+        self.assertEqual(len(mail.outbox), 7)
+        self.assertTrue(all(message.connection is sender.connection for message in mail.outbox))
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Texto</p>', 'text/html')])
+        self.assertEqual(OutboundEmail.objects.filter(status='sent').count(), 7)
+        self.assertFalse(OutboundEmail.objects.filter(sent_at__isnull=True).exists())
+
+    def test_failed_email_is_retried_then_failed(self):
+        """Test de reintento con backoff y fallo definitivo."""
+        OutboxService.enqueue_many(outbox_messages(1))
+        sender = OutboxSender('worker-1')
+        send_messages = 'django.core.mail.backends.locmem.EmailBackend.send_messages'
+
+        with mock.patch(send_messages, side_effect=ConnectionError("SMTP caído")):
+            self.assertEqual(sender.send_batch(), 1)
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.last_error, 'SMTP caído')
+        self.assertGreater(email.run_at, timezone.now() + timedelta(seconds=25))
+        # El reintento todavía no vence
+        self.assertEqual(sender.send_batch(), 0)
+
+        OutboundEmail.objects.update(run_at=timezone.now())
+        with mock.patch(send_messages, return_value=0):
+            sender.send_batch()
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'failed')
+        self.assertEqual(email.attempts, 2)
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(JOBS_LOCK_TIMEOUT=20)
+    def test_batch_fits_in_lock_timeout(self):
+        """Test de lote recortado para enviarse antes de JOBS_LOCK_TIMEOUT."""
+        with self.assertLogs('apps.jobs.outbox', 'WARNING'):
+            sender = OutboxSender('worker-1', rate=0.5, batch_size=100)
+        self.assertEqual(sender.batch_size, 5)
+        self.assertEqual(OutboxSender('worker-1', rate=0, batch_size=100).batch_size, 100)
+
+    def test_rate_limiter(self):
+        """Test de espaciado de envíos según el límite por segundo."""
+        now = [100.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        limiter = RateLimiter(4, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            limiter.wait()
+        now[0] += 1
+        limiter.wait()
+
+        self.assertEqual(sleeps, [0.25, 0.25])
+        self.assertEqual(RateLimiter(0).interval, 0)
+
+class SendOutboxCommandTest(TransactionTestCase):
+    """Tests para el comando send_outbox."""
+
+    def test_send_outbox_once(self):
+        """Test de vaciado de la bandeja de salida."""
+        OutboxService.enqueue_many(outbox_messages(4))
+
+        out = StringIO()
+        call_command('send_outbox', '--once', '--rate', '0', stdout=out)
+
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertIn('Emails procesados: 4', out.getvalue())
+
+
+class CancelEventEmailsTest(APITestCase):
+    """Tests para la notificación en segundo plano de un evento cancelado."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='organizer', password='test123')
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            category=Category.objects.create(name="Conciertos"),
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=100,
+            status='published'
+        )
+        ticket_type = TicketType.objects.create(
+            event=self.event, name="General", price=Decimal('50000.00'), quantity=50
+        )
+        for i in range(3):
+            Ticket.objects.create(
+                ticket_type=ticket_type,
+                buyer=self.user,
+                attendee_name=f"Asistente {i}",
+                attendee_email=f"asistente{i}@example.com",
+                purchase_price=Decimal('50000.00'),
+                status='cancelled' if i == 2 else 'active'
+            )
+        self.client.force_authenticate(user=self.user)
+
+    @override_settings(EMAIL_OUTBOX_RATE_LIMIT=0)
+    def test_cancel_enqueues_emails(self):
+        """Test de cancelación que encola los emails sin enviarlos."""
+        response = self.client.post(f'/api/events/{self.event.id}/cancel/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Job.objects.get().name, 'events.notify_cancelled')
+        self.assertFalse(OutboundEmail.objects.exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(JobService.run_pending('worker-1'), 1)
+        emails = OutboundEmail.objects.order_by('to_email')
+        self.assertEqual(
+            [email.to_email for email in emails], ['asistente0@example.com', 'asistente1@example.com']
+        )
+        self.assertEqual(emails[0].subject, 'CANCELADO: Test Event')
+        self.assertIn('Asistente 0', emails[0].html)
+
+        self.assertEqual(OutboxSender('worker-1').run_pending(), 2)
+        self.assertEqual(len(mail.outbox), 2)
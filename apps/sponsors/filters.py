@@ -1,8 +1,10 @@
 """
 Filtros para patrocinadores.
 """
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
-from .models import Sponsor, Sponsorship
+from apps.events.models import Tag
+from .models import Sponsor, SponsorTag, Sponsorship
 
 
 class SponsorFilter(filters.FilterSet):
@@ -11,10 +13,17 @@ class SponsorFilter(filters.FilterSet):
     industry = filters.CharFilter(lookup_expr='icontains')
     status = filters.ChoiceFilter(choices=Sponsor.STATUS_CHOICES)
     contact_email = filters.CharFilter(lookup_expr='icontains')
+    # Etiquetas: ?tag=tecnologia o ?tag=tecnologia,banca (cualquiera de ellas)
+    tag = filters.CharFilter(method='filter_tag')
     
     class Meta:
         model = Sponsor
-        fields = ['name', 'industry', 'status']
+        fields = ['name', 'industry', 'status', 'tag']
+
+    def filter_tag(self, queryset, name, value):
+        return queryset.filter(Exists(SponsorTag.objects.filter(
+            sponsor=OuterRef('pk'), tag__slug__in=Tag.slugs(value)
+        )))
 
 
 class SponsorshipFilter(filters.FilterSet):
@@ -0,0 +1,84 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def parse_tags(value):
+    """Mismo criterio que ``Tag.parse``: slug -> nombre, sin repetidos."""
+    tags = {}
+    for name in (value or '').split(','):
+        name = name.strip()[:64]
+        slug = slugify(name)[:64]
+        if slug and slug not in tags:
+            tags[slug] = name
+    return tags
+
+
+def backfill_tags(apps, schema_editor):
+    """Crear las relaciones de patrocinadores desde el texto separado por comas."""
+    Tag = apps.get_model('events', 'Tag')
+    Owner = apps.get_model('sponsors', 'Sponsor')
+    Through = apps.get_model('sponsors', 'SponsorTag')
+
+    parsed = {
+        pk: parse_tags(tags)
+        for pk, tags in Owner.objects.exclude(tags='').values_list('pk', 'tags').iterator()
+    }
+    names = {}
+    for tags in parsed.values():
+        for slug, name in tags.items():
+            names.setdefault(slug, name)
+    Tag.objects.bulk_create(
+        [Tag(slug=slug, name=name) for slug, name in names.items()],
+        ignore_conflicts=True,
+        batch_size=500,
+    )
+    tag_ids = dict(Tag.objects.values_list('slug', 'id'))
+    Through.objects.bulk_create(
+        [
+            Through(sponsor_id=pk, tag_id=tag_ids[slug])
+            for pk, tags in parsed.items()
+            for slug in tags
+        ],
+        ignore_conflicts=True,
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_tag'),
+        ('sponsors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SponsorTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sponsor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sponsor_tags', to='sponsors.sponsor', verbose_name='Patrocinador')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sponsor_tags', to='events.tag', verbose_name='Etiqueta')),
+            ],
+            options={
+                'verbose_name': 'Etiqueta de Patrocinador',
+                'verbose_name_plural': 'Etiquetas de Patrocinadores',
+            },
+        ),
+        migrations.AddField(
+            model_name='sponsor',
+            name='tag_set',
+            field=models.ManyToManyField(blank=True, related_name='sponsors', through='sponsors.SponsorTag', to='events.tag', verbose_name='Etiquetas normalizadas'),
+        ),
+        migrations.AddIndex(
+            model_name='sponsortag',
+            index=models.Index(fields=['tag', 'sponsor'], name='sponsors_sp_tag_id_a0ebd4_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='sponsortag',
+            unique_together={('sponsor', 'tag')},
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
@@ -4,7 +4,7 @@ Modelos para la gestión de patrocinadores.
 from django.db import models
 from django.core.validators import MinValueValidator
 from django.utils import timezone
-from apps.events.models import Event
+from apps.events.models import Event, Tag, TaggedMixin
 
 
 class SponsorTier(models.Model):
@@ -71,7 +71,7 @@ class SponsorTier(models.Model):
         ).count()
 
 
-class Sponsor(models.Model):
+class Sponsor(TaggedMixin, models.Model):
     """
     Empresas u organizaciones patrocinadoras.
     """
@@ -149,6 +149,14 @@ class Sponsor(models.Model):
         verbose_name="Etiquetas",
         help_text="Separadas por comas"
     )
+    # Copia normalizada de ``tags`` para filtrar y contar por etiqueta
+    tag_set = models.ManyToManyField(
+        Tag,
+        through='SponsorTag',
+        related_name='sponsors',
+        blank=True,
+        verbose_name="Etiquetas normalizadas"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -160,6 +168,13 @@ class Sponsor(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """Override save para actualizar las etiquetas normalizadas."""
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+
+        self.sync_tags(is_new, kwargs.get('update_fields'))
+
     @property
     def total_sponsorships(self):
         """Retorna el número total de patrocinios."""
@@ -182,6 +197,35 @@ class Sponsor(models.Model):
         return [tag.strip() for tag in self.tags.split(',') if tag.strip()]
 
 
+class SponsorTag(models.Model):
+    """Relación patrocinador - etiqueta."""
+    owner_field = 'sponsor'
+
+    sponsor = models.ForeignKey(
+        Sponsor,
+        on_delete=models.CASCADE,
+        related_name='sponsor_tags',
+        verbose_name="Patrocinador"
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='sponsor_tags',
+        verbose_name="Etiqueta"
+    )
+
+    class Meta:
+        verbose_name = "Etiqueta de Patrocinador"
+        verbose_name_plural = "Etiquetas de Patrocinadores"
+        unique_together = ['sponsor', 'tag']
+        indexes = [
+            models.Index(fields=['tag', 'sponsor']),
+        ]
+
+    def __str__(self):
+        return f"{self.sponsor_id} {self.tag_id}"
+
+
 class Sponsorship(models.Model):
     """
     Relación entre patrocinador y evento.
@@ -2,11 +2,14 @@
 Serializers para patrocinadores.
 """
 from rest_framework import serializers
+from django.utils import timezone
 from .models import SponsorTier, Sponsor, Sponsorship, SponsorBenefit
 from apps.events.serializers import EventListSerializer
+from core.compiled import subquery_count
+from core.sparse import DynamicFieldsMixin
 
 
-class SponsorTierSerializer(serializers.ModelSerializer):
+class SponsorTierSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer para niveles de patrocinio."""
     sponsors_count = serializers.IntegerField(read_only=True)
     active_sponsorships_count = serializers.IntegerField(read_only=True)
@@ -19,9 +22,10 @@ class SponsorTierSerializer(serializers.ModelSerializer):
             'is_active', 'sponsors_count', 'active_sponsorships_count',
             'created_at'
         ]
+        field_sources = {'sponsors_count': (), 'active_sponsorships_count': ()}
 
 
-class SponsorSerializer(serializers.ModelSerializer):
+class SponsorSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer básico para patrocinadores."""
     total_sponsorships = serializers.IntegerField(read_only=True)
     total_invested = serializers.DecimalField(
@@ -41,12 +45,13 @@ class SponsorSerializer(serializers.ModelSerializer):
             'status', 'total_sponsorships', 'total_invested',
             'tags', 'tag_list', 'created_at'
         ]
+        field_sources = {'total_sponsorships': (), 'total_invested': (), 'tag_list': ('tags',)}
 
     def get_tag_list(self, obj):
         return obj.get_tag_list()
 
 
-class SponsorDetailSerializer(serializers.ModelSerializer):
+class SponsorDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer detallado para patrocinadores."""
     total_sponsorships = serializers.IntegerField(read_only=True)
     total_invested = serializers.DecimalField(
@@ -76,7 +81,7 @@ class SponsorDetailSerializer(serializers.ModelSerializer):
         return SponsorshipSerializer(sponsorships, many=True).data
 
 
-class SponsorBenefitSerializer(serializers.ModelSerializer):
+class SponsorBenefitSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer para beneficios de patrocinio."""
     benefit_type_display = serializers.CharField(
         source='get_benefit_type_display',
@@ -91,9 +96,10 @@ class SponsorBenefitSerializer(serializers.ModelSerializer):
             'proof_of_delivery', 'notes', 'created_at'
         ]
         read_only_fields = ['delivered_date']
+        field_sources = {'benefit_type_display': ('benefit_type',)}
 
 
-class SponsorshipSerializer(serializers.ModelSerializer):
+class SponsorshipSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer básico para patrocinios."""
     event_title = serializers.CharField(source='event.title', read_only=True)
     sponsor_name = serializers.CharField(source='sponsor.name', read_only=True)
@@ -114,9 +120,38 @@ class SponsorshipSerializer(serializers.ModelSerializer):
             'leads_generated', 'benefits_delivered_count',
             'benefits_pending_count', 'created_at'
         ]
-
-
-class SponsorshipDetailSerializer(serializers.ModelSerializer):
+        expandable_fields = {
+            'event': (EventListSerializer, {}),
+            'sponsor': (SponsorSerializer, {}),
+            'sponsor_tier': (SponsorTierSerializer, {}),
+        }
+        field_sources = {
+            'is_current': ('start_date', 'end_date'),
+            'days_remaining': ('start_date', 'end_date'),
+            'benefits_delivered_count': (),
+            'benefits_pending_count': (),
+        }
+        compiled = True
+        compiled_annotations = {
+            'benefits_delivered_count': lambda: subquery_count(
+                SponsorBenefit.objects.filter(delivered=True), 'sponsorship'
+            ),
+            'benefits_pending_count': lambda: subquery_count(
+                SponsorBenefit.objects.filter(delivered=False), 'sponsorship'
+            ),
+        }
+
+    def row_is_current(self, row):
+        return row['start_date'] <= timezone.now().date() <= row['end_date']
+
+    def row_days_remaining(self, row):
+        # Misma regla que Sponsorship.days_remaining
+        if not self.row_is_current(row):
+            return 0
+        return (row['end_date'] - timezone.now().date()).days
+
+
+class SponsorshipDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer detallado para patrocinios."""
     event = EventListSerializer(read_only=True)
     sponsor = SponsorSerializer(read_only=True)
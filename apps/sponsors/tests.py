@@ -1,7 +1,9 @@
 """
 Tests para patrocinadores.
 """
-from django.test import TestCase
+from unittest import mock
+
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta, date
@@ -9,7 +11,7 @@ from rest_framework.test import APITestCase
 from rest_framework import status
 from decimal import Decimal
 
-from apps.events.models import Event, Category, Venue
+from apps.events.models import Event, Category, Venue, Tag
 from .models import SponsorTier, Sponsor, Sponsorship, SponsorBenefit
 
 
@@ -140,4 +142,98 @@ class SponsorAPITest(APITestCase):
             'status': 'active'
         }
         response = self.client.post('/api/sponsors/', data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class SponsorTagTest(APITestCase):
+    """Tests para las etiquetas normalizadas de patrocinadores."""
+
+    def setUp(self):
+        self.tech = Sponsor.objects.create(
+            name="Tech Corp", contact_email="contact@techcorp.com",
+            tags="Tecnología, Software,tecnologia"
+        )
+        self.bank = Sponsor.objects.create(
+            name="Banco Uno", contact_email="contact@banco.com", tags="Banca,Tecnología"
+        )
+
+    def test_tags_are_normalized(self):
+        """Test de etiquetas sin repetidos y compartidas entre patrocinadores."""
+        self.assertEqual(
+            sorted(self.tech.tag_set.values_list('slug', flat=True)), ['software', 'tecnologia']
+        )
+        self.assertEqual(Tag.objects.count(), 3)
+
+    def test_filter_by_tag(self):
+        """Test de ?tag= con uno o varios slugs."""
+        response = self.client.get('/api/sponsors/', {'tag': 'software'})
+        self.assertEqual([s['name'] for s in response.data['results']], ["Tech Corp"])
+
+        response = self.client.get('/api/sponsors/', {'tag': 'banca,software'})
+        self.assertEqual(response.data['count'], 2)
+
+    def test_tag_facets(self):
+        """Test de conteo por etiqueta."""
+        self.bank.tags = "Banca"
+        self.bank.save()
+
+        response = self.client.get('/api/sponsors/tag_facets/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(facet['slug'], facet['count']) for facet in response.data],
+            [('banca', 1), ('software', 1), ('tecnologia', 1)]
+        )
+
+
+class CompiledSponsorshipSerializerTest(APITestCase):
+    """Tests del listado de patrocinios con el serializer compilado."""
+
+    def setUp(self):
+        user = User.objects.create_user(username='testuser', password='test123')
+        event = Event.objects.create(
+            title="Tech Conference 2025",
+            description="Test Description",
+            category=Category.objects.create(name="Conferencias"),
+            organizer=user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=32),
+            capacity=500,
+            status='published'
+        )
+        tier = SponsorTier.objects.create(name="Gold", min_amount=Decimal('5000000.00'))
+        sponsor = Sponsor.objects.create(
+            name="Tech Corp", contact_email="contact@techcorp.com", logo='sponsors/logos/tech.png'
+        )
+        # La misma fecha que usa Sponsorship.days_remaining (UTC)
+        today = timezone.now().date()
+        current = Sponsorship.objects.create(
+            event=event, sponsor=sponsor, sponsor_tier=tier,
+            amount=Decimal('8000000.00'),
+            start_date=today, end_date=today + timedelta(days=60),
+            status='active'
+        )
+        Sponsorship.objects.create(
+            event=event, sponsor=Sponsor.objects.create(name="Sin logo", contact_email="a@b.com"),
+            sponsor_tier=tier, amount=Decimal('5000000.50'),
+            start_date=today - timedelta(days=90), end_date=today - timedelta(days=30),
+        )
+        for delivered in (True, True, False):
+            SponsorBenefit.objects.create(
+                sponsorship=current, benefit_type='logo_placement', description="Logo", delivered=delivered
+            )
+
+    def test_same_output_as_serializer(self):
+        """Test de que la salida compilada es idéntica a la de DRF"""
+        with mock.patch.object(Sponsorship, 'benefits_pending_count', new_callable=mock.PropertyMock) as prop:
+            response = self.client.get('/api/sponsors/sponsorships/')
+            prop.assert_not_called()
+        with override_settings(COMPILED_SERIALIZERS_ENABLED=False):
+            expected = self.client.get('/api/sponsors/sponsorships/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, expected.content)
+        by_name = {s['sponsor_name']: s for s in response.data['results']}
+        self.assertEqual(by_name['Tech Corp']['benefits_delivered_count'], 2)
+        self.assertEqual(by_name['Tech Corp']['days_remaining'], 60)
+        self.assertIsNone(by_name['Sin logo']['sponsor_logo'])
@@ -10,7 +10,8 @@ from django.db.models import Sum, Q
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
-from .models import SponsorTier, Sponsor, Sponsorship, SponsorBenefit
+from apps.events.models import Tag
+from .models import SponsorTier, Sponsor, SponsorTag, Sponsorship, SponsorBenefit
 from .serializers import (
     SponsorTierSerializer, SponsorSerializer, SponsorDetailSerializer,
     SponsorshipSerializer, SponsorshipDetailSerializer,
@@ -19,9 +20,12 @@ from .serializers import (
 )
 from .filters import SponsorFilter, SponsorshipFilter
 from core.permissions import IsEventOrganizer, IsAdminOrReadOnly
+from core.compiled import CompiledListMixin
+from core.sparse import SparseQuerysetMixin
+from core.streaming import streaming_response
 
 
-class SponsorTierViewSet(viewsets.ModelViewSet):
+class SponsorTierViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de niveles de patrocinio.
     
@@ -39,7 +43,7 @@ class SponsorTierViewSet(viewsets.ModelViewSet):
     ordering_fields = ['order', 'min_amount', 'created_at']
 
 
-class SponsorViewSet(viewsets.ModelViewSet):
+class SponsorViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de patrocinadores.
     
@@ -133,6 +137,14 @@ class SponsorViewSet(viewsets.ModelViewSet):
         
         return Response(stats)
 
+    @action(detail=False, methods=['get'])
+    def tag_facets(self, request):
+        """
+        Cantidad de patrocinadores por etiqueta (acepta los filtros del listado).
+        """
+        sponsors = self.filter_queryset(self.get_queryset())
+        return Response(Tag.facets(SponsorTag, sponsors))
+
     @action(detail=False, methods=['get'])
     def active(self, request):
         """
@@ -143,7 +155,7 @@ class SponsorViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class SponsorshipViewSet(viewsets.ModelViewSet):
+class SponsorshipViewSet(CompiledListMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de patrocinios.
     
@@ -295,8 +307,15 @@ class SponsorshipViewSet(viewsets.ModelViewSet):
             )
         
         sponsorships = self.queryset.filter(event_id=event_id, is_active=True)
-        serializer = self.get_serializer(sponsorships, many=True)
-        return Response(serializer.data)
+        return streaming_response(request, self.get_serializer(sponsorships, many=True))
+
+    @action(detail=False, methods=['get'])
+    def tag_facets(self, request):
+        """
+        Cantidad de patrocinadores por etiqueta (acepta los filtros del listado).
+        """
+        sponsors = self.filter_queryset(self.get_queryset())
+        return Response(Tag.facets(SponsorTag, sponsors))
 
     @action(detail=False, methods=['get'])
     def active(self, request):
@@ -304,11 +323,10 @@ class SponsorshipViewSet(viewsets.ModelViewSet):
         Obtener patrocinios activos.
         """
         sponsorships = self.queryset.filter(is_active=True, status='active')
-        serializer = self.get_serializer(sponsorships, many=True)
-        return Response(serializer.data)
+        return streaming_response(request, self.get_serializer(sponsorships, many=True))
 
 
-class SponsorBenefitViewSet(viewsets.ModelViewSet):
+class SponsorBenefitViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de beneficios de patrocinio.
     
@@ -0,0 +1,63 @@
+"""
+Asignación de códigos de ticket únicos por construcción.
+
+Cada proceso reserva bloques de ``TICKET_CODE_BLOCK_SIZE`` números (un INSERT
+en ``TicketCodeBlock`` por bloque) y los reparte en memoria. Cada número se
+convierte en código con ``core.utils.encode_ticket_code``, que es biyectiva,
+así que dos números distintos nunca dan el mismo código y no hace falta
+consultar la tabla de tickets.
+"""
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+
+from core.utils import encode_ticket_code
+from .models import TicketCodeBlock
+
+
+class CodeAllocator:
+    """Reparte números de secuencia de bloques reservados en la base de datos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._next = 0
+        self._end = 0
+
+    def _reserve_block(self):
+        size = settings.TICKET_CODE_BLOCK_SIZE
+        # PostgreSQL y MySQL 8 no reutilizan ids autoincrementales aunque la
+        # transacción que los tomó se revierta; la restricción UNIQUE de
+        # Ticket.code sigue siendo la última defensa.
+        block = TicketCodeBlock.objects.create()
+        self._next = block.pk * size
+        self._end = self._next + size
+
+    def allocate(self, count):
+        """
+        Obtener ``count`` códigos nuevos.
+
+        Returns:
+            list: Códigos únicos
+        """
+        numbers = []
+        with self._lock:
+            # Un proceso hijo (fork de gunicorn) no puede seguir el bloque del padre
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._next = self._end = 0
+
+            while len(numbers) < count:
+                if self._next >= self._end:
+                    self._reserve_block()
+                take = min(count - len(numbers), self._end - self._next)
+                numbers.extend(range(self._next, self._next + take))
+                self._next += take
+
+        key = hashlib.sha256(settings.TICKET_CODE_KEY.encode()).digest()
+        return [encode_ticket_code(number, key) for number in numbers]
+
+
+code_allocator = CodeAllocator()
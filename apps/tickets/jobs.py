@@ -0,0 +1,53 @@
+"""
+Trabajos en segundo plano de la compra de tickets.
+
+La compra encola ``tickets.render_qr``; cada paso encola el siguiente al
+terminar: QR -> PDF -> email de confirmación. Todos los pasos son
+idempotentes, así que un reintento no repite el trabajo ya hecho.
+"""
+from apps.jobs.registry import job
+from apps.jobs.services import JobService
+from core.emails import EmailService
+from .models import Ticket
+from .services import render_ticket_files
+
+
+def enqueue_purchase_jobs(tickets):
+    """Encolar el procesamiento de una compra recién creada."""
+    return JobService.enqueue(
+        'tickets.render_qr',
+        {'ticket_ids': [ticket.pk for ticket in tickets]},
+    )
+
+
+@job('tickets.render_qr')
+def render_qr(payload):
+    tickets = Ticket.objects.select_related(
+        'ticket_type__event'
+    ).filter(pk__in=payload['ticket_ids'])
+    for ticket in tickets:
+        if not ticket.qr_code:
+            ticket.render_qr_code()
+
+    JobService.enqueue('tickets.render_pdf', payload)
+
+
+@job('tickets.render_pdf')
+def render_pdf(payload):
+    tickets = Ticket.objects.select_related(
+        'ticket_type__event__venue', 'buyer'
+    ).filter(pk__in=payload['ticket_ids'])
+    for ticket in tickets:
+        render_ticket_files(ticket)
+
+    JobService.enqueue('tickets.send_confirmation', payload)
+
+
+@job('tickets.send_confirmation')
+def send_confirmation(payload):
+    ticket = Ticket.objects.select_related(
+        'ticket_type__event', 'buyer'
+    ).get(pk=payload['ticket_ids'][-1])
+
+    if not EmailService.send_ticket_purchase_confirmation(ticket):
+        raise RuntimeError(f"No se pudo enviar la confirmación del ticket {ticket.code}")
@@ -0,0 +1,119 @@
+"""
+Manifiesto de check-in para escáneres sin conexión.
+
+Formato binario (big-endian)::
+
+    cabecera  b'EHM1' | versión u64 (ms) | evento u32 | banderas u8 | desde u64 (ms, 0 = completo)
+    registros ticket_id u64 | huella del código u64 | estado u8   (17 bytes c/u, orden por ticket_id)
+
+La huella es ``code_fingerprint(código)``: con el token firmado del QR el
+escáner busca por ``ticket_id``; con un código digitado, por la huella.
+
+El manifiesto completo trae los tickets activos y usados. Un delta trae
+todos los tickets modificados después de ``desde`` (incluidos cancelados y
+check-ins), y se aplica reemplazando los registros por ``ticket_id``. Un
+registro puede repetirse en dos deltas consecutivos; aplicarlo dos veces
+no cambia nada.
+"""
+import hashlib
+import struct
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.utils import normalize_ticket_code
+from .models import Ticket
+
+MAGIC = b'EHM1'
+HEADER = struct.Struct('>4sQIBQ')
+RECORD = struct.Struct('>QQB')
+
+STATE_VALID = 0
+STATE_USED = 1
+STATE_REVOKED = 2
+FLAG_EVENT_CANCELLED = 1
+
+_STATES = {'active': STATE_VALID, 'used': STATE_USED}
+_CHUNK_SIZE = 2000
+
+
+def code_fingerprint(code):
+    """Huella de 64 bits de un código de ticket."""
+    digest = hashlib.blake2b(normalize_ticket_code(code).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def version_to_datetime(version):
+    return datetime.fromtimestamp(version / 1000, dt_timezone.utc)
+
+
+def current_version():
+    """
+    Versión que se entrega al cliente.
+
+    Se resta ``TICKET_MANIFEST_SETTLE_SECONDS`` para que una transacción que
+    aún no hizo commit al generar el manifiesto quede dentro del siguiente
+    delta en lugar de perderse.
+    """
+    settled = timezone.now() - timedelta(seconds=settings.TICKET_MANIFEST_SETTLE_SECONDS)
+    return int(settled.timestamp() * 1000)
+
+
+def build_manifest(event, since=None):
+    """
+    Generar el manifiesto completo o el delta desde ``since``.
+
+    Args:
+        event: Evento
+        since: Versión que ya tiene el escáner (None para el manifiesto completo)
+
+    Returns:
+        tuple: (versión, generador de bytes)
+    """
+    version = current_version()
+    tickets = Ticket.objects.filter(ticket_type__event_id=event.pk)
+    if since is None:
+        tickets = tickets.filter(status__in=list(_STATES))
+    else:
+        tickets = tickets.filter(updated_at__gt=version_to_datetime(since))
+
+    rows = tickets.order_by('id').values_list('id', 'code', 'status')
+    flags = FLAG_EVENT_CANCELLED if event.status == 'cancelled' else 0
+
+    def stream():
+        yield HEADER.pack(MAGIC, version, event.pk, flags, since or 0)
+        chunk = []
+        for ticket_id, code, status in rows.iterator(chunk_size=_CHUNK_SIZE):
+            chunk.append(RECORD.pack(
+                ticket_id,
+                code_fingerprint(code),
+                _STATES.get(status, STATE_REVOKED),
+            ))
+            if len(chunk) == _CHUNK_SIZE:
+                yield b''.join(chunk)
+                chunk = []
+        if chunk:
+            yield b''.join(chunk)
+
+    return version, stream()
+
+
+def parse_manifest(data):
+    """
+    Leer un manifiesto (lo que hace un escáner; útil en tests y scripts).
+
+    Returns:
+        tuple: (cabecera como dict, dict ticket_id -> (huella, estado))
+    """
+    magic, version, event_id, flags, since = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Manifiesto inválido.")
+
+    records = {}
+    for offset in range(HEADER.size, len(data), RECORD.size):
+        ticket_id, fingerprint, state = RECORD.unpack_from(data, offset)
+        records[ticket_id] = (fingerprint, state)
+
+    header = {'version': version, 'event_id': event_id, 'flags': flags, 'since': since}
+    return header, records
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-16 22:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0002_alter_tickettype_max_purchase_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketCodeBlock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Bloque de Códigos',
+                'verbose_name_plural': 'Bloques de Códigos',
+            },
+        ),
+    ]
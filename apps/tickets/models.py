@@ -1,12 +1,14 @@
 """
 Modelos para la gestión de tickets y ventas.
 """
+from datetime import timedelta
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from apps.events.models import Event
-from core.utils import generate_ticket_code, generate_qr_code
+from core.utils import generate_qr_code, sign_ticket_token
 import uuid
 
 
@@ -77,6 +79,13 @@ class TicketType(models.Model):
     def __str__(self):
         return f"{self.event.title} - {self.name}"
 
+    def save(self, *args, **kwargs):
+        """Crear la fila de estadísticas junto con el tipo de ticket."""
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+        if is_new:
+            TicketTypeStatistics.objects.create(ticket_type=self, event_id=self.event_id)
+
     @property
     def available_quantity(self):
         """Retorna la cantidad disponible."""
@@ -121,6 +130,44 @@ class TicketType(models.Model):
         return [benefit.strip() for benefit in self.benefits.split(',') if benefit.strip()]
 
 
+class TicketTypeStatistics(models.Model):
+    """
+    Totales de venta y asistencia de un tipo de ticket.
+
+    Desglose de ``EventStatistics``; se mantiene en las mismas transacciones.
+    """
+    ticket_type = models.OneToOneField(
+        TicketType,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='statistics',
+        verbose_name="Tipo de Ticket"
+    )
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='ticket_type_statistics',
+        verbose_name="Evento"
+    )
+    tickets_sold = models.PositiveIntegerField(default=0, verbose_name="Tickets Vendidos")
+    tickets_cancelled = models.PositiveIntegerField(default=0, verbose_name="Tickets Cancelados")
+    checked_in = models.PositiveIntegerField(default=0, verbose_name="Check-ins")
+    revenue = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name="Ingresos Netos"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Estadísticas de Tipo de Ticket"
+        verbose_name_plural = "Estadísticas de Tipos de Ticket"
+
+    def __str__(self):
+        return f"Estadísticas de {self.ticket_type_id}"
+
+
 class Ticket(models.Model):
     """
     Tickets individuales comprados por usuarios.
@@ -219,6 +266,9 @@ class Ticket(models.Model):
         blank=True,
         verbose_name="Fecha de Cancelación"
     )
+    # Se actualiza en cada cambio de estado (también en los UPDATE directos):
+    # los deltas del manifiesto de check-in se calculan con este campo
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última Modificación")
     
     # Notas
     notes = models.TextField(blank=True, verbose_name="Notas")
@@ -231,6 +281,10 @@ class Ticket(models.Model):
             models.Index(fields=['code']),
             models.Index(fields=['status', 'ticket_type']),
             models.Index(fields=['buyer', 'status']),
+            models.Index(fields=['ticket_type', 'updated_at']),
+            # Paginación por cursor (-purchased_at, -id)
+            models.Index(fields=['purchased_at', 'id']),
+            models.Index(fields=['buyer', 'purchased_at', 'id']),
         ]
 
     def __str__(self):
@@ -239,11 +293,7 @@ class Ticket(models.Model):
     def save(self, *args, **kwargs):
         """Generate code and QR on creation."""
         if not self.code:
-            self.code = generate_ticket_code()
-            
-            # Asegurar que el código es único
-            while Ticket.objects.filter(code=self.code).exists():
-                self.code = generate_ticket_code()
+            self.code = Ticket.generate_codes(1)[0]
         
         # Establecer precio de compra si no está establecido
         if not self.purchase_price:
@@ -253,9 +303,42 @@ class Ticket(models.Model):
         
         # Generar QR code si no existe
         if not self.qr_code:
-            qr_data = f"{self.uuid}"
-            self.qr_code = generate_qr_code(qr_data)
-            super().save(update_fields=['qr_code'])
+            self.render_qr_code()
+
+    @staticmethod
+    def generate_codes(count):
+        """
+        Generar ``count`` códigos únicos sin consultar la tabla de tickets.
+
+        Returns:
+            list: Códigos de 13 caracteres con carácter de control
+        """
+        from .codes import code_allocator
+        return code_allocator.allocate(count)
+
+    @property
+    def signed_token(self):
+        """
+        Token firmado del QR (ver ``core.utils.sign_ticket_token``).
+
+        Vale desde la compra hasta el fin del evento, con
+        ``TICKET_TOKEN_LEEWAY`` horas de tolerancia a cada lado. La firma no
+        refleja cancelaciones: los escáneres las obtienen al sincronizar.
+        """
+        event = self.ticket_type.event
+        leeway = timedelta(hours=settings.TICKET_TOKEN_LEEWAY)
+        return sign_ticket_token(
+            ticket_id=self.pk,
+            event_id=event.pk,
+            ticket_type_id=self.ticket_type_id,
+            not_before=(self.purchased_at or timezone.now()) - leeway,
+            expires_at=event.end_date + leeway,
+        )
+
+    def render_qr_code(self):
+        """Generar y guardar la imagen QR del ticket con su token firmado."""
+        self.qr_code = generate_qr_code(self.signed_token)
+        super().save(update_fields=['qr_code'])
 
     @property
     def final_price(self):
@@ -424,4 +507,19 @@ class DiscountCode(models.Model):
             buyer=user
         ).count()
         
-        return user_uses < self.max_uses_per_user
\ No newline at end of file
+        return user_uses < self.max_uses_per_user
+
+
+class TicketCodeBlock(models.Model):
+    """
+    Bloque de números de secuencia reservado por un proceso para generar
+    códigos de ticket. El id autoincremental es el número de bloque.
+    """
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Bloque de Códigos"
+        verbose_name_plural = "Bloques de Códigos"
+
+    def __str__(self):
+        return f"Bloque {self.pk}"
@@ -5,10 +5,16 @@ from rest_framework import serializers
 from django.db import transaction
 from django.utils import timezone
 from .models import TicketType, Ticket, DiscountCode
+from .jobs import enqueue_purchase_jobs
+from .services import InventoryService, InventoryError
 from apps.events.serializers import EventListSerializer
+from apps.events.services import StatisticsService
+from core.compiled import full_name
+from core.sparse import DynamicFieldsMixin
+from core.utils import TicketTokenError, verify_ticket_token
 
 
-class TicketTypeSerializer(serializers.ModelSerializer):
+class TicketTypeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer básico para tipos de ticket."""
     event_title = serializers.CharField(source='event.title', read_only=True)
     available_quantity = serializers.IntegerField(read_only=True)
@@ -26,12 +32,22 @@ class TicketTypeSerializer(serializers.ModelSerializer):
             'is_available', 'sold_out', 'percentage_sold', 'benefits',
             'benefit_list', 'color', 'created_at'
         ]
+        expandable_fields = {
+            'event': ('apps.events.serializers.EventListSerializer', {}),
+        }
+        field_sources = {
+            'available_quantity': ('quantity', 'sold_count'),
+            'is_available': ('is_active', 'quantity', 'sold_count', 'sale_start', 'sale_end'),
+            'sold_out': ('quantity', 'sold_count'),
+            'percentage_sold': ('quantity', 'sold_count'),
+            'benefit_list': ('benefits',),
+        }
 
     def get_benefit_list(self, obj):
         return obj.get_benefit_list()
 
 
-class TicketTypeDetailSerializer(serializers.ModelSerializer):
+class TicketTypeDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer detallado para tipos de ticket."""
     event = EventListSerializer(read_only=True)
     available_quantity = serializers.IntegerField(read_only=True)
@@ -54,7 +70,7 @@ class TicketTypeDetailSerializer(serializers.ModelSerializer):
         return obj.get_benefit_list()
 
 
-class TicketSerializer(serializers.ModelSerializer):
+class TicketSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer básico para tickets."""
     ticket_type_name = serializers.CharField(source='ticket_type.name', read_only=True)
     event_title = serializers.CharField(source='ticket_type.event.title', read_only=True)
@@ -75,12 +91,43 @@ class TicketSerializer(serializers.ModelSerializer):
             'is_valid', 'can_be_cancelled'
         ]
         read_only_fields = ['code', 'uuid', 'qr_code', 'pdf_ticket', 'purchased_at']
+        expandable_fields = {
+            'ticket_type': (TicketTypeSerializer, {}),
+            'event': ('apps.events.serializers.EventListSerializer', {'source': 'ticket_type.event'}),
+        }
+        field_sources = {
+            'buyer_name': ('buyer__first_name', 'buyer__last_name', 'buyer__username'),
+            'final_price': ('purchase_price', 'discount_applied'),
+            'is_valid': ('status',),
+            'can_be_cancelled': (
+                'status', 'ticket_type__event__start_date', 'ticket_type__event__end_date'
+            ),
+        }
+        compiled = True
 
     def get_buyer_name(self, obj):
         return obj.buyer.get_full_name() or obj.buyer.username
 
+    def row_buyer_name(self, row):
+        return full_name(row, 'buyer')
 
-class TicketDetailSerializer(serializers.ModelSerializer):
+    def row_final_price(self, row):
+        return row['purchase_price'] - row['discount_applied']
+
+    def row_is_valid(self, row):
+        return row['status'] == 'active'
+
+    def row_can_be_cancelled(self, row):
+        # Misma regla que Ticket.can_be_cancelled
+        if row['status'] != 'active':
+            return False
+        now = timezone.now()
+        if row['ticket_type__event__end_date'] < now:
+            return False
+        return (row['ticket_type__event__start_date'] - now).total_seconds() / 3600 > 24
+
+
+class TicketDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer detallado para tickets."""
     ticket_type = TicketTypeSerializer(read_only=True)
     buyer_name = serializers.SerializerMethodField()
@@ -177,27 +224,37 @@ class TicketPurchaseSerializer(serializers.Serializer):
 
     @transaction.atomic
     def create(self, validated_data):
-        """Crear tickets con transacción atómica."""
+        """
+        Crear tickets con transacción atómica.
+
+        El inventario se reserva con ``InventoryService.reserve`` antes de crear
+        los tickets; las validaciones de ``validate`` son solo un filtro rápido
+        y la reserva es la que garantiza que no haya sobreventa.
+        """
         ticket_type = validated_data['ticket_type']
         quantity = validated_data['quantity']
         user = self.context['request'].user
-        discount_code = validated_data.get('discount_code')
         discount_obj = validated_data.get('discount_obj')
-        
-        tickets = []
-        
-        for _ in range(quantity):
-            # Calcular precio con descuento
-            price = ticket_type.price
-            discount_applied = 0
-            
+
+        try:
+            InventoryService.reserve(ticket_type, quantity)
             if discount_obj:
-                discount_applied = discount_obj.calculate_discount(price)
-            
-            # Crear ticket
-            ticket = Ticket.objects.create(
+                InventoryService.consume_discount(discount_obj)
+        except InventoryError as e:
+            raise serializers.ValidationError(str(e))
+
+        # Precio con descuento (igual para todos los tickets de la compra)
+        price = ticket_type.price
+        discount_applied = 0
+        if discount_obj:
+            discount_applied = discount_obj.calculate_discount(price)
+
+        codes = Ticket.generate_codes(quantity)
+        tickets = [
+            Ticket(
                 ticket_type=ticket_type,
                 buyer=user,
+                code=code,
                 attendee_name=validated_data['attendee_name'],
                 attendee_email=validated_data['attendee_email'],
                 attendee_phone=validated_data.get('attendee_phone', ''),
@@ -205,21 +262,30 @@ class TicketPurchaseSerializer(serializers.Serializer):
                 discount_applied=discount_applied,
                 discount_code=discount_obj
             )
-            tickets.append(ticket)
-        
-        # Actualizar contador de vendidos
-        ticket_type.sold_count += quantity
-        ticket_type.save(update_fields=['sold_count'])
-        
-        # Actualizar contador de uso del código de descuento
-        if discount_obj:
-            discount_obj.used_count += 1
-            discount_obj.save(update_fields=['used_count'])
-        
+            for code in codes
+        ]
+        tickets = Ticket.objects.bulk_create(tickets)
+
+        # MySQL no devuelve los ids de un INSERT masivo: recuperarlos por código
+        if tickets and tickets[0].pk is None:
+            by_code = Ticket.objects.in_bulk(codes, field_name='code')
+            tickets = [by_code[code] for code in codes]
+
+        for ticket in tickets:
+            ticket.ticket_type = ticket_type
+            ticket.buyer = user
+
+        StatisticsService.record_sale(
+            ticket_type, quantity, price - discount_applied, tickets[0].purchased_at
+        )
+
+        # QR, PDF y email se procesan en segundo plano (ver apps/tickets/jobs.py);
+        # el trabajo se encola en esta transacción y solo existe si la compra hace commit
+        enqueue_purchase_jobs(tickets)
         return tickets
 
 
-class DiscountCodeSerializer(serializers.ModelSerializer):
+class DiscountCodeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer para códigos de descuento."""
     event_title = serializers.CharField(source='event.title', read_only=True)
     is_valid = serializers.BooleanField(read_only=True)
@@ -234,6 +300,10 @@ class DiscountCodeSerializer(serializers.ModelSerializer):
             'valid_until', 'is_active', 'is_valid', 'minimum_purchase',
             'applicable_ticket_types', 'created_at'
         ]
+        field_sources = {
+            'is_valid': ('is_active', 'valid_from', 'valid_until', 'max_uses', 'used_count'),
+            'remaining_uses': ('max_uses', 'used_count'),
+        }
 
     def validate_code(self, value):
         """Validar que el código sea único."""
@@ -267,10 +337,18 @@ class TicketValidationSerializer(serializers.Serializer):
     """Serializer para validar tickets."""
     code = serializers.CharField(max_length=50, required=False)
     uuid = serializers.UUIDField(required=False)
+    token = serializers.CharField(max_length=100, required=False)
+
+    def validate_token(self, value):
+        """Verificar la firma del QR; devuelve los datos del token."""
+        try:
+            return verify_ticket_token(value)
+        except TicketTokenError as e:
+            raise serializers.ValidationError(str(e))
 
     def validate(self, data):
-        if not data.get('code') and not data.get('uuid'):
+        if not data.get('code') and not data.get('uuid') and not data.get('token'):
             raise serializers.ValidationError(
-                "Debe proporcionar el código o UUID del ticket."
+                "Debe proporcionar el código, UUID o token del ticket."
             )
         return data
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Servicios de inventario y compra de tickets.
+"""
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.lookups import LessThanOrEqual
+from django.utils import timezone
+
+from apps.events.models import Event
+from apps.events.services import StatisticsService
+from core.utils import generate_ticket_pdf
+from .models import TicketType, Ticket, DiscountCode
+
+
+class InventoryError(Exception):
+    """No hay inventario suficiente para completar la operación."""
+
+
+class InventoryService:
+    """
+    Reserva y liberación de inventario a prueba de concurrencia.
+
+    Todas las escrituras sobre ``sold_count`` se hacen con actualizaciones
+    condicionales en la base de datos, nunca con lectura-modificación-escritura
+    en Python, para que varios workers de gunicorn no pierdan actualizaciones.
+    """
+
+    @staticmethod
+    def reserve(ticket_type, quantity):
+        """
+        Reservar ``quantity`` tickets de un tipo dentro de la transacción actual.
+
+        1. UPDATE condicional sobre el tipo de ticket: solo incrementa si queda
+           stock. La fila queda bloqueada hasta el commit.
+        2. Bloqueo de la fila del evento y verificación de su capacidad total
+           sumando todos los tipos. El bloqueo serializa las compras de un
+           mismo evento, así que dos tipos distintos no pueden superar juntos
+           la capacidad.
+
+        Si algo falla se lanza ``InventoryError`` y la transacción que envuelve
+        la llamada debe revertirse.
+        """
+        if not transaction.get_connection().in_atomic_block:
+            raise RuntimeError("InventoryService.reserve requiere una transacción atómica.")
+
+        now = timezone.now()
+        # sold_count + quantity <= quantity (sin restar: las columnas son UNSIGNED en MySQL)
+        updated = TicketType.objects.filter(
+            LessThanOrEqual(F('sold_count') + quantity, F('quantity')),
+            pk=ticket_type.pk,
+            is_active=True,
+        ).update(sold_count=F('sold_count') + quantity, updated_at=now)
+
+        if not updated:
+            ticket_type.refresh_from_db(fields=['sold_count', 'quantity', 'is_active'])
+            raise InventoryError(
+                f"Solo hay {max(ticket_type.available_quantity, 0)} tickets disponibles."
+            )
+
+        event = Event.objects.select_for_update().only('id', 'capacity').get(
+            pk=ticket_type.event_id
+        )
+        total_sold = TicketType.objects.filter(event_id=event.pk).aggregate(
+            total=Sum('sold_count')
+        )['total'] or 0
+
+        if total_sold > event.capacity:
+            available = event.capacity - (total_sold - quantity)
+            raise InventoryError(
+                f"El evento solo tiene {max(available, 0)} cupos disponibles."
+            )
+
+        ticket_type.sold_count += quantity
+        return ticket_type
+
+    @staticmethod
+    def release(ticket_type, quantity=1):
+        """Devolver tickets al inventario sin bajar de cero."""
+        TicketType.objects.filter(
+            pk=ticket_type.pk,
+            sold_count__gte=quantity,
+        ).update(sold_count=F('sold_count') - quantity, updated_at=timezone.now())
+
+    @staticmethod
+    def consume_discount(discount):
+        """
+        Registrar un uso del código de descuento respetando ``max_uses``.
+        """
+        queryset = DiscountCode.objects.filter(pk=discount.pk)
+        if discount.max_uses:
+            queryset = queryset.filter(used_count__lt=discount.max_uses)
+
+        if not queryset.update(used_count=F('used_count') + 1):
+            raise InventoryError("El código de descuento alcanzó su límite de usos.")
+
+        discount.used_count += 1
+        return discount
+
+    @staticmethod
+    def cancel_ticket(ticket):
+        """
+        Cancelar un ticket activo y devolverlo al inventario.
+
+        La transición ``active`` -> ``cancelled`` es condicional, así que dos
+        cancelaciones simultáneas no devuelven el mismo cupo dos veces.
+
+        Returns:
+            bool: True si este llamado realizó la cancelación
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            cancelled = Ticket.objects.filter(pk=ticket.pk, status='active').update(
+                status='cancelled',
+                cancelled_at=now,
+                updated_at=now,
+            )
+            if not cancelled:
+                return False
+            InventoryService.release(ticket.ticket_type)
+            StatisticsService.record_cancellation(ticket)
+
+        ticket.status = 'cancelled'
+        ticket.cancelled_at = now
+        ticket.ticket_type.sold_count = max(ticket.ticket_type.sold_count - 1, 0)
+        return True
+
+
+def render_ticket_files(ticket):
+    """
+    Generar el QR y el PDF de un ticket creado por la ruta masiva.
+
+    ``bulk_create`` no pasa por ``Ticket.save``, así que los archivos se
+    generan aquí, fuera de la transacción de compra.
+    """
+    if not ticket.qr_code:
+        ticket.render_qr_code()
+
+    if not ticket.pdf_ticket:
+        ticket.pdf_ticket = generate_ticket_pdf(ticket)
+        ticket.save(update_fields=['pdf_ticket'])
+
+    return ticket
@@ -1,16 +1,30 @@
 """
 Tests para tickets.
 """
-from django.test import TestCase
+import json
+import sys
+import threading
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import connection, transaction
 from django.utils import timezone
 from datetime import timedelta
-from rest_framework.test import APITestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase, APIRequestFactory
 from rest_framework import status
 from decimal import Decimal
 
 from apps.events.models import Event, Category, Venue
 from .models import TicketType, Ticket, DiscountCode
+from .serializers import TicketPurchaseSerializer
+from .codes import CodeAllocator
+from .services import InventoryService, InventoryError, render_ticket_files
+from core.utils import (
+    CODE_ALPHABET, TicketTokenError, is_valid_ticket_code, verify_ticket_token
+)
 
 
 class TicketTypeModelTest(TestCase):
@@ -130,7 +144,8 @@ class TicketModelTest(TestCase):
         )
         
         self.assertIsNotNone(ticket.code)
-        self.assertEqual(len(ticket.code), 12)
+        self.assertEqual(len(ticket.code), 13)
+        self.assertTrue(is_valid_ticket_code(ticket.code))
     
     def test_final_price(self):
         """Test de precio final con descuento."""
@@ -200,4 +215,820 @@ class TicketAPITest(APITestCase):
         }
         response = self.client.post('/api/tickets/purchase/', data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(len(response.data['tickets']), 2)
\ No newline at end of file
+        self.assertEqual(len(response.data['tickets']), 2)
+
+    def test_purchase_respects_event_capacity(self):
+        """Test de compra que supera la capacidad del evento."""
+        self.event.capacity = 1
+        self.event.save()
+        self.client.force_authenticate(user=self.user)
+        data = {
+            'ticket_type': self.ticket_type.id,
+            'quantity': 2,
+            'attendee_name': 'Juan Pérez',
+            'attendee_email': 'juan@example.com'
+        }
+        response = self.client.post('/api/tickets/purchase/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.ticket_type.refresh_from_db()
+        self.assertEqual(self.ticket_type.sold_count, 0)
+        self.assertFalse(Ticket.objects.exists())
+
+class ConditionalGetTest(APITestCase):
+    """Tests de GET condicional (ETag / Last-Modified) en tickets."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='test123')
+        self.other = User.objects.create_user(username='otheruser', password='test123')
+        self.category = Category.objects.create(name="Conciertos")
+        self.venue = Venue.objects.create(
+            name="Test Venue",
+            address="Test Address",
+            city="Test City",
+            state="Test State",
+            capacity=1000
+        )
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            category=self.category,
+            venue=self.venue,
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=500,
+            status='published'
+        )
+        self.ticket_type = TicketType.objects.create(
+            event=self.event,
+            name="General",
+            price=Decimal('50000.00'),
+            quantity=100
+        )
+        self.tickets = [
+            Ticket.objects.create(
+                ticket_type=self.ticket_type,
+                buyer=self.user,
+                attendee_name=f"Asistente {i}",
+                attendee_email=f"asistente{i}@example.com",
+                purchase_price=Decimal('50000.00')
+            )
+            for i in range(3)
+        ]
+        self.client.force_authenticate(user=self.user)
+
+    def test_my_tickets_not_modified(self):
+        """Test de 304 en my_tickets sin serializar."""
+        response = self.client.get('/api/tickets/my_tickets/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        # Un listado no lleva Last-Modified: borrar una fila no lo movería
+        self.assertNotIn('Last-Modified', response)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tickets/my_tickets/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        # Solo la consulta de validadores (COUNT + MAX)
+        self.assertEqual(len(queries), 1)
+
+    def test_if_none_match_list(self):
+        """Test de If-None-Match con varios ETags y con '*'."""
+        etag = self.client.get('/api/tickets/my_tickets/')['ETag']
+        response = self.client.get(
+            '/api/tickets/my_tickets/', HTTP_IF_NONE_MATCH=f'W/"otro", {etag}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get('/api/tickets/my_tickets/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since(self):
+        """Test de If-Modified-Since en el detalle y no en el listado."""
+        url = f'/api/tickets/{self.tickets[0].pk}/'
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Un ticket que sale del listado no mueve el MAX(updated_at)
+        self.tickets[1].delete()
+        response = self.client.get('/api/tickets/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_change_invalidates_etag(self):
+        """Test de cambio de ETag al cancelar un ticket."""
+        etag = self.client.get('/api/tickets/my_tickets/')['ETag']
+        detail_etag = self.client.get(f'/api/tickets/{self.tickets[0].pk}/')['ETag']
+
+        InventoryService.cancel_ticket(self.tickets[0])
+
+        response = self.client.get('/api/tickets/my_tickets/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        response = self.client.get(
+            f'/api/tickets/{self.tickets[0].pk}/', HTTP_IF_NONE_MATCH=detail_etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'cancelled')
+
+    def test_etag_per_user(self):
+        """Test de ETag distinto por usuario."""
+        etag = self.client.get('/api/tickets/my_tickets/')['ETag']
+        self.client.force_authenticate(user=self.other)
+        response = self.client.get('/api/tickets/my_tickets/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.getvalue(), b'[]')
+
+
+class KeysetPaginationTest(APITestCase):
+    """Tests de paginación por cursor en tickets."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='test123')
+        self.category = Category.objects.create(name="Conciertos")
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            category=self.category,
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=500,
+            status='published'
+        )
+        self.ticket_type = TicketType.objects.create(
+            event=self.event,
+            name="General",
+            price=Decimal('50000.00'),
+            quantity=100
+        )
+        Ticket.objects.bulk_create([
+            Ticket(
+                ticket_type=self.ticket_type,
+                buyer=self.user,
+                code=code,
+                attendee_name=f"Asistente {i}",
+                attendee_email=f"asistente{i}@example.com",
+                purchase_price=Decimal('50000.00')
+            )
+            for i, code in enumerate(Ticket.generate_codes(25))
+        ])
+        # Varios tickets con la misma fecha: el id desempata
+        base = timezone.now() - timedelta(days=1)
+        for index, pk in enumerate(Ticket.objects.order_by('id').values_list('id', flat=True)):
+            Ticket.objects.filter(pk=pk).update(purchased_at=base + timedelta(minutes=index // 3))
+        self.expected = list(
+            Ticket.objects.order_by('-purchased_at', '-id').values_list('id', flat=True)
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_walk_all_pages(self):
+        """Test de recorrer todas las páginas sin repetir ni saltar tickets."""
+        seen = []
+        url = '/api/tickets/?cursor=&page_size=10'
+        pages = 0
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            self.assertFalse(any('COUNT(' in q['sql'] for q in queries.captured_queries))
+            seen += [ticket['id'] for ticket in response.data['results']]
+            url = response.data['next']
+            pages += 1
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, self.expected)
+
+    def test_optional_count(self):
+        """Test de COUNT solo con ?count=true."""
+        response = self.client.get('/api/tickets/', {'cursor': '', 'count': 'true', 'page_size': 10})
+        self.assertEqual(response.data['count'], 25)
+        self.assertNotIn('count=', response.data['next'])
+
+    def test_invalid_cursor(self):
+        """Test de cursor inválido."""
+        response = self.client.get('/api/tickets/', {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_mode_unchanged(self):
+        """Test de paginación por número sin ?cursor=."""
+        response = self.client.get('/api/tickets/', {'page': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 5)
+
+
+class SparseFieldsTest(APITestCase):
+    """Tests de ?fields=, ?omit= y ?expand= en tickets."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='test123')
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            category=Category.objects.create(name="Conciertos"),
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=500,
+            status='published'
+        )
+        self.ticket_type = TicketType.objects.create(
+            event=self.event,
+            name="General",
+            price=Decimal('50000.00'),
+            quantity=100
+        )
+        Ticket.objects.bulk_create([
+            Ticket(
+                ticket_type=self.ticket_type,
+                buyer=self.user,
+                code=code,
+                attendee_name=f"Asistente {i}",
+                attendee_email=f"asistente{i}@example.com",
+                purchase_price=Decimal('50000.00')
+            )
+            for i, code in enumerate(Ticket.generate_codes(3))
+        ])
+        self.client.force_authenticate(user=self.user)
+
+    def test_fields_returns_only_requested(self):
+        """Test de ?fields=: solo los campos pedidos y sin JOIN innecesarios"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tickets/', {'fields': 'id,code,status'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 3)
+        for ticket in response.data['results']:
+            self.assertEqual(set(ticket), {'id', 'code', 'status'})
+
+        select = queries.captured_queries[-1]['sql']
+        self.assertNotIn('auth_user', select)
+        self.assertNotIn('events_event', select)
+        self.assertNotIn('attendee_email', select)
+
+    def test_unrequested_properties_not_evaluated(self):
+        """Test de que los campos no pedidos no se calculan"""
+        with mock.patch.object(Ticket, 'can_be_cancelled', new_callable=mock.PropertyMock) as prop:
+            response = self.client.get('/api/tickets/', {'fields': 'id,code'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            prop.assert_not_called()
+
+            with override_settings(COMPILED_SERIALIZERS_ENABLED=False):
+                self.client.get('/api/tickets/')
+            self.assertEqual(prop.call_count, 3)
+
+    def test_fields_with_computed_field_avoids_extra_queries(self):
+        """Test de que un campo calculado carga sus columnas en la misma consulta"""
+        response = self.client.get('/api/tickets/', {'fields': 'id,buyer_name,can_be_cancelled'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Validadores del GET condicional, COUNT y página
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/tickets/', {'fields': 'id,buyer_name,can_be_cancelled'})
+        ticket = response.data['results'][0]
+        self.assertEqual(ticket['buyer_name'], 'testuser')
+        self.assertTrue(ticket['can_be_cancelled'])
+
+    def test_omit(self):
+        """Test de ?omit="""
+        response = self.client.get('/api/tickets/', {'omit': 'qr_code,pdf_ticket,can_be_cancelled'})
+
+        ticket = response.data['results'][0]
+        self.assertNotIn('qr_code', ticket)
+        self.assertNotIn('can_be_cancelled', ticket)
+        self.assertIn('attendee_email', ticket)
+
+    def test_expand_with_nested_fields(self):
+        """Test de ?expand= con campos del objeto anidado"""
+        response = self.client.get('/api/tickets/', {
+            'expand': 'ticket_type,event',
+            'fields': 'id,ticket_type.name,event.title',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ticket = response.data['results'][0]
+        self.assertEqual(ticket['ticket_type'], {'name': 'General'})
+        self.assertEqual(ticket['event'], {'title': 'Test Event'})
+
+    def test_without_params_keeps_full_representation(self):
+        """Test de que sin parámetros la respuesta no cambia"""
+        response = self.client.get('/api/tickets/')
+
+        ticket = response.data['results'][0]
+        self.assertIn('buyer_name', ticket)
+        self.assertEqual(ticket['ticket_type'], self.ticket_type.id)
+
+    def test_cursor_mode_with_fields(self):
+        """Test de ?fields= junto con la paginación por cursor"""
+        response = self.client.get('/api/tickets/', {'cursor': '', 'page_size': 2, 'fields': 'code'})
+
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(set(response.data['results'][0]), {'code'})
+
+
+class CompiledTicketSerializerTest(APITestCase):
+    """Tests del listado de tickets con el serializer compilado."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='test123', first_name='Ana', last_name='Pérez'
+        )
+        self.other = User.objects.create_user(username='other', password='test123')
+        category = Category.objects.create(name="Conciertos")
+        events = [
+            Event.objects.create(
+                title=f"Evento {days}",
+                description="Test Description",
+                category=category,
+                organizer=self.user,
+                start_date=timezone.now() + timedelta(days=days),
+                end_date=timezone.now() + timedelta(days=days, hours=3),
+                capacity=500,
+                status='published'
+            )
+            # Futuro, en menos de 24 horas y pasado
+            for days in (30, 0.4, -2)
+        ]
+        for event in events:
+            ticket_type = TicketType.objects.create(
+                event=event, name="General", price=Decimal('50000.00'), quantity=100
+            )
+            for buyer, ticket_status in ((self.user, 'active'), (self.other, 'cancelled'), (self.user, 'used')):
+                Ticket.objects.create(
+                    ticket_type=ticket_type,
+                    buyer=buyer,
+                    code=Ticket.generate_codes(1)[0],
+                    attendee_name="Asistente",
+                    attendee_email="asistente@example.com",
+                    purchase_price=Decimal('50000.00'),
+                    discount_applied=Decimal('1250.50'),
+                    status=ticket_status,
+                )
+        Ticket.objects.filter(status='used').update(
+            qr_code='tickets/qr/codigo.png', used_at=timezone.now()
+        )
+        self.client.force_authenticate(user=User.objects.create_user(
+            username='staff', password='test123', is_staff=True
+        ))
+
+    def assertSameAsSerializer(self, params):
+        response = self.client.get('/api/tickets/', params)
+        with override_settings(COMPILED_SERIALIZERS_ENABLED=False):
+            expected = self.client.get('/api/tickets/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, expected.content)
+        return response
+
+    def test_same_output_as_serializer(self):
+        """Test de que la salida compilada es idéntica a la de DRF"""
+        response = self.assertSameAsSerializer({})
+        self.assertEqual(response.data['count'], 9)
+        by_status = {(t['status'], t['event_title']): t for t in response.data['results']}
+        self.assertTrue(by_status[('active', 'Evento 30')]['can_be_cancelled'])
+        self.assertFalse(by_status[('active', 'Evento 0.4')]['can_be_cancelled'])
+        self.assertEqual(by_status[('active', 'Evento 30')]['buyer_name'], 'Ana Pérez')
+        self.assertTrue(by_status[('used', 'Evento -2')]['qr_code'].startswith('http://testserver/'))
+
+    def test_same_output_with_cursor_and_fields(self):
+        """Test de salida idéntica con cursor, ?fields= y ?expand= (sin compilar)"""
+        first = self.assertSameAsSerializer({'cursor': '', 'page_size': 4})
+        self.assertSameAsSerializer({'cursor': first.data['next'].split('cursor=')[1].split('&')[0], 'page_size': 4})
+        self.assertSameAsSerializer({'fields': 'id,buyer_name,final_price'})
+        self.assertSameAsSerializer({'expand': 'ticket_type'})
+
+    def test_rows_without_model_instances(self):
+        """Test de que el listado compilado no crea instancias ni consulta por fila"""
+        with mock.patch.object(Ticket, 'can_be_cancelled', new_callable=mock.PropertyMock) as prop:
+            # Validadores del GET condicional, COUNT y página
+            with self.assertNumQueries(3):
+                self.client.get('/api/tickets/')
+            prop.assert_not_called()
+
+
+class StreamingListTest(APITestCase):
+    """Tests de los listados sin paginar enviados en streaming."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='test123', first_name='Ana', last_name='Pérez'
+        )
+        event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            category=Category.objects.create(name="Conciertos"),
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=500,
+            status='published'
+        )
+        ticket_type = TicketType.objects.create(
+            event=event, name="General", price=Decimal('50000.00'), quantity=100
+        )
+        for i, code in enumerate(Ticket.generate_codes(5)):
+            Ticket.objects.create(
+                ticket_type=ticket_type,
+                buyer=self.user,
+                code=code,
+                # Separador de línea que JSONRenderer escapa
+                attendee_name=f"Asistente ñ\u2028{i}",
+                attendee_email=f"asistente{i}@example.com",
+                purchase_price=Decimal('50000.00'),
+                discount_applied=Decimal('1250.50'),
+            )
+        self.client.force_authenticate(user=self.user)
+
+    def assertSameAsResponse(self, url, **settings_overrides):
+        with override_settings(**settings_overrides):
+            response = self.client.get(url)
+            with override_settings(STREAMING_JSON_ENABLED=False):
+                expected = self.client.get(url)
+        self.assertTrue(response.streaming)
+        self.assertFalse(expected.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.getvalue(), expected.content)
+        return json.loads(expected.content)
+
+    def test_same_output_as_response(self):
+        """Test de que el streaming da los mismos bytes que Response"""
+        data = self.assertSameAsResponse('/api/tickets/my_tickets/')
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data[0]['buyer_name'], 'Ana Pérez')
+        self.assertSameAsResponse('/api/tickets/my_tickets/', COMPILED_SERIALIZERS_ENABLED=False)
+        self.assertSameAsResponse('/api/tickets/upcoming/?fields=id,code')
+
+    def test_chunks_and_stdlib_encoder(self):
+        """Test de bloques parciales y del encoder de la librería estándar"""
+        with mock.patch('core.streaming.CHUNK_SIZE', 2):
+            response = self.client.get('/api/tickets/my_tickets/')
+            chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 3)
+        self.assertTrue(chunks[0].startswith(b'['))
+        self.assertTrue(chunks[1].startswith(b','))
+        self.assertTrue(chunks[2].endswith(b']'))
+
+        # Sin orjson instalado
+        with mock.patch.dict(sys.modules, {'orjson': None}):
+            self.assertSameAsResponse('/api/tickets/my_tickets/')
+
+    def test_indented_json_uses_response(self):
+        """Test de que el JSON con indentación usa JSONRenderer"""
+        response = self.client.get('/api/tickets/my_tickets/', HTTP_ACCEPT='application/json; indent=2')
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.data), 5)
+
+
+class InventoryServiceTest(TestCase):
+    """Tests para la reserva de inventario."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='test123')
+        self.category = Category.objects.create(name="Conciertos")
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            category=self.category,
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=15,
+            status='published'
+        )
+        self.general = TicketType.objects.create(
+            event=self.event, name="General", price=Decimal('50000.00'), quantity=10
+        )
+        self.vip = TicketType.objects.create(
+            event=self.event, name="VIP", price=Decimal('90000.00'), quantity=10
+        )
+
+    def test_reserve_increments_sold_count(self):
+        """Test de reserva exitosa."""
+        with transaction.atomic():
+            InventoryService.reserve(self.general, 4)
+
+        self.general.refresh_from_db()
+        self.assertEqual(self.general.sold_count, 4)
+
+    def test_reserve_rejects_oversell_of_ticket_type(self):
+        """Test de reserva superior al stock del tipo."""
+        with self.assertRaises(InventoryError):
+            with transaction.atomic():
+                InventoryService.reserve(self.general, 11)
+
+        self.general.refresh_from_db()
+        self.assertEqual(self.general.sold_count, 0)
+
+    def test_reserve_never_oversells(self):
+        """Test de reservas sucesivas hasta agotar el stock, en cualquier motor."""
+        # Cada comprador leyó el tipo antes de que nadie comprara (stock 10)
+        buyers = [TicketType.objects.get(pk=self.general.pk) for _ in range(12)]
+
+        for buyer in buyers[:10]:
+            with transaction.atomic():
+                InventoryService.reserve(buyer, 1)
+            self.general.refresh_from_db()
+            self.assertLessEqual(self.general.sold_count, self.general.quantity)
+
+        for buyer in buyers[10:]:
+            with self.assertRaises(InventoryError):
+                with transaction.atomic():
+                    InventoryService.reserve(buyer, 1)
+
+        self.general.refresh_from_db()
+        self.assertEqual(self.general.sold_count, self.general.quantity)
+
+    def test_reserve_enforces_event_capacity(self):
+        """Test de capacidad del evento sumando todos los tipos."""
+        with transaction.atomic():
+            InventoryService.reserve(self.general, 10)
+
+        with self.assertRaises(InventoryError):
+            with transaction.atomic():
+                InventoryService.reserve(self.vip, 6)
+
+        self.vip.refresh_from_db()
+        self.assertEqual(self.vip.sold_count, 0)
+
+    def test_cancel_ticket_releases_once(self):
+        """Test de cancelación idempotente."""
+        with transaction.atomic():
+            InventoryService.reserve(self.general, 1)
+        ticket = Ticket.objects.create(
+            ticket_type=self.general,
+            buyer=self.user,
+            attendee_name="Juan Pérez",
+            attendee_email="juan@example.com",
+            purchase_price=Decimal('50000.00')
+        )
+
+        self.assertTrue(InventoryService.cancel_ticket(ticket))
+        self.assertFalse(InventoryService.cancel_ticket(ticket))
+
+        self.general.refresh_from_db()
+        self.assertEqual(self.general.sold_count, 0)
+
+
+class BulkPurchaseTest(TestCase):
+    """Tests para la creación masiva de tickets en la compra."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='test123')
+        self.category = Category.objects.create(name="Conciertos")
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            category=self.category,
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=500,
+            status='published'
+        )
+        self.ticket_type = TicketType.objects.create(
+            event=self.event, name="General", price=Decimal('50000.00'), quantity=100
+        )
+        self.request = APIRequestFactory().post('/api/tickets/purchase/')
+        self.request.user = self.user
+
+    def _purchase(self, quantity):
+        serializer = TicketPurchaseSerializer(
+            data={
+                'ticket_type': self.ticket_type.id,
+                'quantity': quantity,
+                'attendee_name': 'Juan Pérez',
+                'attendee_email': 'juan@example.com'
+            },
+            context={'request': self.request}
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer
+
+    def _count_queries(self, serializer):
+        with CaptureQueriesContext(connection) as ctx:
+            tickets = serializer.save()
+        return tickets, len(ctx.captured_queries)
+
+    def test_query_count_is_independent_of_quantity(self):
+        """Test de número constante de consultas por compra."""
+        # Reservar el bloque de códigos y crear las filas de ventas antes de medir
+        Ticket.generate_codes(1)
+        self._purchase(1).save()
+        _, single = self._count_queries(self._purchase(1))
+        tickets, bulk = self._count_queries(self._purchase(10))
+
+        self.assertEqual(single, bulk)
+        self.assertEqual(len(tickets), 10)
+        self.assertEqual(len({ticket.code for ticket in tickets}), 10)
+        self.assertTrue(all(ticket.pk for ticket in tickets))
+
+    def test_files_are_rendered_after_purchase(self):
+        """Test de QR y PDF diferidos."""
+        tickets = self._purchase(2).save()
+        self.assertFalse(tickets[0].qr_code)
+
+        render_ticket_files(tickets[0])
+        tickets[0].refresh_from_db()
+        self.assertTrue(tickets[0].qr_code)
+        self.assertTrue(tickets[0].pdf_ticket)
+
+
+class TicketCodeTest(TestCase):
+    """Tests para la asignación de códigos de ticket."""
+
+    @override_settings(TICKET_CODE_BLOCK_SIZE=10)
+    def test_codes_are_unique_across_blocks(self):
+        """Test de códigos únicos al cambiar de bloque."""
+        allocator = CodeAllocator()
+        codes = allocator.allocate(25) + allocator.allocate(25)
+
+        self.assertEqual(len(set(codes)), 50)
+        self.assertTrue(all(is_valid_ticket_code(code) for code in codes))
+
+    def test_allocation_does_not_query_tickets(self):
+        """Test de asignación sin consultas una vez reservado el bloque."""
+        allocator = CodeAllocator()
+        allocator.allocate(1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            codes = allocator.allocate(900)
+
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(len(set(codes)), 900)
+
+    def test_check_char_rejects_typos(self):
+        """Test de detección de errores de digitación."""
+        code = CodeAllocator().allocate(1)[0]
+        self.assertTrue(is_valid_ticket_code(code.lower()))
+
+        for position in range(len(code)):
+            for char in CODE_ALPHABET:
+                if char != code[position]:
+                    typo = code[:position] + char + code[position + 1:]
+                    self.assertFalse(is_valid_ticket_code(typo), typo)
+
+    def test_legacy_codes_are_accepted(self):
+        """Test de códigos antiguos de 12 caracteres."""
+        self.assertTrue(is_valid_ticket_code('ABCDEF123456'))
+        self.assertFalse(is_valid_ticket_code('ABC'))
+
+
+class TicketTokenTest(APITestCase):
+    """Tests para los tokens firmados del QR."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='test123')
+        self.category = Category.objects.create(name="Conciertos")
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            category=self.category,
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=500,
+            status='published'
+        )
+        self.ticket_type = TicketType.objects.create(
+            event=self.event, name="General", price=Decimal('50000.00'), quantity=100
+        )
+        self.ticket = Ticket.objects.create(
+            ticket_type=self.ticket_type,
+            buyer=self.user,
+            attendee_name="Juan Pérez",
+            attendee_email="juan@example.com",
+            purchase_price=Decimal('50000.00')
+        )
+
+    def test_token_round_trip(self):
+        """Test de firma y verificación local del token."""
+        token = self.ticket.signed_token
+        claims = verify_ticket_token(token)
+
+        self.assertEqual(len(token), 56)
+        self.assertEqual(claims['ticket_id'], self.ticket.pk)
+        self.assertEqual(claims['event_id'], self.event.pk)
+        self.assertEqual(claims['ticket_type_id'], self.ticket_type.pk)
+
+    def test_tampered_token_is_rejected(self):
+        """Test de token alterado."""
+        token = self.ticket.signed_token
+        tampered = token[:10] + ('A' if token[10] != 'A' else 'B') + token[11:]
+
+        with self.assertRaises(TicketTokenError):
+            verify_ticket_token(tampered)
+        with self.assertRaises(TicketTokenError):
+            verify_ticket_token('NO-ES-UN-TOKEN')
+
+    def test_expired_token_is_rejected(self):
+        """Test de token fuera de su ventana de validez."""
+        token = self.ticket.signed_token
+        with self.assertRaises(TicketTokenError):
+            verify_ticket_token(token, now=self.event.end_date + timedelta(days=2))
+
+    def test_key_rotation(self):
+        """Test de rotación de claves de firma."""
+        old_token = self.ticket.signed_token
+
+        keys = {1: settings.TICKET_SIGNING_KEYS[1], 2: 'clave-nueva'}
+        with override_settings(TICKET_SIGNING_KEYS=keys, TICKET_SIGNING_KEY_ID=2):
+            new_token = self.ticket.signed_token
+            self.assertEqual(verify_ticket_token(new_token)['key_id'], 2)
+            self.assertEqual(verify_ticket_token(old_token)['key_id'], 1)
+
+        with override_settings(TICKET_SIGNING_KEYS={2: 'clave-nueva'}, TICKET_SIGNING_KEY_ID=2):
+            with self.assertRaises(TicketTokenError):
+                verify_ticket_token(old_token)
+
+    def test_verify_endpoint_accepts_token(self):
+        """Test de verificación de ticket por token."""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(
+            '/api/tickets/verify/', {'token': self.ticket.signed_token}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['valid'])
+
+        response = self.client.post('/api/tickets/verify/', {'token': 'A' * 56})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConcurrentPurchaseTest(TransactionTestCase):
+    """Stress test: compradores concurrentes nunca producen sobreventa."""
+
+    BUYERS = 60
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("Requiere una base de datos compartida entre hilos.")
+
+        self.user = User.objects.create_user(username='testuser', password='test123')
+        self.category = Category.objects.create(name="Conciertos")
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            category=self.category,
+            organizer=self.user,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            capacity=40,
+            status='published'
+        )
+        self.ticket_types = [
+            TicketType.objects.create(
+                event=self.event, name=name, price=Decimal('50000.00'), quantity=30
+            )
+            for name in ("General", "VIP")
+        ]
+
+    def _buy(self, index, barrier, results):
+        ticket_type = TicketType.objects.get(pk=self.ticket_types[index % 2].pk)
+        barrier.wait()
+        try:
+            with transaction.atomic():
+                InventoryService.reserve(ticket_type, 1)
+                Ticket.objects.create(
+                    ticket_type=ticket_type,
+                    buyer=self.user,
+                    attendee_name=f"Comprador {index}",
+                    attendee_email=f"buyer{index}@example.com",
+                    purchase_price=ticket_type.price
+                )
+            results.append(True)
+        except InventoryError:
+            results.append(False)
+        finally:
+            connection.close()
+
+    def test_no_oversell_under_concurrency(self):
+        """Test de 60 compradores simultáneos sobre 40 cupos."""
+        barrier = threading.Barrier(self.BUYERS)
+        results = []
+        threads = [
+            threading.Thread(target=self._buy, args=(i, barrier, results))
+            for i in range(self.BUYERS)
+        ]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        sold = Ticket.objects.filter(ticket_type__event=self.event).count()
+        sold_count = sum(
+            TicketType.objects.filter(event=self.event).values_list('sold_count', flat=True)
+        )
+
+        self.assertEqual(len(results), self.BUYERS)
+        self.assertEqual(results.count(True), self.event.capacity)
+        # Los compradores que no alcanzaron cupo reciben un rechazo, no un error
+        self.assertEqual(results.count(False), self.BUYERS - self.event.capacity)
+        self.assertEqual(sold, self.event.capacity)
+        self.assertEqual(sold_count, self.event.capacity)
+        for ticket_type in TicketType.objects.filter(event=self.event):
+            self.assertLessEqual(ticket_type.sold_count, ticket_type.quantity)
@@ -5,12 +5,11 @@ Views para tickets.
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
-from django.db import transaction
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from core.emails import EmailService
 
 from .models import TicketType, Ticket, DiscountCode
 from .serializers import (
@@ -23,11 +22,17 @@ from .serializers import (
     TicketValidationSerializer,
 )
 from .filters import TicketTypeFilter, TicketFilter
+from .services import InventoryService
+from core.conditional import ConditionalGetMixin
+from core.pagination import KeysetPagination
 from core.permissions import IsEventOrganizer
+from core.compiled import CompiledListMixin
+from core.sparse import SparseQuerysetMixin
+from core.streaming import streaming_response
 from core.utils import generate_ticket_pdf
 
 
-class TicketTypeViewSet(viewsets.ModelViewSet):
+class TicketTypeViewSet(ConditionalGetMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de tipos de tickets.
 
@@ -40,6 +45,7 @@ class TicketTypeViewSet(viewsets.ModelViewSet):
     """
 
     queryset = TicketType.objects.select_related("event").all()
+    conditional_fields = ("updated_at", "event__updated_at")
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_class = TicketTypeFilter
@@ -85,11 +91,14 @@ class TicketTypeViewSet(viewsets.ModelViewSet):
             )
 
         ticket_types = self.queryset.filter(event_id=event_id, is_active=True)
-        serializer = self.get_serializer(ticket_types, many=True)
-        return Response(serializer.data)
+        return self.conditional_list(
+            request,
+            ticket_types,
+            lambda: streaming_response(request, self.get_serializer(ticket_types, many=True)),
+        )
 
 
-class TicketViewSet(viewsets.ModelViewSet):
+class TicketViewSet(ConditionalGetMixin, CompiledListMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de tickets.
 
@@ -105,7 +114,10 @@ class TicketViewSet(viewsets.ModelViewSet):
     queryset = Ticket.objects.select_related(
         "ticket_type", "ticket_type__event", "buyer", "discount_code"
     ).all()
+    conditional_fields = ("updated_at", "ticket_type__updated_at", "ticket_type__event__updated_at")
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ("-purchased_at", "-id")
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_class = TicketFilter
     search_fields = ["code", "attendee_name", "attendee_email"]
@@ -128,41 +140,20 @@ class TicketViewSet(viewsets.ModelViewSet):
         return self.queryset.filter(buyer=user)
 
     @action(detail=False, methods=["post"])
-    @transaction.atomic
     def purchase(self, request):
         """
         Comprar tickets.
+
+        La reserva de inventario y la creación de tickets ocurren en la
+        transacción de ``TicketPurchaseSerializer.create``. QR, PDF y email de
+        confirmación los procesa ``manage.py run_workers`` después del commit,
+        así que la respuesta no espera a ReportLab ni al servidor SMTP.
         """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         try:
             tickets = serializer.save()
-
-            #Importar el servicio de emails
-            
-            from core.emails import EmailService
-            import logging
-            logger = logging.getLogger(__name__)
-
-            # Generar PDFs para los tickets
-
-            for ticket in tickets:
-                try:
-                    ticket.pdf_ticket = generate_ticket_pdf(ticket)
-                    ticket.save(update_fields=["pdf_ticket"])
-                except Exception as e:
-                    # Log error pero no fallar la compra
-                    print(f"Error generating PDF: {e}")
-
-            # Enviar email de confirmación
-            try:
-                EmailService.send_ticket_purchase_confirmation(ticket)
-                logger.info(f"Email de confirmación enviado para ticket {ticket.code}")
-            except Exception as e:
-                logger.error(f"Error enviando email de confirmación: {e}")
-                # No fallar la compra si el email falla
-
             response_serializer = TicketSerializer(tickets, many=True)
 
             return Response(
@@ -173,22 +164,16 @@ class TicketViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_201_CREATED,
             )
 
+        except ValidationError:
+            raise
+
         except Exception as e:
             return Response(
                {"error": f"Error en la compra: {str(e)}"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        tickets = purchase.tickets.all()
-        
-        for ticket in tickets:
-            try:
-                EmailService.send_ticket_purchase_confirmation(ticket)
-            except Exception as e:
-                logger.error(f"Error enviando email de confirmación: {e}")
-
     @action(detail=True, methods=["post"])
-    @transaction.atomic
     def cancel(self, request, pk=None):
         """
         Cancelar un ticket.
@@ -209,14 +194,13 @@ class TicketViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Cancelar ticket
-        ticket.status = "cancelled"
-        ticket.cancelled_at = timezone.now()
-        ticket.save()
-
-        # Devolver ticket al inventario
-        ticket.ticket_type.sold_count -= 1
-        ticket.ticket_type.save(update_fields=["sold_count"])
+        # Cancelar ticket y devolverlo al inventario (una sola vez aunque
+        # lleguen dos solicitudes simultáneas)
+        if not InventoryService.cancel_ticket(ticket):
+            return Response(
+                {"error": "Este ticket no puede ser cancelado"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         serializer = self.get_serializer(ticket)
         return Response(
@@ -233,9 +217,13 @@ class TicketViewSet(viewsets.ModelViewSet):
 
         code = serializer.validated_data.get("code")
         uuid_val = serializer.validated_data.get("uuid")
+        token = serializer.validated_data.get("token")
 
         try:
-            if code:
+            if token:
+                # Firma ya verificada por el serializer
+                ticket = Ticket.objects.get(pk=token["ticket_id"])
+            elif code:
                 ticket = Ticket.objects.get(code=code)
             else:
                 ticket = Ticket.objects.get(uuid=uuid_val)
@@ -284,8 +272,11 @@ class TicketViewSet(viewsets.ModelViewSet):
         Obtener tickets del usuario autenticado.
         """
         tickets = self.queryset.filter(buyer=request.user)
-        serializer = self.get_serializer(tickets, many=True)
-        return Response(serializer.data)
+        return self.conditional_list(
+            request,
+            tickets,
+            lambda: streaming_response(request, self.get_serializer(tickets, many=True)),
+        )
 
     @action(detail=False, methods=["get"])
     def upcoming(self, request):
@@ -298,11 +289,14 @@ class TicketViewSet(viewsets.ModelViewSet):
             ticket_type__event__start_date__gte=timezone.now(),
         ).order_by("ticket_type__event__start_date")
 
-        serializer = self.get_serializer(tickets, many=True)
-        return Response(serializer.data)
+        return self.conditional_list(
+            request,
+            tickets,
+            lambda: streaming_response(request, self.get_serializer(tickets, many=True)),
+        )
 
 
-class DiscountCodeViewSet(viewsets.ModelViewSet):
+class DiscountCodeViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de códigos de descuento.
 
@@ -2,6 +2,8 @@
 Configuración base de Django para EventHub.
 Configuraciones compartidas entre desarrollo y producción.
 """
+import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 from decouple import config, Csv
@@ -37,6 +39,7 @@ LOCAL_APPS = [
     'apps.tickets',
     'apps.attendees',
     'apps.sponsors',
+    'apps.jobs',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -194,4 +197,75 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='EventHub <noreply@eve
 EMAIL_TIMEOUT = 10
 
 # Templates de email
-EMAIL_BACKEND_TEMPLATE_DIR = BASE_DIR / 'templates' / 'emails'
\ No newline at end of file
+EMAIL_BACKEND_TEMPLATE_DIR = BASE_DIR / 'templates' / 'emails'
+
+# Cola de trabajos en segundo plano (manage.py run_workers)
+JOBS_MAX_ATTEMPTS = config('JOBS_MAX_ATTEMPTS', default=5, cast=int)
+JOBS_RETRY_BACKOFF = config('JOBS_RETRY_BACKOFF', default=30, cast=int)  # segundos, se duplica por intento
+JOBS_RETRY_MAX_DELAY = config('JOBS_RETRY_MAX_DELAY', default=3600, cast=int)
+JOBS_LOCK_TIMEOUT = config('JOBS_LOCK_TIMEOUT', default=600, cast=int)  # trabajo "running" sin terminar se reintenta
+
+# Reporte Excel de un evento (apps/events/exports.py): con más tickets que
+# este umbral se genera en un trabajo y se descarga con ?job=<id>
+EXCEL_EXPORT_ASYNC_THRESHOLD = config('EXCEL_EXPORT_ASYNC_THRESHOLD', default=5000, cast=int)
+
+# Bandeja de salida de emails masivos (apps/jobs/outbox.py, manage.py send_outbox).
+# EMAIL_OUTBOX_BATCH_SIZE / EMAIL_OUTBOX_RATE_LIMIT debe quedar bajo JOBS_LOCK_TIMEOUT:
+# el worker recorta los lotes más lentos a la mitad de ese tiempo
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=100, cast=int)  # emails por lote del worker
+EMAIL_OUTBOX_RATE_LIMIT = config('EMAIL_OUTBOX_RATE_LIMIT', default=10, cast=float)  # emails por segundo, 0 sin límite
+EMAIL_OUTBOX_INSERT_BATCH = config('EMAIL_OUTBOX_INSERT_BATCH', default=1000, cast=int)  # filas por INSERT al encolar
+
+# Códigos de ticket (apps/tickets/codes.py)
+# TICKET_CODE_KEY no se rota nunca: los códigos son una permutación de la
+# secuencia bajo esta clave, y con otra clave los números nuevos darían
+# códigos ya emitidos (compras rechazadas por el UNIQUE de Ticket.code). Por
+# eso no depende de SECRET_KEY en producción (prod.py la exige); el valor por
+# defecto solo sirve para desarrollo.
+TICKET_CODE_KEY = config('TICKET_CODE_KEY', default=SECRET_KEY)
+TICKET_CODE_BLOCK_SIZE = config('TICKET_CODE_BLOCK_SIZE', default=1000, cast=int)
+
+# Firma de los QR de tickets (core.utils.sign_ticket_token)
+# Rotación: se firma con TICKET_SIGNING_KEY_ID y se aceptan todas las claves
+# de TICKET_SIGNING_KEYS, así que la clave anterior se deja configurada hasta
+# que terminen los eventos de los tickets firmados con ella.
+TICKET_SIGNING_KEY_ID = config('TICKET_SIGNING_KEY_ID', default=1, cast=int)
+TICKET_SIGNING_KEYS = {
+    TICKET_SIGNING_KEY_ID: config('TICKET_SIGNING_KEY', default=SECRET_KEY),
+}
+if config('TICKET_SIGNING_PREVIOUS_KEY', default=''):
+    TICKET_SIGNING_KEYS[config('TICKET_SIGNING_PREVIOUS_KEY_ID', cast=int)] = config(
+        'TICKET_SIGNING_PREVIOUS_KEY'
+    )
+TICKET_TOKEN_LEEWAY = config('TICKET_TOKEN_LEEWAY', default=12, cast=int)  # horas después del fin del evento
+
+# Manifiesto de check-in (apps/tickets/manifest.py): margen para que una
+# transacción en curso al generar la versión entre en el siguiente delta
+TICKET_MANIFEST_SETTLE_SECONDS = config('TICKET_MANIFEST_SETTLE_SECONDS', default=60, cast=int)
+
+# Contador de vistas de eventos (apps/events/counters.py)
+# Cada proceso acumula vistas en memoria y las vuelca a un archivo del
+# directorio compartido cada EVENT_VIEWS_SPOOL_INTERVAL segundos (lo máximo
+# que se pierde si el proceso muere); cada EVENT_VIEWS_FLUSH_INTERVAL
+# segundos los archivos se suman a Event.views_count con un solo UPDATE.
+EVENT_VIEWS_SPOOL_DIR = config(
+    'EVENT_VIEWS_SPOOL_DIR', default=os.path.join(tempfile.gettempdir(), 'eventhub_views')
+)
+EVENT_VIEWS_SPOOL_INTERVAL = config('EVENT_VIEWS_SPOOL_INTERVAL', default=5, cast=float)
+EVENT_VIEWS_FLUSH_INTERVAL = config('EVENT_VIEWS_FLUSH_INTERVAL', default=60, cast=float)
+
+# Cache de respuestas del catálogo (core/cache.py). Sin CACHES configurado
+# se usa LocMemCache, que es por proceso; en producción conviene un backend
+# compartido para que el single-flight valga entre workers.
+CATALOG_CACHE_ENABLED = config('CATALOG_CACHE_ENABLED', default=True, cast=bool)
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=30, cast=int)  # segundos como respuesta fresca
+CATALOG_CACHE_STALE = config('CATALOG_CACHE_STALE', default=300, cast=int)  # segundos sirviendo la vieja mientras se regenera
+CATALOG_CACHE_LOCK_TIMEOUT = config('CATALOG_CACHE_LOCK_TIMEOUT', default=10, cast=int)
+CATALOG_CACHE_WAIT = config('CATALOG_CACHE_WAIT', default=2, cast=float)
+
+# Listados con serializers compilados desde values() (core/compiled.py)
+COMPILED_SERIALIZERS_ENABLED = config('COMPILED_SERIALIZERS_ENABLED', default=True, cast=bool)
+
+# Listados sin paginar enviados en streaming (core/streaming.py); con orjson
+# instalado las filas se codifican con orjson
+STREAMING_JSON_ENABLED = config('STREAMING_JSON_ENABLED', default=True, cast=bool)
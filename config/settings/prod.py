@@ -43,4 +43,8 @@ LOGGING = {
             'propagate': False,
         },
     },
-}
\ No newline at end of file
+}
+
+# Códigos de ticket: clave propia y obligatoria, que no cambia al rotar
+# SECRET_KEY (ver base.py; nunca se rota)
+TICKET_CODE_KEY = config('TICKET_CODE_KEY')
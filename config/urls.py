@@ -9,7 +9,7 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from core.views import dashboard_stats, health_check
+from core.views import dashboard_stats, health_check, sales_trend
 
 # Configuración de Swagger con JWT
 schema_view = get_schema_view(
@@ -88,6 +88,7 @@ urlpatterns = [
     
     # Dashboard
     path('api/dashboard/', dashboard_stats, name='dashboard_stats'),
+    path('api/dashboard/sales_trend/', sales_trend, name='sales_trend'),
     
     # Swagger Documentation
     path('swagger<format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
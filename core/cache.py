@@ -0,0 +1,252 @@
+"""
+Cache de respuestas del catálogo público (eventos, categorías y lugares).
+
+Cada entrada guarda los datos de la respuesta junto con las versiones de los
+modelos del catálogo con las que se generó. Guardar o borrar un Event,
+TicketType, Category o Venue incrementa la versión de su modelo (ver
+``apps/events/signals.py``), así que la entrada queda vieja sin tener que
+buscar qué claves borrar.
+
+Una entrada vieja (versión distinta o más de ``CATALOG_CACHE_TIMEOUT``
+segundos) se sigue sirviendo mientras una sola petición la regenera
+(stale-while-revalidate). Sin entrada, solo una petición por clave consulta
+la base de datos y las demás esperan hasta ``CATALOG_CACHE_WAIT`` segundos
+su resultado (single-flight). El candado vive en el cache, así que con un
+backend compartido (Redis, Memcached) vale para todos los procesos.
+
+Las respuestas en streaming (``core/streaming.py``) se guardan como el JSON
+ya codificado, cuando terminan de enviarse; el candado se mantiene hasta
+entonces, porque las consultas corren mientras se envía el contenido.
+"""
+import functools
+import hashlib
+import json
+import logging
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from core.conditional import not_modified, set_validators
+
+logger = logging.getLogger(__name__)
+
+CATALOG_MODELS = ('events.event', 'tickets.tickettype', 'events.category', 'events.venue')
+_POLL_INTERVAL = 0.05
+
+
+def _version_key(label):
+    return f'catalog:version:{label}'
+
+
+def get_catalog_versions():
+    """Versiones actuales de los modelos del catálogo."""
+    keys = [_version_key(label) for label in CATALOG_MODELS]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Sin versión (cache reiniciado): empezar desde la hora actual
+            # para no repetir una versión anterior
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+
+def bump_catalog_version(label):
+    """Invalidar las respuestas que dependen del modelo ``label``."""
+    key = _version_key(label)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def request_role(request):
+    """Rol con el que se guarda la respuesta: la misma para todo el rol."""
+    user = request.user
+    if not user.is_authenticated:
+        return 'anonymous'
+    return 'staff' if user.is_staff else 'authenticated'
+
+
+def catalog_cache_key(request):
+    """
+    Clave de una petición: host, ruta, query string ordenado y rol.
+
+    ``?b=2&a=1`` y ``?a=1&b=2`` comparten entrada.
+    """
+    query = urlencode(sorted(
+        (key, value)
+        for key in request.GET
+        for value in request.GET.getlist(key)
+    ))
+    raw = '|'.join([request.get_host(), request.path, query, request_role(request)])
+    return 'catalog:response:' + hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _entry(response, versions):
+    return {
+        'versions': versions,
+        'fresh_until': time.time() + settings.CATALOG_CACHE_TIMEOUT,
+        # Validadores de la vista (ConditionalGetMixin) para responder 304
+        # desde el cache sin consultar la base de datos
+        'etag': response.get('ETag'),
+        'last_modified': parse_http_date_safe(response.get('Last-Modified', '')),
+    }
+
+
+def _store(key, response, versions, lock_key):
+    """
+    Guardar ``response`` en ``key``.
+
+    Returns:
+        bool: True si el candado pasó a la respuesta en streaming, que lo
+        suelta al terminar de enviarse
+    """
+    if response.status_code != 200:
+        return False
+    if response.streaming:
+        _store_streaming(key, response, versions, lock_key)
+        return True
+    entry = _entry(response, versions)
+    entry['data'] = response.data
+    cache.set(key, entry, settings.CATALOG_CACHE_TIMEOUT + settings.CATALOG_CACHE_STALE)
+    return False
+
+
+class _StreamingTee:
+    """
+    Contenido de una respuesta en streaming que se copia mientras se envía.
+
+    Al terminar guarda la entrada; al terminar, fallar o cerrarse la
+    respuesta suelta el candado, así que las demás peticiones esperan (o
+    reciben la entrada vieja) mientras las consultas siguen corriendo.
+    """
+
+    def __init__(self, content, on_complete, lock_key):
+        self.content = content
+        self.on_complete = on_complete
+        self.lock_key = lock_key
+
+    def __iter__(self):
+        chunks = []
+        try:
+            for chunk in self.content:
+                chunks.append(chunk)
+                yield chunk
+            self.on_complete(b''.join(chunks))
+        finally:
+            self.close()
+
+    def close(self):
+        # La respuesta llama a close() aunque el contenido no se haya recorrido
+        if self.lock_key is not None:
+            cache.delete(self.lock_key)
+            self.lock_key = None
+        if hasattr(self.content, 'close'):
+            self.content.close()
+
+
+def _store_streaming(key, response, versions, lock_key):
+    """
+    Guardar el JSON de una respuesta en streaming (``core/streaming.py``).
+
+    El contenido se copia mientras se envía y la entrada se guarda al
+    terminar; si el cliente corta la conexión no se guarda nada.
+    """
+    entry = _entry(response, versions)
+    content_type = response['Content-Type']
+
+    def complete(content):
+        entry['content'] = content
+        entry['content_type'] = content_type
+        cache.set(key, entry, settings.CATALOG_CACHE_TIMEOUT + settings.CATALOG_CACHE_STALE)
+
+    response.streaming_content = _StreamingTee(response.streaming_content, complete, lock_key)
+
+
+def _from_entry(request, entry, state):
+    etag = entry.get('etag')
+    response = None
+    if etag:
+        response = not_modified(request, etag, entry.get('last_modified'))
+    if response is None:
+        if 'data' in entry:
+            response = Response(entry['data'])
+        elif getattr(getattr(request, 'accepted_renderer', None), 'format', None) == 'json':
+            response = HttpResponse(entry['content'], content_type=entry['content_type'])
+        else:
+            # Navegador de la API: renderizar los datos del JSON guardado
+            response = Response(json.loads(entry['content']))
+        if etag:
+            set_validators(response, etag, entry.get('last_modified'))
+    response['X-Cache'] = state
+    return response
+
+
+def get_or_build(request, key, build):
+    """
+    Servir ``key`` desde el cache o generarla con ``build()``.
+
+    Si la entrada tiene ETag y coincide con ``If-None-Match`` del cliente,
+    responde 304.
+
+    Returns:
+        Response: con cabecera ``X-Cache`` HIT, STALE o MISS
+    """
+    versions = get_catalog_versions()
+    entry = cache.get(key)
+    lock_key = key + ':lock'
+
+    if entry is not None:
+        if entry['versions'] == versions and entry['fresh_until'] > time.time():
+            return _from_entry(request, entry, 'HIT')
+        if not cache.add(lock_key, 1, settings.CATALOG_CACHE_LOCK_TIMEOUT):
+            # Otra petición ya la está regenerando
+            return _from_entry(request, entry, 'STALE')
+    elif not cache.add(lock_key, 1, settings.CATALOG_CACHE_LOCK_TIMEOUT):
+        deadline = time.monotonic() + settings.CATALOG_CACHE_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(_POLL_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None:
+                return _from_entry(request, entry, 'HIT')
+        # El que tenía el candado tardó demasiado: generar sin guardar
+        logger.warning(f"Cache del catálogo: espera agotada para {key}")
+        response = build()
+        response['X-Cache'] = 'MISS'
+        return response
+
+    handed_off = False
+    try:
+        response = build()
+        handed_off = _store(key, response, versions, lock_key)
+    finally:
+        if not handed_off:
+            cache.delete(lock_key)
+
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def cached_catalog(view_method):
+    """
+    Decorador para acciones GET de lectura del catálogo.
+
+    Se aplica a métodos de un ViewSet, así que la autenticación y los
+    permisos ya corrieron cuando se consulta el cache.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method != 'GET' or not settings.CATALOG_CACHE_ENABLED:
+            return view_method(self, request, *args, **kwargs)
+        return get_or_build(
+            request,
+            catalog_cache_key(request),
+            lambda: view_method(self, request, *args, **kwargs),
+        )
+    return wrapper
@@ -0,0 +1,260 @@
+"""
+Serialización compilada de listados a partir de filas de ``values()``.
+
+``ModelSerializer`` construye una instancia de modelo por fila y, por cada
+campo, resuelve ``source`` con ``getattr`` y maneja ``SkipField``. Para los
+listados grandes, ``CompiledSerializer`` analiza una sola vez los campos del
+serializer y arma cada respuesta desde un diccionario de ``values()``:
+
+- Columnas y relaciones (``source='event.title'``): la ruta de ``values()``
+  y el ``to_representation`` del propio campo DRF, así que el formato de
+  fechas, decimales y opciones es el mismo.
+- Llaves foráneas (``PrimaryKeyRelatedField``): el id de la columna.
+- Archivos e imágenes: el ``FieldFile`` del modelo con el nombre guardado.
+- Campos calculados: el método ``row_<campo>(row)`` del serializer con las
+  columnas de ``Meta.field_sources`` (ver ``core/sparse.py``) y las
+  anotaciones del queryset de ``Meta.row_annotations``, o una anotación
+  propia de ``Meta.compiled_annotations`` (por ejemplo un conteo).
+
+Solo se compilan los serializers con ``Meta.compiled = True``; si algún
+campo no se puede compilar (por ejemplo un objeto de ``?expand=``), la vista
+usa el serializer normal. La salida es idéntica a la del serializer DRF.
+"""
+from django.conf import settings
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.query import ModelIterable
+from rest_framework import serializers
+from rest_framework.fields import empty
+
+from core.sparse import SparseQuerysetMixin, resolve_path
+
+ANNOTATION_PREFIX = 'compiled_'
+_SKIP = object()
+
+
+class NotCompilable(Exception):
+    """El serializer tiene campos que solo resuelve DRF."""
+
+
+def subquery_count(queryset, field):
+    """
+    Conteo por fila de ``queryset`` agrupado por la llave ``field``.
+
+    ``subquery_count(CheckInLog.objects, 'attendee')`` anotado sobre
+    Attendee equivale a ``attendee.check_in_logs.count()``.
+    """
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(Subquery(counts), 0)
+
+
+def full_name(row, prefix):
+    """``User.get_full_name() or username`` de las columnas ``prefix__*``."""
+    name = f"{row[f'{prefix}__first_name']} {row[f'{prefix}__last_name']}".strip()
+    return name or row[f'{prefix}__username']
+
+
+def _final_model_field(model, path):
+    """Campo del modelo al final de ``path``."""
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+class CompiledSerializer:
+    """
+    Serializer de solo lectura compilado desde una instancia de serializer.
+
+    La instancia ya tiene aplicada la selección de ``?fields=`` y el
+    contexto (``request`` para las URLs absolutas de archivos).
+    """
+
+    def __init__(self, serializer, model, annotations=()):
+        serializer = getattr(serializer, 'child', serializer)
+        meta = getattr(serializer, 'Meta', None)
+        if not getattr(meta, 'compiled', False):
+            raise NotCompilable(type(serializer).__name__)
+
+        sources = getattr(meta, 'field_sources', {})
+        compiled_annotations = getattr(meta, 'compiled_annotations', {})
+        row_annotations = getattr(meta, 'row_annotations', {})
+        self.model = model
+        self.columns = {model._meta.pk.name}
+        self.annotations = {}
+        self.accessors = []
+
+        for name, field in serializer.fields.items():
+            if name in compiled_annotations:
+                alias = ANNOTATION_PREFIX + name
+                self.annotations[alias] = compiled_annotations[name]
+                self.accessors.append((name, self._column(field, alias, ())))
+            elif hasattr(serializer, f'row_{name}'):
+                self._add_columns(sources.get(name, ()), annotations)
+                required = set(row_annotations.get(name, ()))
+                if not required <= set(annotations):
+                    raise NotCompilable(name)
+                self.columns.update(required)
+                self.accessors.append((name, self._computed(field, getattr(serializer, f'row_{name}'))))
+            else:
+                self.accessors.append((name, self._source(field, annotations)))
+
+    def _add_columns(self, paths, annotations):
+        for path in paths:
+            resolved = resolve_path(self.model, path, annotations=annotations)
+            if resolved is None:
+                raise NotCompilable(path)
+            self.columns.update(resolved[0] or {path})
+
+    def _source(self, field, annotations):
+        if isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField,
+                              serializers.SerializerMethodField)):
+            raise NotCompilable(field.field_name)
+        if field.source == '*':
+            raise NotCompilable(field.field_name)
+
+        path = '__'.join(field.source_attrs)
+        resolved = resolve_path(self.model, path, annotations=annotations)
+        if resolved is None:
+            raise NotCompilable(path)
+        self.columns.update(resolved[0] or {path})
+        # Relaciones intermedias: si alguna es nula, DRF omite el campo
+        relations = tuple(sorted(column for column in resolved[0] if column != path))
+
+        if isinstance(field, serializers.RelatedField):
+            if not field.use_pk_only_optimization() or relations:
+                raise NotCompilable(path)
+            return lambda row: row[path]
+
+        if isinstance(field, serializers.FileField):
+            model_field = _final_model_field(self.model, path)
+            to_representation = field.to_representation
+
+            def file_accessor(row):
+                value = row[path]
+                if value is None:
+                    return None
+                return to_representation(model_field.attr_class(None, model_field, value))
+
+            return self._guard(field, relations, file_accessor)
+
+        return self._column(field, path, relations)
+
+    def _column(self, field, key, relations):
+        to_representation = field.to_representation
+
+        def accessor(row):
+            value = row[key]
+            return None if value is None else to_representation(value)
+
+        return self._guard(field, relations, accessor)
+
+    def _computed(self, field, method):
+        if isinstance(field, serializers.SerializerMethodField):
+            return method
+        to_representation = field.to_representation
+
+        def accessor(row):
+            value = method(row)
+            return None if value is None else to_representation(value)
+
+        return accessor
+
+    @staticmethod
+    def _guard(field, relations, accessor):
+        if not relations:
+            return accessor
+        # Mismo resultado que Field.get_attribute con una relación nula
+        if field.default is not empty:
+            fallback = field.get_default
+        elif field.allow_null:
+            fallback = lambda: None
+        else:
+            fallback = lambda: _SKIP
+
+        def guarded(row):
+            for relation in relations:
+                if row[relation] is None:
+                    return fallback()
+            return accessor(row)
+
+        return guarded
+
+    def rows(self, queryset, extra=()):
+        """``queryset`` como filas de ``values()`` con las columnas necesarias."""
+        annotations = {alias: factory() for alias, factory in self.annotations.items()}
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset.values(*sorted(self.columns | set(extra)), *annotations)
+
+    def to_representation(self, row):
+        data = {}
+        for name, accessor in self.accessors:
+            value = accessor(row)
+            if value is not _SKIP:
+                data[name] = value
+        return data
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+class CompiledData:
+    """Resultado con la interfaz ``.data`` de un serializer ``many=True``."""
+
+    def __init__(self, compiled, rows):
+        self.compiled = compiled
+        self.instance = rows
+
+    @property
+    def data(self):
+        return self.compiled.serialize(self.instance)
+
+
+class CompiledListMixin(SparseQuerysetMixin):
+    """
+    Listados de un ViewSet con ``CompiledSerializer`` cuando es posible.
+
+    Se desactiva con ``COMPILED_SERIALIZERS_ENABLED = False``.
+    """
+
+    def get_compiled(self, queryset):
+        """``CompiledSerializer`` para ``queryset``, o None para usar DRF."""
+        if not getattr(settings, 'COMPILED_SERIALIZERS_ENABLED', True):
+            return None
+        if queryset._iterable_class is not ModelIterable or queryset._prefetch_related_lookups:
+            return None
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        try:
+            return CompiledSerializer(
+                serializer, queryset.model, annotations=set(queryset.query.annotations)
+            )
+        except NotCompilable:
+            return None
+
+    def compiled_rows(self, compiled, queryset):
+        # El cursor se arma con los campos de ordenamiento de la última fila
+        extra = [path.lstrip('-') for path in getattr(self, 'cursor_ordering', ())]
+        return compiled.rows(queryset, extra)
+
+    def paginate_queryset(self, queryset):
+        compiled = self.get_compiled(queryset) if hasattr(queryset, 'query') else None
+        if compiled is None:
+            return super().paginate_queryset(queryset)
+        page = super().paginate_queryset(self.compiled_rows(compiled, queryset))
+        if page is not None:
+            self.compiled_page = (compiled, page)
+        return page
+
+    def get_serializer(self, *args, **kwargs):
+        if args and kwargs.get('many'):
+            compiled_page = getattr(self, 'compiled_page', None)
+            if compiled_page is not None and args[0] is compiled_page[1]:
+                return CompiledData(*compiled_page)
+            if hasattr(args[0], 'query'):
+                compiled = self.get_compiled(args[0])
+                if compiled is not None:
+                    return CompiledData(compiled, self.compiled_rows(compiled, args[0]))
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,170 @@
+"""
+GET condicional (ETag / Last-Modified) para los ViewSets.
+
+Los validadores salen de la base de datos sin serializar nada: para un
+listado, un solo ``aggregate`` con la cantidad de filas y el ``Max`` de los
+campos de fecha de modificación; para un detalle, las fechas del objeto que
+``get_object`` ya cargó. Si el cliente manda ``If-None-Match`` o
+``If-Modified-Since`` y coinciden, se responde 304 sin cuerpo.
+
+Los listados solo llevan ETag: borrar una fila, o que una fila deje de
+cumplir el filtro, no mueve el ``Max`` de las fechas, así que un
+``Last-Modified`` daría 304 con datos viejos. La cantidad de filas del ETag
+sí cambia. Los detalles llevan ETag y ``Last-Modified``.
+
+Los ETag son débiles (``W/``): contadores como ``views_count`` pueden cambiar
+sin que cambie el ETag.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from core.pagination import KeysetPagination
+
+
+def make_etag(request, *parts):
+    """ETag débil para la ruta, el query string, el usuario y ``parts``."""
+    query = '&'.join(sorted(
+        f'{key}={value}'
+        for key in request.GET
+        for value in request.GET.getlist(key)
+    ))
+    raw = '|'.join([
+        request.path,
+        query,
+        str(request.user.pk or ''),
+        getattr(request, 'accepted_media_type', '') or '',
+        *(str(part) for part in parts),
+    ])
+    return 'W/"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+
+
+def queryset_validators(queryset, fields=('updated_at',)):
+    """
+    Cantidad de filas y última modificación de ``queryset`` en una consulta.
+
+    Returns:
+        tuple: (count, lista de fechas máximas por campo)
+    """
+    aggregates = {'count': Count('pk')}
+    for index, field in enumerate(fields):
+        aggregates[f'stamp_{index}'] = Max(field)
+    values = queryset.order_by().aggregate(**aggregates)
+    return values['count'], [values[f'stamp_{index}'] for index in range(len(fields))]
+
+
+def object_validators(obj, fields=('updated_at',)):
+    """Fechas de modificación de un objeto y sus relaciones ya cargadas."""
+    stamps = []
+    for field in fields:
+        value = obj
+        for attribute in field.split('__'):
+            value = getattr(value, attribute, None) if value is not None else None
+        stamps.append(value)
+    return stamps
+
+
+def last_modified_of(stamps):
+    """Timestamp (segundos) de la fecha más reciente, ignorando las None."""
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return int(max(stamps).timestamp()) if stamps else None
+
+
+def not_modified(request, etag, last_modified=None):
+    """
+    Respuesta 304 si ``If-None-Match`` / ``If-Modified-Since`` coinciden.
+
+    Args:
+        request: Request de DRF o HttpRequest
+        etag: ETag de la versión actual
+        last_modified: Timestamp de la última modificación o None
+
+    Returns:
+        HttpResponseNotModified o None
+    """
+    validators = HttpResponse()
+    validators['ETag'] = etag
+    if last_modified is not None:
+        validators['Last-Modified'] = http_date(last_modified)
+
+    http_request = getattr(request, '_request', request)
+    result = get_conditional_response(
+        http_request, etag=etag, last_modified=last_modified, response=validators
+    )
+    if isinstance(result, HttpResponseNotModified):
+        return result
+    return None
+
+
+def set_validators(response, etag, last_modified=None):
+    """Agregar ETag y Last-Modified a una respuesta 200."""
+    if response.status_code != 200:
+        return response
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def conditional_response(request, etag, stamps, build):
+    """
+    Responder 304 si el cliente ya tiene esta versión; si no, ``build()``.
+
+    Args:
+        request: Request de DRF o HttpRequest
+        etag: ETag calculado con ``make_etag``
+        stamps: Fechas de modificación (se ignoran las None)
+        build: Función que genera la respuesta completa
+    """
+    last_modified = last_modified_of(stamps)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    return set_validators(build(), etag, last_modified)
+
+
+class ConditionalGetMixin:
+    """
+    GET condicional para ``list`` y ``retrieve`` de un ViewSet.
+
+    ``conditional_fields`` son los campos de fecha (pueden cruzar relaciones
+    con ``__``) que cambian cuando cambia la representación.
+    """
+    conditional_fields = ('updated_at',)
+
+    def list(self, request, *args, **kwargs):
+        if isinstance(self.paginator, KeysetPagination) and self.paginator.is_keyset(request):
+            # El COUNT de los validadores recorrería toda la colección, que
+            # es justo lo que evita la paginación por cursor
+            return super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_list(
+            request, queryset, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return self.conditional_object(
+            request, instance, lambda: self.get_retrieve_response(instance)
+        )
+
+    def get_retrieve_response(self, instance):
+        return Response(self.get_serializer(instance).data)
+
+    def conditional_list(self, request, queryset, build):
+        count, stamps = queryset_validators(queryset, self.conditional_fields)
+        # Sin Last-Modified: ver el docstring del módulo
+        return conditional_response(
+            request, make_etag(request, count, *stamps), (), build
+        )
+
+    def conditional_object(self, request, instance, build):
+        stamps = object_validators(instance, self.conditional_fields)
+        return conditional_response(
+            request, make_etag(request, instance.pk, *stamps), stamps, build
+        )
@@ -1,18 +1,161 @@
 """
 Sistema de envío de emails para EventHub.
 """
+import re
+import secrets
+
 from django.core.mail import EmailMultiAlternatives
+from django.template.defaultfilters import floatformat
 from django.template.loader import render_to_string
 from django.conf import settings
-from django.utils.html import strip_tags
+from django.utils.html import conditional_escape, strip_tags
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Campos por destinatario de los emails masivos a tickets (ver MassEmailTemplate)
+REMINDER_FIELDS = {
+    'attendee_name': lambda ticket: ticket.attendee_name,
+}
+CANCELLED_FIELDS = {
+    **REMINDER_FIELDS,
+    'ticket.code': lambda ticket: ticket.code,
+    'ticket.final_price': lambda ticket: floatformat(ticket.final_price, 0),
+}
+
+
+def ticket_context(ticket):
+    """Contexto propio del destinatario de un email masivo a tickets."""
+    return {'ticket': ticket, 'attendee_name': ticket.attendee_name}
+
+
+class MassEmailTemplate:
+    """
+    Template de un email masivo renderizado una sola vez.
+
+    El template se renderiza con el contexto compartido (evento, URLs) y un
+    marcador numérico en cada campo del destinatario; el HTML y el texto
+    plano quedan partidos en segmentos fijos y campos. Cada email solo une
+    los segmentos con los valores escapados del destinatario, sin
+    ``render_to_string`` ni ``strip_tags``.
+
+    El primer email se compara con un renderizado completo: si el template
+    usa un campo del destinatario de otra forma (un ``{% if %}``, un filtro
+    no declarado) todos se renderizan completos como antes.
+    """
+
+    def __init__(self, template_name, context, fields, recipient_context):
+        """
+        Args:
+            template_name: Nombre del template (sin .html)
+            context: Contexto compartido por todos los destinatarios
+            fields: Diccionario ruta en el contexto (``'ticket.code'``) ->
+                función que devuelve el valor ya formateado del destinatario
+            recipient_context: Función que devuelve el contexto propio del
+                destinatario para el renderizado completo
+        """
+        self.template_name = template_name
+        self.context = context
+        self.fields = list(fields.values())
+        self.recipient_context = recipient_context
+        self.exact = None
+
+        # Marcadores de solo dígitos: pasan igual por escape, strip_tags y floatformat
+        nonce = 10 ** 15 + secrets.randbelow(9 * 10 ** 15)
+        markers = {f'{nonce}{index:03d}': index for index in range(len(self.fields))}
+        placeholders = {}
+        for path, marker in zip(fields, markers):
+            *parents, name = path.split('.')
+            target = placeholders
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[name] = marker
+
+        html_content, text_content = EmailService.render(template_name, {**context, **placeholders})
+        pattern = re.compile(f"({'|'.join(markers)})")
+        self.segments = [
+            [markers.get(part, part) for part in pattern.split(content)]
+            for content in (html_content, text_content)
+        ]
+
+    def _substitute(self, recipient):
+        values = [conditional_escape(field(recipient)) for field in self.fields]
+        return tuple(
+            ''.join(values[part] if isinstance(part, int) else part for part in segments)
+            for segments in self.segments
+        )
+
+    def render(self, recipient):
+        """
+        Renderizar el email de ``recipient``.
+
+        Returns:
+            tuple: (html, texto plano)
+        """
+        if self.exact is False:
+            return EmailService.render(
+                self.template_name, {**self.context, **self.recipient_context(recipient)}
+            )
+        if self.exact is None:
+            rendered = EmailService.render(
+                self.template_name, {**self.context, **self.recipient_context(recipient)}
+            )
+            self.exact = self._substitute(recipient) == rendered
+            if not self.exact:
+                logger.warning(
+                    f"El template {self.template_name} no admite renderizado masivo; "
+                    f"se renderiza por destinatario"
+                )
+            return rendered
+        return self._substitute(recipient)
+
 
 class EmailService:
     """Servicio centralizado para envío de emails."""
     
+    @staticmethod
+    def render(template_name, context):
+        """
+        Renderizar un template de email.
+
+        Returns:
+            tuple: (html, texto plano)
+        """
+        html_content = render_to_string(f'emails/{template_name}.html', context)
+        return html_content, strip_tags(html_content)
+
+    @staticmethod
+    def queue_mass_email(subject, template, recipients, from_email=None):
+        """
+        Encolar un email masivo en la bandeja de salida en vez de enviarlo.
+
+        Los envía ``manage.py send_outbox`` reutilizando la conexión SMTP.
+
+        Args:
+            subject: Asunto del email
+            template: MassEmailTemplate con el contenido
+            recipients: Iterable de tuplas (email destino, destinatario)
+            from_email: Email remitente (opcional)
+
+        Returns:
+            int: cantidad de emails encolados
+        """
+        # Importar aquí para evitar circular import
+        from apps.jobs.outbox import OutboxService
+
+        def rendered():
+            for to_email, recipient in recipients:
+                html_content, text_content = template.render(recipient)
+                yield {
+                    'to_email': to_email,
+                    'from_email': from_email,
+                    'subject': subject,
+                    'body': text_content,
+                    'html': html_content,
+                }
+
+        return OutboxService.enqueue_many(rendered())
+
     @staticmethod
     def send_email(subject, to_email, template_name, context, from_email=None):
         """
@@ -31,8 +174,7 @@ class EmailService:
             to_email = [to_email] if isinstance(to_email, str) else to_email
             
             # Renderizar templates
-            html_content = render_to_string(f'emails/{template_name}.html', context)
-            text_content = strip_tags(html_content)
+            html_content, text_content = EmailService.render(template_name, context)
             
             # Crear email
             email = EmailMultiAlternatives(
@@ -88,31 +230,66 @@ class EmailService:
             context=context
         )
     
+    @staticmethod
+    def send_event_reminders(event, days_before):
+        """
+        Encolar el recordatorio de ``event`` para cada ticket activo.
+
+        Returns:
+            int: cantidad de emails encolados
+        """
+        from apps.tickets.models import Ticket
+        tickets = Ticket.objects.filter(
+            ticket_type__event=event,
+            status='active'
+        ).order_by('id')
+        template = MassEmailTemplate(
+            'event_reminder',
+            {
+                'event': event,
+                'days_before': days_before,
+                'frontend_url': settings.FRONTEND_URL if hasattr(settings, 'FRONTEND_URL') else '#'
+            },
+            fields=REMINDER_FIELDS,
+            recipient_context=ticket_context,
+        )
+
+        return EmailService.queue_mass_email(
+            subject=f'Recordatorio: {event.title} en {days_before} días',
+            template=template,
+            recipients=((ticket.attendee_email, ticket) for ticket in tickets.iterator(chunk_size=2000))
+        )
+
     @staticmethod
     def send_event_cancelled(event):
-        """Enviar notificación de evento cancelado."""
+        """
+        Encolar la notificación de evento cancelado para cada ticket activo.
+
+        Returns:
+            int: cantidad de emails encolados
+        """
         # Obtener todos los tickets activos
         from apps.tickets.models import Ticket
         tickets = Ticket.objects.filter(
             ticket_type__event=event,
             status='active'
-        ).select_related('buyer')
-        
-        for ticket in tickets:
-            context = {
-                'ticket': ticket,
+        ).order_by('id')
+        template = MassEmailTemplate(
+            'event_cancelled',
+            {
                 'event': event,
-                'attendee_name': ticket.attendee_name,
                 'frontend_url': settings.FRONTEND_URL if hasattr(settings, 'FRONTEND_URL') else '#'
-            }
-            
-            EmailService.send_email(
-                subject=f'CANCELADO: {event.title}',
-                to_email=ticket.attendee_email,
-                template_name='event_cancelled',
-                context=context
-            )
-    
+            },
+            fields=CANCELLED_FIELDS,
+            recipient_context=ticket_context,
+        )
+
+        return EmailService.queue_mass_email(
+            subject=f'CANCELADO: {event.title}',
+            template=template,
+            recipients=((ticket.attendee_email, ticket) for ticket in tickets.iterator(chunk_size=2000))
+        )
+
     @staticmethod
     def send_check_in_confirmation(attendee):
         """Enviar confirmación de check-in."""
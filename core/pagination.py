@@ -0,0 +1,119 @@
+"""
+Paginación por cursor (keyset) opcional para colecciones grandes.
+
+Sin ``?cursor=`` se comporta como ``PageNumberPagination``. Con ``?cursor=``
+(vacío para la primera página) ordena por ``cursor_ordering`` de la vista,
+por ejemplo ``('-purchased_at', '-id')``, y pide la siguiente página con
+``WHERE (purchased_at, id) < (último)`` en lugar de ``OFFSET``: el costo de
+una página no depende de qué tan profunda sea. El ``COUNT(*)`` solo se
+calcula con ``?count=true``.
+
+El último campo de ``cursor_ordering`` debe ser único (``id``) y los campos
+no pueden ser nulos; ``?ordering=`` no aplica en modo cursor.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """Paginación por número de página, o por cursor con ``?cursor=``."""
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    default_cursor_ordering = ('-id',)
+    invalid_cursor_message = 'Cursor inválido'
+
+    def is_keyset(self, request):
+        """Si la petición pidió el modo cursor."""
+        return self.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.is_keyset(request)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, 'cursor_ordering', self.default_cursor_ordering))
+        self.count = None
+        if request.query_params.get(self.count_query_param) == 'true':
+            self.count = queryset.count()
+
+        queryset = queryset.order_by(*self.ordering)
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            queryset = queryset.filter(self.after(queryset.model, self.decode(token)))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        payload = OrderedDict()
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode(self.page[-1]))
+
+    def encode(self, obj):
+        """Cursor con los valores de ordenamiento de ``obj`` (instancia o fila de ``values()``)."""
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        raw = json.dumps(values, default=str).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode(self, token):
+        """Valores de un cursor, convertidos al tipo de cada campo."""
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def after(self, model, values):
+        """
+        Filas que van después del cursor en ``self.ordering``.
+
+        ``(a, b) < (x, y)`` se escribe ``a < x OR (a = x AND b < y)``, que
+        todos los motores resuelven con el índice de ``a``.
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            try:
+                value = model._meta.get_field(name).to_python(value)
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
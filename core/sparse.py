@@ -0,0 +1,267 @@
+"""
+Fieldsets dispersos: ``?fields=``, ``?omit=`` y ``?expand=``.
+
+- ``?fields=id,code,status`` devuelve solo esos campos.
+- ``?omit=qr_code,pdf_ticket`` devuelve todos menos esos.
+- ``?expand=ticket_type`` reemplaza el id de una relación por el objeto
+  (solo las relaciones de ``Meta.expandable_fields`` del serializer).
+
+Los nombres con punto se aplican al serializer anidado:
+``?expand=ticket_type&fields=id,ticket_type.name``. Los campos que no se
+piden se quitan del serializer antes de serializar, así que sus
+``SerializerMethodField`` y propiedades nunca se ejecutan. Solo aplica a
+peticiones de lectura (GET/HEAD); las escrituras usan todos los campos.
+
+En las vistas, ``SparseQuerysetMixin`` recorta ``select_related`` y
+``only()`` del queryset a lo que necesitan los campos pedidos. Para los
+campos que no son columnas (propiedades, ``SerializerMethodField``) el
+serializer declara en ``Meta.field_sources`` qué columnas usan; si algún
+campo pedido no se puede resolver, el queryset queda como estaba.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+from django.db.models.query import ModelIterable
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+EXPAND_PARAM = 'expand'
+
+
+def parse_selection(value):
+    """
+    Árbol de una lista de campos separados por comas.
+
+    ``'id,ticket_type.name,ticket_type.price'`` ->
+    ``{'id': {}, 'ticket_type': {'name': {}, 'price': {}}}``
+    """
+    tree = {}
+    for path in (value or '').split(','):
+        node = tree
+        for name in path.strip().split('.'):
+            if not name:
+                break
+            node = node.setdefault(name, {})
+    return tree
+
+
+def request_selection(request):
+    """(fields, omit, expand) de la query string, o None si no hay ninguno."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    params = request.query_params
+    if not any(param in params for param in (FIELDS_PARAM, OMIT_PARAM, EXPAND_PARAM)):
+        return None
+    return (
+        parse_selection(params.get(FIELDS_PARAM)),
+        parse_selection(params.get(OMIT_PARAM)),
+        parse_selection(params.get(EXPAND_PARAM)),
+    )
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer con selección de campos.
+
+    El serializer raíz lee la selección del request del contexto; los
+    anidados la reciben del padre.
+
+    Meta:
+        expandable_fields: ``{'nombre': (serializer, {kwargs})}``; el
+            serializer puede ser una ruta en texto para evitar imports
+            circulares. Sin ``source`` en kwargs, se usa ``nombre``.
+        field_sources: ``{'nombre': ('columna', 'relacion__columna')}`` para
+            los campos calculados (ver ``SparseQuerysetMixin``).
+    """
+
+    def __init__(self, *args, **kwargs):
+        selection = kwargs.pop('selection', None)
+        super().__init__(*args, **kwargs)
+        if selection is None:
+            selection = request_selection(self.context.get('request'))
+        if selection is not None:
+            self.apply_selection(*selection)
+
+    def apply_selection(self, fields, omit, expand):
+        """Quitar, omitir y expandir campos según los árboles de selección."""
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        for name in expand:
+            if name not in expandable:
+                continue
+            serializer_class, options = expandable[name]
+            if isinstance(serializer_class, str):
+                serializer_class = import_string(serializer_class)
+            options = dict(options)
+            if options.get('source') == name:
+                options.pop('source')
+            self.fields[name] = serializer_class(
+                read_only=True,
+                selection=(fields.get(name, {}), omit.get(name, {}), expand[name]),
+                **options
+            )
+
+        if fields:
+            allowed = set(fields) | set(expand)
+            for name in list(self.fields):
+                if name not in allowed:
+                    self.fields.pop(name)
+        for name, subtree in omit.items():
+            if not subtree:
+                self.fields.pop(name, None)
+
+        # Campos anidados declarados en el serializer (no expandidos)
+        for name, field in self.fields.items():
+            if name in expand and name in expandable:
+                continue
+            child = getattr(field, 'child', field)
+            nested = (fields.get(name, {}), omit.get(name, {}), expand.get(name, {}))
+            if isinstance(child, DynamicFieldsMixin) and any(nested):
+                child.apply_selection(*nested)
+
+
+def _model_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def _related_model(model, path):
+    """Modelo al final de una cadena de llaves foráneas, o None."""
+    for part in path.split('__'):
+        field = _model_field(model, part)
+        if field is None or not (field.many_to_one or field.one_to_one):
+            return None
+        model = field.related_model
+    return model
+
+
+def resolve_path(model, path, prefix='', annotations=()):
+    """
+    Columnas y relaciones para leer ``path`` desde ``model``.
+
+    ``'ticket_type__event__title'`` necesita las relaciones ``ticket_type`` y
+    ``ticket_type__event`` y las columnas de las llaves y de ``title``.
+
+    Returns:
+        tuple: (columnas, relaciones), o None si ``path`` no es una cadena
+        de llaves foráneas que termina en una columna o anotación
+    """
+    columns, relations = set(), set()
+    current, parts = model, path.split('__')
+    for index, part in enumerate(parts):
+        field = _model_field(current, part)
+        last = index == len(parts) - 1
+        if field is None:
+            # Anotación del queryset: no necesita columna
+            if index == 0 and part in annotations:
+                return columns, relations
+            return None
+        if not last:
+            if not field.is_relation or not field.one_to_one and not field.many_to_one:
+                return None
+            relation = prefix + '__'.join(parts[:index + 1])
+            relations.add(relation)
+            if field.concrete:
+                columns.add(relation)
+            current = field.related_model
+        elif not field.concrete:
+            return None
+    columns.add(prefix + path)
+    return columns, relations
+
+
+def serializer_requirements(serializer, model, prefix='', annotations=()):
+    """
+    Columnas y relaciones que usan los campos de ``serializer``.
+
+    Returns:
+        tuple: (columnas para ``only()``, relaciones para ``select_related``),
+        o None si algún campo no se puede resolver
+    """
+    serializer = getattr(serializer, 'child', serializer)
+    sources = getattr(getattr(serializer, 'Meta', None), 'field_sources', {})
+    columns, relations = {f'{prefix}{model._meta.pk.name}'}, set()
+
+    for name, field in serializer.fields.items():
+        if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+            # Relación inversa o muchos a muchos: no usa columnas propias
+            continue
+
+        if name in sources:
+            paths = sources[name]
+        elif field.source == '*' or isinstance(field, serializers.SerializerMethodField):
+            return None
+        else:
+            paths = ['__'.join(field.source_attrs)]
+
+        if isinstance(field, serializers.BaseSerializer) and name not in sources:
+            # Serializer anidado: la relación más los campos del anidado
+            resolved = resolve_path(model, paths[0], prefix)
+            related = _related_model(model, paths[0])
+            if resolved is None or related is None:
+                return None
+            nested = serializer_requirements(field, related, f'{prefix}{paths[0]}__')
+            if nested is None:
+                return None
+            columns.update(resolved[0], nested[0])
+            relations.update(resolved[1], nested[1], {prefix + paths[0]})
+            continue
+
+        for path in paths:
+            resolved = resolve_path(model, path, prefix, annotations)
+            if resolved is None:
+                return None
+            columns.update(resolved[0])
+            relations.update(resolved[1])
+    return columns, relations
+
+
+class SparseQuerysetMixin:
+    """
+    Recortar el queryset de las colecciones a los campos pedidos.
+
+    Aplica a los querysets que pasan por ``paginate_queryset`` o
+    ``get_serializer(queryset, many=True)``. Además de los campos del
+    serializer, carga los de ``cursor_ordering`` si la vista lo tiene. Los
+    validadores de ``ConditionalGetMixin`` se calculan con su propia consulta
+    sobre el queryset sin recortar.
+    """
+
+    def sparse_queryset(self, queryset):
+        if request_selection(self.request) is None or queryset._iterable_class is not ModelIterable:
+            return queryset
+
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        requirements = serializer_requirements(
+            serializer, queryset.model, annotations=set(queryset.query.annotations)
+        )
+        if requirements is None:
+            return queryset
+        columns, relations = requirements
+
+        # El cursor se arma con los campos de ordenamiento de la última fila
+        for path in getattr(self, 'cursor_ordering', ()):
+            resolved = resolve_path(queryset.model, path.lstrip('-'))
+            if resolved is None:
+                return queryset
+            columns.update(resolved[0])
+            relations.update(resolved[1])
+
+        queryset = queryset.select_related(None).only(*sorted(columns))
+        if relations:
+            # select_related() sin argumentos seguiría todas las llaves foráneas
+            queryset = queryset.select_related(*sorted(relations))
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        if isinstance(queryset, QuerySet):
+            queryset = self.sparse_queryset(queryset)
+        return super().paginate_queryset(queryset)
+
+    def get_serializer(self, *args, **kwargs):
+        if args and kwargs.get('many') and isinstance(args[0], QuerySet):
+            args = (self.sparse_queryset(args[0]),) + args[1:]
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,129 @@
+"""
+Respuestas JSON en streaming para los listados sin paginar.
+
+Acciones como ``my_tickets`` o ``by_event`` devuelven la colección completa:
+con ``Response(serializer.data)`` se arma la lista de diccionarios y después
+el JSON entero en memoria antes de enviar el primer byte.
+``streaming_response`` recorre el queryset con ``iterator()`` y envía el JSON
+por bloques de ``CHUNK_SIZE`` filas, así que la memoria no crece con el
+tamaño de la colección y el cliente empieza a recibir antes.
+
+Cada fila se codifica con orjson si está instalado y si no con ``json`` de
+la librería estándar; en ambos casos el JSON es el mismo que el de
+``JSONRenderer`` de DRF. Solo aplica cuando la negociación eligió JSON (el
+navegador de la API sigue usando ``Response``) y se desactiva con
+``STREAMING_JSON_ENABLED = False``.
+"""
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.compiled import CompiledData
+
+CHUNK_SIZE = 500
+CONTENT_TYPE = 'application/json'
+
+
+def _escape(content):
+    # Igual que JSONRenderer: separadores de línea de JavaScript escapados
+    return content.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+def _stdlib_encoder():
+    encoder = JSONEncoder(
+        ensure_ascii=False,
+        allow_nan=not api_settings.STRICT_JSON,
+        separators=(',', ':') if api_settings.COMPACT_JSON else (', ', ': '),
+    )
+    return lambda obj: _escape(encoder.encode(obj).encode())
+
+
+def json_encoder():
+    """
+    Función ``obj -> bytes`` con la misma salida que ``JSONRenderer``.
+
+    Usa orjson cuando está instalado y la configuración de DRF es la de
+    por defecto (JSON compacto); si no, ``json`` de la librería estándar.
+    """
+    if not api_settings.COMPACT_JSON:
+        return _stdlib_encoder()
+    try:
+        # Importar aquí: requiere orjson (opcional)
+        import orjson
+    except ImportError:
+        return _stdlib_encoder()
+
+    # Fechas, decimales y demás tipos con el mismo formato que DRF
+    default = JSONEncoder().default
+    option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    return lambda obj: _escape(orjson.dumps(obj, default=default, option=option))
+
+
+def serialized_rows(serializer):
+    """
+    Representación de cada elemento de ``serializer`` (``many=True``).
+
+    Acepta un ``ListSerializer`` o el ``CompiledData`` de
+    ``CompiledListMixin``; los querysets se recorren con ``iterator()``.
+    """
+    if isinstance(serializer, CompiledData):
+        to_representation = serializer.compiled.to_representation
+    else:
+        to_representation = serializer.child.to_representation
+    items = serializer.instance
+    if isinstance(items, QuerySet):
+        items = items.iterator(chunk_size=CHUNK_SIZE)
+    elif hasattr(items, 'all'):
+        items = items.all()
+    for item in items:
+        yield to_representation(item)
+
+
+def stream_json_list(rows, encode=None, chunk_size=None):
+    """Bytes de la lista JSON de ``rows``, por bloques de ``chunk_size`` filas."""
+    encode = encode or json_encoder()
+    chunk_size = chunk_size or CHUNK_SIZE
+    separator = b',' if api_settings.COMPACT_JSON else b', '
+    prefix = b'['
+    chunk = []
+    for row in rows:
+        chunk.append(encode(row))
+        if len(chunk) >= chunk_size:
+            yield prefix + separator.join(chunk)
+            prefix = separator
+            chunk = []
+    if chunk:
+        yield prefix + separator.join(chunk) + b']'
+    elif prefix == b'[':
+        yield b'[]'
+    else:
+        yield b']'
+
+
+def should_stream(request):
+    """Si la respuesta de ``request`` se puede enviar en streaming."""
+    if not getattr(settings, 'STREAMING_JSON_ENABLED', True):
+        return False
+    renderer = getattr(request, 'accepted_renderer', None)
+    if renderer is None or renderer.format != 'json':
+        return False
+    # Con ``Accept: application/json; indent=4`` se usa JSONRenderer
+    return 'indent' not in getattr(request, 'accepted_media_type', '')
+
+
+def streaming_response(request, serializer):
+    """
+    Respuesta con la lista de ``serializer`` (``many=True``).
+
+    Returns:
+        StreamingHttpResponse con el JSON por bloques, o ``Response`` si la
+        petición no pidió JSON o el streaming está desactivado
+    """
+    if not should_stream(request):
+        return Response(serializer.data)
+    return StreamingHttpResponse(
+        stream_json_list(serialized_rows(serializer)), content_type=CONTENT_TYPE
+    )
@@ -7,8 +7,14 @@ from django.core.files import File
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.utils import ImageReader
+import base64
+import hashlib
+import hmac
 import random
 import string
+import struct
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
 
 
 def generate_qr_code(data: str) -> File:
@@ -54,6 +60,211 @@ def generate_ticket_code(length: int = 12) -> str:
     return ''.join(random.choice(characters) for _ in range(length))
 
 
+# Base32 de Crockford: sin I, L, O ni U para evitar confusiones al digitar
+CODE_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+CODE_LENGTH = 12
+_CODE_BITS = CODE_LENGTH * 5
+_CODE_HALF_BITS = _CODE_BITS // 2
+_CODE_HALF_MASK = (1 << _CODE_HALF_BITS) - 1
+_CODE_ROUNDS = 4
+
+
+def _code_round(key: bytes, round_number: int, value: int) -> int:
+    digest = hashlib.blake2b(
+        value.to_bytes(4, 'big') + bytes([round_number]),
+        key=key[:64],
+        digest_size=4,
+    ).digest()
+    return int.from_bytes(digest, 'big') & _CODE_HALF_MASK
+
+
+def _permute_code_number(number: int, key: bytes) -> int:
+    """Permutación de Feistel sobre 60 bits: biyectiva, así que no hay colisiones."""
+    left, right = number >> _CODE_HALF_BITS, number & _CODE_HALF_MASK
+    for round_number in range(_CODE_ROUNDS):
+        left, right = right, left ^ _code_round(key, round_number, right)
+    return (left << _CODE_HALF_BITS) | right
+
+
+def ticket_code_check_char(body: str) -> str:
+    """
+    Calcula el carácter de control Luhn mod 32 de un código.
+
+    Detecta cualquier carácter mal digitado y casi todas las transposiciones
+    de caracteres vecinos.
+    """
+    base = len(CODE_ALPHABET)
+    total = 0
+    factor = 2
+    for char in reversed(body):
+        addend = factor * CODE_ALPHABET.index(char)
+        total += addend // base + addend % base
+        factor = 1 if factor == 2 else 2
+    return CODE_ALPHABET[(base - total % base) % base]
+
+
+def encode_ticket_code(number: int, key: bytes) -> str:
+    """
+    Convierte un número de secuencia en un código de ticket.
+
+    El número se permuta con ``key`` (para que los códigos no sean
+    consecutivos ni adivinables), se escribe en 12 caracteres base32 y se le
+    agrega un carácter de control. Números distintos dan códigos distintos.
+
+    Args:
+        number: Número de secuencia (menor a 2**60)
+        key: Clave de la permutación; no debe cambiar una vez emitidos tickets
+
+    Returns:
+        str: Código de 13 caracteres
+    """
+    if not 0 <= number < 1 << _CODE_BITS:
+        raise ValueError("Número de secuencia fuera de rango para un código de ticket.")
+
+    value = _permute_code_number(number, key)
+    chars = []
+    for _ in range(CODE_LENGTH):
+        chars.append(CODE_ALPHABET[value & 31])
+        value >>= 5
+    body = ''.join(reversed(chars))
+    return body + ticket_code_check_char(body)
+
+
+def normalize_ticket_code(code: str) -> str:
+    """Normaliza un código digitado: mayúsculas, sin espacios ni guiones."""
+    return code.strip().upper().replace('-', '').replace(' ', '')
+
+
+def is_valid_ticket_code(code: str) -> bool:
+    """
+    Verifica localmente el formato y el carácter de control de un código.
+
+    No consulta la base de datos: sirve para que un escáner rechace un
+    código mal digitado antes de enviarlo. Los códigos antiguos de 12
+    caracteres (sin carácter de control) solo se validan por formato.
+
+    Args:
+        code: Código a verificar
+
+    Returns:
+        bool: True si el código puede existir
+    """
+    code = normalize_ticket_code(code)
+
+    if len(code) == CODE_LENGTH:
+        legacy = string.ascii_uppercase + string.digits
+        return all(char in legacy for char in code)
+
+    if len(code) != CODE_LENGTH + 1 or any(char not in CODE_ALPHABET for char in code):
+        return False
+
+    return ticket_code_check_char(code[:-1]) == code[-1]
+
+
+TICKET_TOKEN_VERSION = 1
+# versión, id de clave, id de ticket (48 bits), evento, tipo de ticket, válido desde, válido hasta
+_TOKEN_FORMAT = '>BBHIIIII'
+_TOKEN_BODY_SIZE = struct.calcsize(_TOKEN_FORMAT)
+_TOKEN_MAC_SIZE = 11
+
+
+class TicketTokenError(Exception):
+    """El token del QR no es auténtico o no está vigente."""
+
+
+def _ticket_token_mac(key: str, body: bytes) -> bytes:
+    return hmac.new(key.encode(), body, hashlib.sha256).digest()[:_TOKEN_MAC_SIZE]
+
+
+def sign_ticket_token(ticket_id, event_id, ticket_type_id, not_before, expires_at, key_id=None):
+    """
+    Genera el token firmado que va en el QR de un ticket.
+
+    El token son 35 bytes (24 de datos y 11 de HMAC-SHA256) en base32, es
+    decir 56 caracteres del modo alfanumérico del QR. Un escáner con las
+    claves puede verificarlo sin consultar el servidor.
+
+    Args:
+        ticket_id: Id del ticket
+        event_id: Id del evento
+        ticket_type_id: Id del tipo de ticket
+        not_before: Inicio de la validez (datetime)
+        expires_at: Fin de la validez (datetime)
+        key_id: Clave de ``TICKET_SIGNING_KEYS`` (default: ``TICKET_SIGNING_KEY_ID``)
+
+    Returns:
+        str: Token firmado
+    """
+    key_id = settings.TICKET_SIGNING_KEY_ID if key_id is None else key_id
+    key = settings.TICKET_SIGNING_KEYS[key_id]
+
+    body = struct.pack(
+        _TOKEN_FORMAT,
+        TICKET_TOKEN_VERSION,
+        key_id,
+        ticket_id >> 32,
+        ticket_id & 0xFFFFFFFF,
+        event_id,
+        ticket_type_id,
+        int(not_before.timestamp()),
+        int(expires_at.timestamp()),
+    )
+    return base64.b32encode(body + _ticket_token_mac(key, body)).decode()
+
+
+def verify_ticket_token(token: str, now=None) -> dict:
+    """
+    Verifica la firma y la vigencia de un token de ticket.
+
+    Acepta cualquier clave de ``TICKET_SIGNING_KEYS``, así que los tickets
+    firmados con una clave anterior siguen siendo válidos durante una rotación.
+
+    Args:
+        token: Token leído del QR
+        now: Momento de la verificación (default: ahora)
+
+    Returns:
+        dict: ticket_id, event_id, ticket_type_id, key_id, not_before, expires_at
+
+    Raises:
+        TicketTokenError: Si el token está malformado, la firma no coincide o
+            no está vigente
+    """
+    try:
+        raw = base64.b32decode(token.strip().upper())
+    except (ValueError, TypeError):
+        raise TicketTokenError("Token malformado.")
+
+    if len(raw) != _TOKEN_BODY_SIZE + _TOKEN_MAC_SIZE:
+        raise TicketTokenError("Token malformado.")
+
+    body, mac = raw[:_TOKEN_BODY_SIZE], raw[_TOKEN_BODY_SIZE:]
+    (version, key_id, ticket_high, ticket_low, event_id,
+     ticket_type_id, not_before, expires_at) = struct.unpack(_TOKEN_FORMAT, body)
+
+    if version != TICKET_TOKEN_VERSION:
+        raise TicketTokenError("Versión de token no soportada.")
+
+    key = settings.TICKET_SIGNING_KEYS.get(key_id)
+    if key is None or not hmac.compare_digest(mac, _ticket_token_mac(key, body)):
+        raise TicketTokenError("Firma inválida.")
+
+    timestamp = (now or datetime.now(dt_timezone.utc)).timestamp()
+    if timestamp < not_before:
+        raise TicketTokenError("El ticket todavía no es válido.")
+    if timestamp > expires_at:
+        raise TicketTokenError("El ticket expiró.")
+
+    return {
+        'ticket_id': (ticket_high << 32) | ticket_low,
+        'event_id': event_id,
+        'ticket_type_id': ticket_type_id,
+        'key_id': key_id,
+        'not_before': datetime.fromtimestamp(not_before, dt_timezone.utc),
+        'expires_at': datetime.fromtimestamp(expires_at, dt_timezone.utc),
+    }
+
+
 def generate_ticket_pdf(ticket):
     """
     Genera un PDF para un ticket.
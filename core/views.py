@@ -12,15 +12,11 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Sum, Count, Avg, Q
 from django.utils import timezone
-from apps.events.models import Event
-from apps.tickets.models import Ticket, TicketType
+from apps.events.models import Event, EventStatistics
+from apps.events.services import SalesRollupService
 from apps.attendees.models import Attendee
 from apps.sponsors.models import Sponsorship
 
-from datetime import timedelta, datetime
-from django.utils import timezone
-
-
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -50,82 +46,93 @@ def health_check(request):
     
     return Response(health_status, status=status.HTTP_200_OK)
 
+TREND_GRANULARITIES = ('day', 'hour')
+# Máximo de días por granularidad para no devolver series enormes
+TREND_MAX_DAYS = {'day': 366, 'hour': 31}
+
+
+def _dashboard_events(user):
+    """Eventos que el usuario puede ver en el dashboard."""
+    if user.is_staff:
+        return Event.objects.all()
+    return Event.objects.filter(organizer=user)
+
+
+def _trend_params(query_params, default_days=7):
+    """
+    Leer ``days`` y ``granularity`` de la petición.
+
+    Returns:
+        tuple: (days, granularity, error)
+    """
+    granularity = query_params.get('granularity', 'day')
+    if granularity not in TREND_GRANULARITIES:
+        return None, None, 'granularity debe ser "day" o "hour"'
+
+    days = query_params.get('days', str(default_days))
+    if not days.isdigit() or not 1 <= int(days) <= TREND_MAX_DAYS[granularity]:
+        return None, None, (
+            f'days debe ser un número entre 1 y {TREND_MAX_DAYS[granularity]}'
+        )
+    return int(days), granularity, None
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_stats(request):
     """
     Dashboard con estadísticas generales del sistema.
+
+    Los totales de tickets salen de ``EventStatistics`` y la tendencia de
+    ventas de ``SalesRollup``, así que el costo no depende de la cantidad de
+    tickets. Acepta ``days`` y ``granularity`` igual que ``sales_trend``.
     """
-    user = request.user
-    
+    days, granularity, error = _trend_params(request.query_params)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    events = _dashboard_events(request.user)
+    now = timezone.now()
+
     # Estadísticas de eventos
-    if user.is_staff:
-        events = Event.objects.all()
-    else:
-        events = Event.objects.filter(organizer=user)
-    
-    total_events = events.count()
-    published_events = events.filter(status='published').count()
-    upcoming_events = events.filter(
-        status='published',
-        start_date__gte=timezone.now()
-    ).count()
-    
+    event_totals = events.aggregate(
+        total=Count('id'),
+        published=Count('id', filter=Q(status='published')),
+        upcoming=Count('id', filter=Q(status='published', start_date__gte=now)),
+    )
+
     # Estadísticas de tickets
-    tickets = Ticket.objects.filter(
-        ticket_type__event__in=events
+    ticket_totals = EventStatistics.objects.filter(event__in=events).aggregate(
+        sold=Sum('tickets_sold'),
+        revenue=Sum('revenue'),
     )
-    total_tickets_sold = tickets.filter(status='active').count()
-    total_revenue = tickets.filter(status='active').aggregate(
-        total=Sum('final_price')
-    )['total'] or 0
-    
+
     # Estadísticas de asistencia
-    total_attendees = Attendee.objects.filter(event__in=events).count()
-    checked_in = Attendee.objects.filter(
-        event__in=events,
-        status='checked_in'
-    ).count()
-    
+    attendee_totals = Attendee.objects.filter(event__in=events).aggregate(
+        total=Count('id'),
+        checked_in=Count('id', filter=Q(status='checked_in')),
+    )
+    total_attendees = attendee_totals['total']
+    checked_in = attendee_totals['checked_in']
+
     # Estadísticas de patrocinios
-    total_sponsorships = Sponsorship.objects.filter(
+    sponsorship_totals = Sponsorship.objects.filter(
         event__in=events,
         is_active=True
-    ).count()
-    sponsorship_revenue = Sponsorship.objects.filter(
-        event__in=events,
-        is_active=True
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
+    ).aggregate(total=Count('id'), revenue=Sum('amount'))
+
     # Eventos más populares
     popular_events = events.filter(
         status='published'
-    ).annotate(
-        tickets_count=Count('ticket_types__tickets')
-    ).order_by('-tickets_count')[:5]
-    
-    # Tendencias de ventas (últimos 7 días)
-    last_7_days = timezone.now() - timedelta(days=7)
-    daily_sales = []
-    for i in range(7):
-        date = last_7_days + timedelta(days=i)
-        sales = tickets.filter(
-            purchased_at__date=date.date()
-        ).count()
-        daily_sales.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'sales': sales
-        })
-    
+    ).order_by('-statistics__tickets_sold').values(
+        'id', 'title', 'statistics__tickets_sold'
+    )[:5]
+
     return Response({
-        'events': {
-            'total': total_events,
-            'published': published_events,
-            'upcoming': upcoming_events
-        },
+        'events': event_totals,
         'tickets': {
-            'sold': total_tickets_sold,
-            'revenue': float(total_revenue)
+            'sold': ticket_totals['sold'] or 0,
+            'revenue': float(ticket_totals['revenue'] or 0)
         },
         'attendees': {
             'total': total_attendees,
@@ -133,16 +140,48 @@ def dashboard_stats(request):
             'check_in_rate': (checked_in / total_attendees * 100) if total_attendees > 0 else 0
         },
         'sponsorships': {
-            'total': total_sponsorships,
-            'revenue': float(sponsorship_revenue)
+            'total': sponsorship_totals['total'],
+            'revenue': float(sponsorship_totals['revenue'] or 0)
         },
         'popular_events': [
             {
-                'id': event.id,
-                'title': event.title,
-                'tickets_sold': event.tickets_count
+                'id': event['id'],
+                'title': event['title'],
+                'tickets_sold': event['statistics__tickets_sold'] or 0
             }
             for event in popular_events
         ],
-        'sales_trend': daily_sales
-    })
\ No newline at end of file
+        'sales_trend': SalesRollupService.trend(events, days, granularity)
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sales_trend(request):
+    """
+    Tendencia de ventas de los eventos del usuario.
+
+    Query params:
+        days: días hacia atrás, incluido hoy (default 7)
+        granularity: 'day' (default) o 'hour'
+        event: limitar a un evento
+    """
+    days, granularity, error = _trend_params(request.query_params)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    events = _dashboard_events(request.user)
+    event_id = request.query_params.get('event')
+    if event_id:
+        if not event_id.isdigit():
+            return Response(
+                {'error': 'event debe ser un ID numérico'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        events = events.filter(pk=event_id)
+
+    return Response({
+        'days': days,
+        'granularity': granularity,
+        'sales_trend': SalesRollupService.trend(events, days, granularity),
+    })
@@ -0,0 +1,69 @@
+"""
+Utilidades para los scripts de rendimiento.
+
+Cada script ``scripts/bench_<nombre>.py`` se ejecuta con::
+
+    python -m scripts.bench_<nombre>
+
+y trabaja sobre una base de datos de pruebas que se crea y destruye en cada
+ejecución, igual que ``manage.py test``.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    CaptureQueriesContext, setup_test_environment, teardown_test_environment,
+)
+
+
+@contextmanager
+def test_database():
+    """Crear una base de datos de pruebas y destruirla al terminar."""
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def percentile(values, pct):
+    """Percentil ``pct`` (0-100) por el método del rango más cercano."""
+    ordered = sorted(values)
+    index = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[index]
+
+
+def timed(func, *args, **kwargs):
+    """
+    Ejecutar ``func`` midiendo tiempo y consultas.
+
+    Returns:
+        tuple: (resultado, segundos, cantidad de consultas)
+    """
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+    return result, elapsed, len(ctx.captured_queries)
+
+
+def report(title, durations, queries=None):
+    """Imprimir p50/p99/media de una lista de duraciones en segundos."""
+    ms = [d * 1000 for d in durations]
+    print(f"\n{title}")
+    print(f"  muestras: {len(ms)}")
+    print(f"  p50: {percentile(ms, 50):.2f} ms")
+    print(f"  p99: {percentile(ms, 99):.2f} ms")
+    print(f"  media: {statistics.mean(ms):.2f} ms")
+    if queries:
+        print(f"  consultas: {statistics.mean(queries):.1f} por operación")
@@ -0,0 +1,75 @@
+"""
+Latencia del check-in de un solo escaneo.
+
+    python -m scripts.bench_check_in [cantidad]
+"""
+import sys
+from datetime import timedelta
+
+from scripts.bench import report, test_database, timed
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.events.models import Category, Event
+from apps.tickets.models import Ticket, TicketType
+
+
+def setup(count):
+    organizer = User.objects.create_user(username='bench', password='bench')
+    event = Event.objects.create(
+        title="Benchmark",
+        description="Benchmark de check-in",
+        category=Category.objects.create(name="Benchmark"),
+        organizer=organizer,
+        start_date=timezone.now() + timedelta(hours=1),
+        end_date=timezone.now() + timedelta(hours=4),
+        capacity=count,
+        status='published',
+    )
+    ticket_type = TicketType.objects.create(
+        event=event, name="General", price=0, quantity=count
+    )
+    # Un comprador por ticket: un usuario solo puede tener un asistente por evento
+    buyers = User.objects.bulk_create([
+        User(username=f'buyer{i}') for i in range(count)
+    ])
+    if buyers[0].pk is None:
+        buyers = list(User.objects.filter(username__startswith='buyer').order_by('id'))
+
+    codes = Ticket.generate_codes(count)
+    Ticket.objects.bulk_create([
+        Ticket(
+            ticket_type=ticket_type,
+            buyer=buyer,
+            code=code,
+            attendee_name=f"Asistente {i}",
+            attendee_email=f"asistente{i}@example.com",
+            purchase_price=0,
+        )
+        for i, (buyer, code) in enumerate(zip(buyers, codes))
+    ])
+    return organizer, codes
+
+
+def main(count=500):
+    with test_database():
+        organizer, codes = setup(count)
+        client = APIClient()
+        client.force_authenticate(user=organizer)
+
+        durations, queries = [], []
+        for code in codes:
+            response, elapsed, num_queries = timed(
+                client.post, '/api/attendees/check_in/', {'ticket_code': code}
+            )
+            assert response.status_code == 200, response.data
+            durations.append(elapsed)
+            queries.append(num_queries)
+
+        report(f"Check-in de un escaneo ({count} tickets)", durations, queries)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
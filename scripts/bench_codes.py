@@ -0,0 +1,31 @@
+"""
+Asignación de códigos de ticket.
+
+    python -m scripts.bench_codes [cantidad] [repeticiones]
+
+Asigna ``cantidad`` códigos (por defecto 900) con ``CodeAllocator`` después
+de reservar el primer bloque, y reporta el tiempo y las consultas.
+"""
+import sys
+
+from scripts.bench import report, test_database, timed
+
+from apps.tickets.codes import CodeAllocator
+
+
+def main(count=900, repeat=20):
+    with test_database():
+        durations, queries = [], []
+        for _ in range(repeat):
+            allocator = CodeAllocator()
+            allocator.allocate(1)
+            codes, elapsed, num_queries = timed(allocator.allocate, count)
+            assert len(set(codes)) == count
+            durations.append(elapsed)
+            queries.append(num_queries)
+        report(f"CodeAllocator.allocate({count})", durations, queries)
+        print(f"  códigos por segundo: {count / min(durations):.0f}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,85 @@
+"""
+Ancho de banda y CPU ahorrados por el GET condicional en ``my_tickets``.
+
+    python -m scripts.bench_conditional [tickets] [repeticiones]
+
+Compara respuestas completas (200) contra revalidaciones con
+``If-None-Match`` (304) para un comprador con ``tickets`` tickets.
+"""
+import sys
+import time
+from datetime import timedelta
+
+from scripts.bench import report, test_database, timed
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.events.models import Category, Event
+from apps.tickets.models import Ticket, TicketType
+
+URL = '/api/tickets/my_tickets/'
+
+
+def setup(count):
+    buyer = User.objects.create_user(username='bench', password='bench')
+    event = Event.objects.create(
+        title="Benchmark",
+        description="Benchmark de GET condicional",
+        category=Category.objects.create(name="Benchmark"),
+        organizer=buyer,
+        start_date=timezone.now() + timedelta(days=30),
+        end_date=timezone.now() + timedelta(days=30, hours=3),
+        capacity=count,
+        status='published',
+    )
+    ticket_type = TicketType.objects.create(
+        event=event, name="General", price=0, quantity=count
+    )
+    Ticket.objects.bulk_create([
+        Ticket(
+            ticket_type=ticket_type,
+            buyer=buyer,
+            code=code,
+            attendee_name=f"Asistente {i}",
+            attendee_email=f"asistente{i}@example.com",
+            purchase_price=0,
+        )
+        for i, code in enumerate(Ticket.generate_codes(count))
+    ])
+    return buyer
+
+
+def measure(client, repeat, headers):
+    durations, queries, sizes = [], [], []
+    cpu_start = time.process_time()
+    for _ in range(repeat):
+        response, elapsed, num_queries = timed(client.get, URL, **headers)
+        durations.append(elapsed)
+        queries.append(num_queries)
+        sizes.append(len(response.content))
+    return response, durations, queries, sizes, time.process_time() - cpu_start
+
+
+def main(count=200, repeat=50):
+    with test_database():
+        client = APIClient()
+        client.force_authenticate(user=setup(count))
+
+        full, durations, queries, sizes, full_cpu = measure(client, repeat, {})
+        assert full.status_code == 200, full.status_code
+        report(f"my_tickets completo ({count} tickets)", durations, queries)
+
+        headers = {'HTTP_IF_NONE_MATCH': full['ETag']}
+        revalidated, durations, queries, sizes_304, cpu = measure(client, repeat, headers)
+        assert revalidated.status_code == 304, revalidated.status_code
+        report(f"my_tickets con If-None-Match ({count} tickets)", durations, queries)
+
+        print(f"\nBytes por respuesta: {sizes[0]} (200) vs {sizes_304[0]} (304)")
+        print(f"Bytes ahorrados en {repeat} revalidaciones: {sum(sizes) - sum(sizes_304)}")
+        print(f"CPU: {full_cpu * 1000:.0f} ms (200) vs {cpu * 1000:.0f} ms (304)")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
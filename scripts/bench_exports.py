@@ -0,0 +1,116 @@
+"""
+Exportaciones grandes: tiempo, consultas y pico de memoria.
+
+    python -m scripts.bench_exports [asistentes] [repeticiones]
+
+Crea un evento con ``asistentes`` asistentes (por defecto 50000), con
+check-ins en una parte de ellos, y descarga el CSV de
+``/api/attendees/export/`` sin comprimir y con ``?gzip=true`` y el reporte
+Excel de ``/api/events/<id>/export_excel/`` (sin el umbral del trabajo en
+segundo plano).
+"""
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+
+from scripts.bench import report, test_database
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.attendees.models import Attendee, CheckInLog
+from apps.events.models import Category, Event
+from apps.tickets.models import Ticket, TicketType
+
+BATCH = 5000
+
+
+def setup(count):
+    organizer = User.objects.create_user(username='bench', password='bench', is_staff=True)
+    event = Event.objects.create(
+        title="Benchmark",
+        description="Benchmark de exportación",
+        category=Category.objects.create(name="Benchmark"),
+        organizer=organizer,
+        start_date=timezone.now() + timedelta(days=30),
+        end_date=timezone.now() + timedelta(days=30, hours=3),
+        capacity=count,
+        status='published',
+    )
+    ticket_type = TicketType.objects.create(event=event, name="General", price=10, quantity=count)
+    users = User.objects.bulk_create([
+        User(username=f'asistente{i}') for i in range(count)
+    ], batch_size=BATCH)
+    # MySQL no devuelve los ids de un INSERT masivo
+    if users[0].pk is None:
+        users = list(User.objects.filter(username__startswith='asistente').order_by('id'))
+    codes = Ticket.generate_codes(count)
+    Ticket.objects.bulk_create([
+        Ticket(
+            ticket_type=ticket_type, buyer=users[i], code=code,
+            attendee_name="Asistente", attendee_email="asistente@example.com", purchase_price=10,
+        )
+        for i, code in enumerate(codes)
+    ], batch_size=BATCH)
+    tickets = Ticket.objects.in_bulk(codes, field_name='code')
+    Attendee.objects.bulk_create([
+        Attendee(
+            user=users[i], ticket=tickets[code], event=event,
+            full_name=f"Asistente {i}", email="asistente@example.com",
+        )
+        for i, code in enumerate(codes)
+    ], batch_size=BATCH)
+    CheckInLog.objects.bulk_create([
+        CheckInLog(attendee_id=pk)
+        for pk in Attendee.objects.values_list('pk', flat=True)[:count // 5]
+    ], batch_size=BATCH)
+    return organizer, event
+
+
+def download(client, url, params):
+    """(segundos, consultas, pico en bytes, tamaño en bytes) de descargar ``url``."""
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        response = client.get(url, params)
+        assert response.status_code == 200, response.status_code
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, len(ctx.captured_queries), peak, size
+
+
+def main(count=50000, repeat=3):
+    with test_database():
+        organizer, event = setup(count)
+        client = APIClient()
+        client.force_authenticate(user=organizer)
+        # Primera petición fuera de la medición (imports y URLconf)
+        client.get('/api/attendees/export/', {'event_id': 0})
+
+        cases = (
+            ('CSV', '/api/attendees/export/', {'event_id': event.pk}),
+            ('CSV gzip', '/api/attendees/export/', {'event_id': event.pk, 'gzip': 'true'}),
+            ('Excel', f'/api/events/{event.pk}/export_excel/', {}),
+        )
+        for label, url, params in cases:
+            durations, queries, peaks = [], [], []
+            for _ in range(repeat):
+                with override_settings(EXCEL_EXPORT_ASYNC_THRESHOLD=count):
+                    elapsed, num_queries, peak, size = download(client, url, params)
+                durations.append(elapsed)
+                queries.append(num_queries)
+                peaks.append(peak)
+            report(f"{label} ({count} asistentes)", durations, queries)
+            print(f"  tamaño: {size / 2 ** 20:.1f} MiB")
+            print(f"  pico de memoria: {max(peaks) / 2 ** 20:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,79 @@
+"""
+Renderizado de emails masivos: por destinatario contra una sola vez.
+
+    python -m scripts.bench_mass_email [destinatarios] [repeticiones]
+
+Renderiza la notificación de cancelación y el recordatorio para
+``destinatarios`` tickets (por defecto 10000) con ``render_to_string`` +
+``strip_tags`` por ticket, como antes, y con ``MassEmailTemplate``. Solo
+mide el renderizado: los objetos no se guardan en la base de datos.
+"""
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from scripts.bench import report
+
+from django.utils import timezone
+
+from apps.events.models import Category, Event, Venue
+from apps.tickets.models import Ticket, TicketType
+from core.emails import (
+    CANCELLED_FIELDS, REMINDER_FIELDS, EmailService, MassEmailTemplate, ticket_context,
+)
+
+
+def setup(count):
+    event = Event(
+        pk=1,
+        title="Benchmark",
+        category=Category(name="Benchmark"),
+        venue=Venue(name="Teatro", address="Calle 1", city="Bogotá", amenities="Parqueadero"),
+        start_date=timezone.now() + timedelta(days=1),
+        end_date=timezone.now() + timedelta(days=1, hours=3),
+    )
+    ticket_type = TicketType(event=event, name="General", price=Decimal('50000'))
+    tickets = [
+        Ticket(
+            ticket_type=ticket_type, code=f'EVT-{i:08d}',
+            attendee_name=f"Asistente {i}", attendee_email=f"asistente{i}@example.com",
+            purchase_price=Decimal('50000'), discount_applied=Decimal(i % 7 * 1000),
+        )
+        for i in range(count)
+    ]
+    return event, tickets
+
+
+CASES = {
+    'event_cancelled': ({'frontend_url': '#'}, CANCELLED_FIELDS),
+    'event_reminder': ({'days_before': 1, 'frontend_url': '#'}, REMINDER_FIELDS),
+}
+
+
+def main(count=10000, repeat=3):
+    event, tickets = setup(count)
+    for template_name, (context, fields) in CASES.items():
+        context = {**context, 'event': event}
+        per_recipient, mass = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for ticket in tickets:
+                EmailService.render(template_name, {**context, **ticket_context(ticket)})
+            per_recipient.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            template = MassEmailTemplate(template_name, context, fields, ticket_context)
+            for ticket in tickets:
+                template.render(ticket)
+            mass.append(time.perf_counter() - start)
+            assert template.exact, template_name
+
+        report(f"{template_name}: render_to_string por destinatario ({count})", per_recipient)
+        report(f"{template_name}: MassEmailTemplate ({count})", mass)
+        saved = min(per_recipient) - min(mass)
+        print(f"  ahorro: {saved:.2f} s por {count} destinatarios ({min(per_recipient) / min(mass):.0f}x)")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,137 @@
+"""
+Cancelación de un evento grande: petición, encolado y envío de emails.
+
+    python -m scripts.bench_outbox [tickets] [latencia_ms]
+
+Crea un evento con ``tickets`` tickets activos (por defecto 2000) y compara
+el envío anterior (``send_email`` por ticket, una conexión por email) con la
+bandeja de salida: la petición de cancelación, el trabajo que encola los
+emails y ``OutboxSender`` vaciando la cola. El backend de email simula
+``latencia_ms`` milisegundos (por defecto 20) al abrir cada conexión SMTP.
+"""
+import sys
+import time
+from datetime import timedelta
+
+from scripts.bench import test_database, timed
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.events.models import Category, Event
+from apps.jobs.models import OutboundEmail
+from apps.jobs.outbox import OutboxSender
+from apps.jobs.services import JobService
+from apps.tickets.models import Ticket, TicketType
+from core.emails import EmailService
+
+BATCH = 5000
+HANDSHAKE = 0.02
+
+
+class SlowConnectBackend(EmailBackend):
+    """Backend en memoria que tarda ``HANDSHAKE`` segundos en conectar."""
+
+    opened = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connected = False
+
+    def open(self):
+        if self.connected:
+            return False
+        time.sleep(HANDSHAKE)
+        SlowConnectBackend.opened += 1
+        self.connected = True
+        return True
+
+    def close(self):
+        self.connected = False
+
+    def send_messages(self, messages):
+        # Igual que el backend SMTP: sin conexión abierta, una por llamada
+        new_connection = self.open()
+        try:
+            return super().send_messages(messages)
+        finally:
+            if new_connection:
+                self.close()
+
+
+def setup(count):
+    organizer = User.objects.create_user(username='bench', password='bench')
+    event = Event.objects.create(
+        title="Benchmark",
+        description="Benchmark de cancelación",
+        category=Category.objects.create(name="Benchmark"),
+        organizer=organizer,
+        start_date=timezone.now() + timedelta(days=30),
+        end_date=timezone.now() + timedelta(days=30, hours=3),
+        capacity=count,
+        status='published',
+    )
+    ticket_type = TicketType.objects.create(event=event, name="General", price=10, quantity=count)
+    Ticket.objects.bulk_create([
+        Ticket(
+            ticket_type=ticket_type, buyer=organizer, code=code,
+            attendee_name=f"Asistente {i}", attendee_email=f"asistente{i}@example.com",
+            purchase_price=10,
+        )
+        for i, code in enumerate(Ticket.generate_codes(count))
+    ], batch_size=BATCH)
+    return organizer, event
+
+
+def send_each(event):
+    """Envío anterior: ``send_email`` por ticket dentro de la petición."""
+    frontend_url = getattr(settings, 'FRONTEND_URL', '#')
+    for ticket in Ticket.objects.filter(ticket_type__event=event, status='active'):
+        EmailService.send_email(
+            subject=f'CANCELADO: {event.title}',
+            to_email=ticket.attendee_email,
+            template_name='event_cancelled',
+            context={
+                'ticket': ticket, 'event': event,
+                'attendee_name': ticket.attendee_name, 'frontend_url': frontend_url,
+            },
+        )
+
+
+def main(count=2000, latency_ms=20):
+    global HANDSHAKE
+    HANDSHAKE = latency_ms / 1000
+    backend = f'{__name__}.SlowConnectBackend'
+    with test_database(), override_settings(EMAIL_BACKEND=backend, EMAIL_OUTBOX_RATE_LIMIT=0):
+        organizer, event = setup(count)
+
+        _, elapsed, _ = timed(send_each, event)
+        print(f"\nEnvío por ticket ({count} tickets, {latency_ms} ms por conexión)")
+        print(f"  tiempo: {elapsed:.2f} s")
+        print(f"  conexiones: {SlowConnectBackend.opened}")
+
+        SlowConnectBackend.opened = 0
+        client = APIClient()
+        client.force_authenticate(user=organizer)
+        response, request_time, request_queries = timed(
+            client.post, f'/api/events/{event.pk}/cancel/'
+        )
+        assert response.status_code == 200, response.status_code
+        _, enqueue_time, enqueue_queries = timed(JobService.run_pending, 'bench')
+        queued = OutboundEmail.objects.count()
+        processed, drain_time, _ = timed(OutboxSender('bench').run_pending)
+        assert processed == queued == count, (processed, queued)
+
+        print(f"\nBandeja de salida ({count} tickets, {latency_ms} ms por conexión)")
+        print(f"  petición de cancelación: {request_time * 1000:.1f} ms, {request_queries} consultas")
+        print(f"  trabajo de encolado: {enqueue_time:.2f} s, {enqueue_queries} consultas")
+        print(f"  envío: {drain_time:.2f} s")
+        print(f"  conexiones: {SlowConnectBackend.opened}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,106 @@
+"""
+Páginas profundas: paginación por número (COUNT + OFFSET) contra cursor.
+
+    python -m scripts.bench_pagination [tickets] [repeticiones]
+
+Crea ``tickets`` tickets (por defecto 1.000.000) y pide la página al 1%,
+10%, 50% y 90% de la colección con ``?page=N`` y con ``?cursor=``.
+"""
+import sys
+from datetime import timedelta
+
+from scripts.bench import report, test_database, timed
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.events.models import Category, Event
+from apps.tickets.models import Ticket, TicketType
+from core.pagination import KeysetPagination
+
+PAGE_SIZE = 20
+BATCH = 10000
+DEPTHS = (0.01, 0.1, 0.5, 0.9)
+
+
+def setup(count):
+    staff = User.objects.create_user(username='bench', password='bench', is_staff=True)
+    event = Event.objects.create(
+        title="Benchmark",
+        description="Benchmark de paginación",
+        category=Category.objects.create(name="Benchmark"),
+        organizer=staff,
+        start_date=timezone.now() + timedelta(days=30),
+        end_date=timezone.now() + timedelta(days=30, hours=3),
+        capacity=count,
+        status='published',
+    )
+    ticket_type = TicketType.objects.create(
+        event=event, name="General", price=0, quantity=count
+    )
+
+    start = timezone.now() - timedelta(days=365)
+    for offset in range(0, count, BATCH):
+        size = min(BATCH, count - offset)
+        Ticket.objects.bulk_create([
+            Ticket(
+                ticket_type=ticket_type,
+                buyer=staff,
+                code=code,
+                attendee_name="Asistente",
+                attendee_email="asistente@example.com",
+                purchase_price=0,
+                # Un segundo cada dos tickets: hay empates que desempata el id
+                purchased_at=start + timedelta(seconds=(offset + i) // 2),
+            )
+            for i, code in enumerate(Ticket.generate_codes(size))
+        ])
+    return staff
+
+
+def cursor_at(position):
+    """Cursor que apunta justo antes de la fila ``position`` (0 = primera)."""
+    if position == 0:
+        return ''
+    paginator = KeysetPagination()
+    paginator.ordering = ('-purchased_at', '-id')
+    row = Ticket.objects.order_by(*paginator.ordering)[position - 1]
+    return paginator.encode(row)
+
+
+def main(count=1000000, repeat=5):
+    with test_database():
+        client = APIClient()
+        client.force_authenticate(user=setup(count))
+
+        for depth in DEPTHS:
+            page = max(int(count * depth) // PAGE_SIZE, 1)
+            position = (page - 1) * PAGE_SIZE
+
+            durations, queries = [], []
+            for _ in range(repeat):
+                response, elapsed, num_queries = timed(
+                    client.get, '/api/tickets/', {'page': page, 'page_size': PAGE_SIZE}
+                )
+                assert response.status_code == 200, response.status_code
+                durations.append(elapsed)
+                queries.append(num_queries)
+            report(f"?page={page} ({depth:.0%} de {count} tickets)", durations, queries)
+            expected = [ticket['id'] for ticket in response.data['results']]
+
+            cursor = cursor_at(position)
+            durations, queries = [], []
+            for _ in range(repeat):
+                response, elapsed, num_queries = timed(
+                    client.get, '/api/tickets/', {'cursor': cursor, 'page_size': PAGE_SIZE}
+                )
+                assert response.status_code == 200, response.status_code
+                durations.append(elapsed)
+                queries.append(num_queries)
+            report(f"?cursor= en la misma posición ({depth:.0%})", durations, queries)
+            assert [ticket['id'] for ticket in response.data['results']] == expected
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
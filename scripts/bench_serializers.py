@@ -0,0 +1,157 @@
+"""
+Serializers DRF contra serializers compilados (``core/compiled.py``).
+
+    python -m scripts.bench_serializers [filas...] [--repeat N]
+
+Para ``EventListSerializer``, ``TicketSerializer``, ``AttendeeSerializer`` y
+``SponsorshipSerializer`` serializa ``filas`` registros (por defecto 1000 y
+10000) con cada camino, desde el queryset de la vista hasta el JSON, y
+verifica que los bytes sean idénticos.
+"""
+import sys
+from datetime import date, timedelta
+
+from scripts.bench import report, test_database, timed
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.attendees.models import Attendee, CheckInLog
+from apps.attendees.serializers import AttendeeSerializer
+from apps.attendees.views import AttendeeViewSet
+from apps.events.models import Category, Event, Venue
+from apps.events.serializers import EventListSerializer
+from apps.events.views import EventViewSet
+from apps.sponsors.models import Sponsor, SponsorBenefit, Sponsorship, SponsorTier
+from apps.sponsors.serializers import SponsorshipSerializer
+from apps.sponsors.views import SponsorshipViewSet
+from apps.tickets.models import Ticket, TicketType
+from apps.tickets.serializers import TicketSerializer
+from apps.tickets.views import TicketViewSet
+from core.compiled import CompiledSerializer
+
+BATCH = 2000
+
+
+def setup(rows):
+    users = User.objects.bulk_create([
+        User(username=f'bench{i}', first_name='Ana', last_name=f'Pérez {i}')
+        for i in range(rows)
+    ], batch_size=BATCH)
+    # MySQL no devuelve los ids de un INSERT masivo
+    if users[0].pk is None:
+        users = list(User.objects.order_by('id'))
+    category = Category.objects.create(name="Benchmark")
+    venue = Venue.objects.create(
+        name="Teatro", address="Calle 1", city="Bogotá", state="Cundinamarca", capacity=1000
+    )
+    now = timezone.now()
+    Event.objects.bulk_create([
+        Event(
+            title=f"Evento {i}", slug=f'evento-{i}', description="Benchmark",
+            category=category, venue=venue if i % 3 else None, organizer=users[i % len(users)],
+            start_date=now + timedelta(days=1 + i % 60), end_date=now + timedelta(days=1 + i % 60, hours=3),
+            capacity=100, status='published',
+        )
+        for i in range(rows)
+    ], batch_size=BATCH)
+    event = Event.objects.order_by('id').first()
+    event.capacity = rows
+    event.save(update_fields=['capacity'])
+
+    ticket_type = TicketType.objects.create(event=event, name="General", price=10, quantity=rows)
+    codes = Ticket.generate_codes(rows)
+    Ticket.objects.bulk_create([
+        Ticket(
+            ticket_type=ticket_type, buyer=users[i], code=code,
+            attendee_name="Asistente", attendee_email="asistente@example.com",
+            purchase_price=10, discount_applied=i % 3,
+        )
+        for i, code in enumerate(codes)
+    ], batch_size=BATCH)
+    tickets = Ticket.objects.in_bulk(codes, field_name='code')
+    Attendee.objects.bulk_create([
+        Attendee(
+            user=users[i], ticket=tickets[code], event=event,
+            full_name="Asistente", email="asistente@example.com",
+        )
+        for i, code in enumerate(codes)
+    ], batch_size=BATCH)
+    CheckInLog.objects.bulk_create([
+        CheckInLog(attendee=attendee)
+        for attendee in Attendee.objects.filter(pk__in=Attendee.objects.values('pk')[:rows // 10])
+    ], batch_size=BATCH)
+
+    tier = SponsorTier.objects.create(name="Gold", min_amount=0)
+    sponsors = Sponsor.objects.bulk_create([
+        Sponsor(name=f"Sponsor {i}", contact_email="sponsor@example.com") for i in range(rows)
+    ], batch_size=BATCH)
+    if sponsors[0].pk is None:
+        sponsors = list(Sponsor.objects.order_by('id'))
+    Sponsorship.objects.bulk_create([
+        Sponsorship(
+            event=event, sponsor=sponsor, sponsor_tier=tier, amount=1000,
+            start_date=date.today() - timedelta(days=i % 30), end_date=date.today() + timedelta(days=30),
+        )
+        for i, sponsor in enumerate(sponsors)
+    ], batch_size=BATCH)
+    SponsorBenefit.objects.bulk_create([
+        SponsorBenefit(sponsorship=sponsorship, benefit_type='other', description="Beneficio")
+        for sponsorship in Sponsorship.objects.all()[:rows // 10]
+    ], batch_size=BATCH)
+
+
+CASES = (
+    (EventListSerializer, EventViewSet),
+    (TicketSerializer, TicketViewSet),
+    (AttendeeSerializer, AttendeeViewSet),
+    (SponsorshipSerializer, SponsorshipViewSet),
+)
+
+
+def drf_json(serializer_class, queryset, context):
+    return JSONRenderer().render(serializer_class(queryset, many=True, context=context).data)
+
+
+def compiled_json(serializer_class, queryset, context):
+    compiled = CompiledSerializer(
+        serializer_class(context=context), queryset.model,
+        annotations=set(queryset.query.annotations)
+    )
+    return JSONRenderer().render(compiled.serialize(compiled.rows(queryset)))
+
+
+def main(sizes=(1000, 10000), repeat=3):
+    request = Request(APIRequestFactory().get('/'))
+    context = {'request': request}
+
+    for rows in sizes:
+        with test_database():
+            setup(rows)
+            for serializer_class, viewset in CASES:
+                # Orden total para comparar los bytes de ambos caminos
+                queryset = viewset.queryset.order_by('pk')[:rows]
+
+                results = {}
+                for label, func in (('DRF', drf_json), ('compilado', compiled_json)):
+                    durations, queries = [], []
+                    for _ in range(repeat):
+                        content, elapsed, num_queries = timed(func, serializer_class, queryset.all(), context)
+                        durations.append(elapsed)
+                        queries.append(num_queries)
+                    results[label] = content
+                    report(f"{serializer_class.__name__} {label} ({rows} filas)", durations, queries)
+                assert results['DRF'] == results['compilado'], serializer_class.__name__
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    repeat = 3
+    if '--repeat' in args:
+        index = args.index('--repeat')
+        repeat = int(args[index + 1])
+        del args[index:index + 2]
+    main(tuple(int(arg) for arg in args) or (1000, 10000), repeat)
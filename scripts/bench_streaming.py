@@ -0,0 +1,101 @@
+"""
+Listados sin paginar: ``Response`` contra JSON en streaming.
+
+    python -m scripts.bench_streaming [tickets] [repeticiones]
+
+Crea ``tickets`` tickets de un mismo comprador (por defecto 50000) y pide
+``/api/tickets/my_tickets/`` con ``STREAMING_JSON_ENABLED`` apagado y
+prendido. Mide el tiempo hasta el primer bloque, el tiempo total y el pico
+de memoria (tracemalloc) de generar la respuesta completa, y verifica que
+los bytes sean idénticos (por su hash, para no guardarlos en memoria).
+"""
+import hashlib
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+
+from scripts.bench import report, test_database
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.events.models import Category, Event
+from apps.tickets.models import Ticket, TicketType
+
+BATCH = 5000
+URL = '/api/tickets/my_tickets/'
+
+
+def setup(count):
+    buyer = User.objects.create_user(username='bench', password='bench')
+    event = Event.objects.create(
+        title="Benchmark",
+        description="Benchmark de streaming",
+        category=Category.objects.create(name="Benchmark"),
+        organizer=buyer,
+        start_date=timezone.now() + timedelta(days=30),
+        end_date=timezone.now() + timedelta(days=30, hours=3),
+        capacity=count,
+        status='published',
+    )
+    ticket_type = TicketType.objects.create(event=event, name="General", price=10, quantity=count)
+    for offset in range(0, count, BATCH):
+        Ticket.objects.bulk_create([
+            Ticket(
+                ticket_type=ticket_type, buyer=buyer, code=code,
+                attendee_name="Asistente", attendee_email="asistente@example.com",
+                purchase_price=10,
+            )
+            for code in Ticket.generate_codes(min(BATCH, count - offset))
+        ])
+    return buyer
+
+
+def fetch(client):
+    """(primer bloque en segundos, total en segundos, pico en bytes, sha256)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(URL)
+    assert response.status_code == 200, response.status_code
+    digest = hashlib.sha256()
+    if response.streaming:
+        chunks = iter(response.streaming_content)
+        digest.update(next(chunks))
+        first = time.perf_counter() - start
+        for chunk in chunks:
+            digest.update(chunk)
+    else:
+        digest.update(response.content)
+        first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first, total, peak, digest.hexdigest()
+
+
+def main(count=50000, repeat=3):
+    with test_database():
+        client = APIClient()
+        client.force_authenticate(user=setup(count))
+
+        results = {}
+        for label, enabled in (('Response', False), ('streaming', True)):
+            firsts, totals, peaks = [], [], []
+            with override_settings(STREAMING_JSON_ENABLED=enabled):
+                for _ in range(repeat):
+                    first, total, peak, digest = fetch(client)
+                    firsts.append(first)
+                    totals.append(total)
+                    peaks.append(peak)
+            results[label] = digest
+            report(f"{label}: primer bloque ({count} tickets)", firsts)
+            report(f"{label}: respuesta completa ({count} tickets)", totals)
+            print(f"  pico de memoria: {max(peaks) / 2 ** 20:.1f} MiB")
+        assert results['Response'] == results['streaming']
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))